@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 机构与代码链接抽取
+从 arXiv 元数据（arxiv:affiliation）和预取缓存中全文首页（作者 / 机构区域）抽取机构、
+GitHub 和项目主页链接，按别名表归一化后写回论文记录（Paper.affiliations / code_url /
+extra["project_url"]）。
+
+- 别名表：规范机构名 → 别名；建索引后按「去掉变音符号的词窗口」做哈希查找，
+  不再对每个机构逐个跑正则
+- 重点机构判断（fetch.check_priority）取 Paper.affiliations 的规范名与同一索引扫描标题 / 摘要 / 作者
+  结果的并集，查是否在重点机构集合中
+
+用法:
+  python affiliations.py --input /tmp/arxiv_papers.json --output /tmp/arxiv_affiliations.json
+  python affiliations.py --normalize "Dept. of EECS, University of California, Berkeley"
+"""
+
+import argparse
+import re
+import unicodedata
+
+# 规范机构名 → 别名（规范名本身也是别名）；重点机构名单见 fetch.PRIORITY_AFFILIATIONS
+AFFILIATION_ALIASES = {
+    "Google DeepMind": ["DeepMind", "Google DeepMind", "Google Brain"],
+    "UC Berkeley": ["Berkeley", "BAIR", "UC Berkeley", "University of California Berkeley",
+                    "Berkeley AI Research"],
+    "NVIDIA": ["NVIDIA", "NVIDIA Research", "Nvidia Corporation"],
+    "1X Technologies": ["1X", "1X Technologies"],
+    "Figure AI": ["Figure", "Figure AI"],
+    "Stanford": ["Stanford", "Stanford University"],
+    "MIT": ["MIT", "Massachusetts Institute of Technology", "MIT CSAIL"],
+    "OpenAI": ["OpenAI"],
+    "Anthropic": ["Anthropic"],
+    "Tesla": ["Tesla", "Tesla AI", "Optimus"],
+    "Physical Intelligence": ["Physical Intelligence"],
+    "Covariant": ["Covariant"],
+    "Meta": ["Meta", "Meta AI", "FAIR", "Facebook AI", "Facebook AI Research", "Yann LeCun", "LeCun"],
+    # 常见但不在重点名单中的机构（用于归一化展示）
+    "Carnegie Mellon University": ["CMU", "Carnegie Mellon", "Carnegie Mellon University"],
+    "Tsinghua University": ["Tsinghua", "Tsinghua University"],
+    "Peking University": ["Peking University", "PKU"],
+    "Shanghai AI Laboratory": ["Shanghai AI Laboratory", "Shanghai AI Lab"],
+    "ETH Zurich": ["ETH Zurich", "ETH Zürich", "ETHZ"],
+    "Toyota Research Institute": ["Toyota Research Institute", "TRI"],
+    "Google Research": ["Google Research", "Google"],
+    "Microsoft Research": ["Microsoft Research", "Microsoft"],
+    "University of Washington": ["University of Washington", "UW"],
+    "Princeton University": ["Princeton", "Princeton University"],
+    "Harvard University": ["Harvard", "Harvard University"],
+    "University of Oxford": ["Oxford", "University of Oxford"],
+    "Shanghai Jiao Tong University": ["Shanghai Jiao Tong University", "SJTU"],
+}
+
+# 在标题 / 摘要等自由文本中有歧义的别名（如 "Figure 3"、"meta-learning"、"UW"），只在机构字段中使用
+TEXT_AMBIGUOUS = frozenset({"Figure", "Meta", "Optimus", "Google", "Microsoft", "TRI", "UW", "Oxford"})
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_URL_RE = re.compile(r"https?://[^\s<>\"')\]]+")
+_GITHUB_RE = re.compile(r"^https?://(?:www\.)?github\.com/[^/\s]+/[^/\s#?]+", re.IGNORECASE)
+_PROJECT_RE = re.compile(r"^https?://[^/\s]+\.github\.io(?:/[^\s]*)?$|^https?://[^/\s]*project[^/\s]*/",
+                         re.IGNORECASE)
+
+
+def _words(text: str) -> list:
+    """去掉变音符号后切成单词（纯 ASCII 文本直接切分）"""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return _WORD_RE.findall(text)
+
+
+def _key(words) -> str:
+    """别名索引键：全大写的短缩写（MIT、FAIR、1X）保留大小写，其余小写"""
+    if len(words) == 1 and words[0].isupper() and len(words[0]) <= 5:
+        return words[0]
+    return " ".join(w.lower() for w in words)
+
+
+def _build_index(ambiguous: bool) -> tuple:
+    """(别名键 → 规范名, 别名首词键 → 以该词开头的别名最多几个词)"""
+    index, starts = {}, {}
+    for canonical, aliases in AFFILIATION_ALIASES.items():
+        for alias in [canonical] + aliases:
+            if not ambiguous and alias in TEXT_AMBIGUOUS:
+                continue
+            words = _words(alias)
+            index[_key(words)] = canonical
+            first = _key(words[:1])
+            starts[first] = max(starts.get(first, 0), len(words))
+    return index, starts
+
+
+# 机构字段用的完整索引 / 自由文本用的无歧义索引
+_ALIAS_INDEX, _ALIAS_STARTS = _build_index(ambiguous=True)
+_TEXT_INDEX, _TEXT_STARTS = _build_index(ambiguous=False)
+
+
+def canonical_affiliation(name: str) -> str:
+    """机构名 → 规范名（别名表中没有时原样返回）"""
+    words = _words(name)
+    return _ALIAS_INDEX.get(_key(words)) or _ALIAS_INDEX.get(" ".join(words).lower()) or name
+
+
+def match_affiliations(text: str, free_text: bool = False) -> list:
+    """
+    在文本中查找已知机构（按词窗口做哈希查找，长别名优先），返回规范名列表（去重保序）
+    只在能作为别名首词的位置展开窗口，绝大多数词只需一两次字典查找
+    free_text=True 用于标题 / 摘要等自由文本，跳过有歧义的别名
+    """
+    index, starts = (_TEXT_INDEX, _TEXT_STARTS) if free_text else (_ALIAS_INDEX, _ALIAS_STARTS)
+    words = _words(text)
+    found = []
+    i = 0
+    while i < len(words):
+        word = words[i]
+        longest = max(starts.get(word, 0), starts.get(word.lower(), 0))
+        for n in range(min(longest, len(words) - i), 0, -1):
+            canonical = index.get(_key(words[i:i + n]))
+            if canonical is None and n == 1:
+                canonical = index.get(words[i].lower())
+            if canonical:
+                if canonical not in found:
+                    found.append(canonical)
+                i += n
+                break
+        else:
+            i += 1
+    return found
+
+
+def normalize_affiliation(raw: str) -> list:
+    """
+    机构字符串 → 机构列表：能识别的归一为规范名，否则保留原文中最像机构名的一段
+    （"Dept. of EECS, University of California, Berkeley" → ["UC Berkeley"]）
+    """
+    raw = " ".join((raw or "").split())
+    if not raw:
+        return []
+    found = match_affiliations(raw)
+    if found:
+        return found
+    parts = [p.strip() for p in re.split(r"[;,]", raw) if p.strip()]
+    for part in parts:
+        if re.search(r"universit|institut|college|laborator|lab\b|research|inc\b|corporation|school", part, re.I):
+            return [part]
+    return [parts[0]] if parts else []
+
+
+def normalize_affiliations(raws) -> list:
+    result = []
+    for raw in raws or []:
+        for aff in normalize_affiliation(raw):
+            if aff not in result:
+                result.append(aff)
+    return result
+
+
+def classify_urls(urls) -> tuple:
+    """(GitHub 仓库链接, 项目主页链接)，没有时为 None"""
+    code_url = project_url = None
+    for url in urls:
+        url = url.rstrip(".,;")
+        m = _GITHUB_RE.match(url)
+        if m and code_url is None:
+            code_url = m.group(0).removesuffix(".git")
+        elif _PROJECT_RE.match(url) and project_url is None:
+            project_url = url
+    return code_url, project_url
+
+
+def find_urls(text: str) -> list:
+    return _URL_RE.findall(text or "")
+
+
+def annotate(papers, cache_dir: str = None) -> dict:
+    """
+    为论文补充机构与代码链接：arXiv 元数据中的机构归一化，再合并预取缓存中全文首页的机构和链接；
+    机构变化后重新判断重点机构。返回 {"affiliations", "code", "project"} 命中计数
+    """
+    from fetch import check_priority
+    from prefetch import PREFETCH_DIR, PaperCache, arxiv_id
+
+    cache = PaperCache(cache_dir or PREFETCH_DIR)
+    stats = {"affiliations": 0, "code": 0, "project": 0}
+    for p in papers:
+        affiliations = normalize_affiliations(p.affiliations)
+        urls = find_urls(p.summary)
+        aid = arxiv_id(p)
+        doc = cache.sections(aid) if aid else None
+        front = (doc or {}).get("front") or {}
+        if front:
+            for aff in match_affiliations(front.get("text", "")):
+                if aff not in affiliations:
+                    affiliations.append(aff)
+            urls += front.get("urls", [])
+        code_url, project_url = classify_urls(urls)
+        p.affiliations = affiliations
+        if code_url and not p.code_url:
+            p.code_url = code_url
+        if project_url:
+            p.extra = dict(p.extra or {}, project_url=project_url)
+        check_priority(p)
+        stats["affiliations"] += bool(affiliations)
+        stats["code"] += bool(p.code_url)
+        stats["project"] += bool(project_url)
+    return stats
+
+
+def main(argv=None):
+    from jsonio import dump_document
+    from ranking import iter_records
+    from records import papers as as_papers
+
+    parser = argparse.ArgumentParser(description="Extract affiliations and code links for papers")
+    parser.add_argument("--input", nargs="+", help="Paper sources (.json or .jsonl)")
+    parser.add_argument("--output", type=str, help="Annotated papers JSON")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Full-text prefetch cache")
+    parser.add_argument("--normalize", type=str, default=None, help="Normalize one affiliation string")
+    args = parser.parse_args(argv)
+
+    if args.normalize:
+        print(normalize_affiliation(args.normalize))
+        return 0
+    if not args.input or not args.output:
+        parser.error("--input and --output are required")
+
+    papers = list(as_papers(iter_records(args.input)))
+    stats = annotate(papers, args.cache_dir)
+    dump_document(args.output, {"papers": [p.to_dict() for p in papers]})
+    print(f"Annotated {len(papers)} papers: {stats['affiliations']} with affiliations, "
+          f"{stats['code']} with code, {stats['project']} with project pages -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 重点作者索引
+把 Semantic Scholar 追踪名单（fetch_semantic_scholar.PRIORITY_AUTHORS）及其别名建成归一化的姓名索引，
+fetch.py 对每篇 arXiv 论文的作者逐个查索引（每个作者一次哈希查找）并标记 tracked_author，
+大部分重点作者的论文不再需要逐个作者调用 S2 API，S2 只用于补充引用数等信息。
+
+姓名归一化：
+- 去掉变音符号、标点，统一小写（"Sergey Lévine" → "sergey levine"）
+- "Last, First" 转为 "First Last"；全名键对词排序，姓名顺序不影响匹配（"He Kaiming" = "Kaiming He"）
+- 中间名缩写不参与全名键（"Sergey V. Levine" = "Sergey Levine"）
+- 名只有缩写时退回「首字母 + 姓」键（"S. Levine"），该键在名单内有冲突时不使用
+
+用法:
+  python authors.py "S. Levine" "Kaiming He" "Lévine, Sergey"
+"""
+
+import argparse
+import re
+import unicodedata
+
+from fetch_semantic_scholar import PRIORITY_AUTHORS
+
+# 追踪作者的其它写法（键为 PRIORITY_AUTHORS 中的名字）
+AUTHOR_ALIASES = {
+    "Yann LeCun": ["Yann Le Cun"],
+    "Jim Fan (Linxi Fan)": ["Jim Fan", "Linxi Fan"],
+}
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _tokens(name: str) -> list:
+    """姓名 → 小写词列表（去变音符号；"Last, First" 调整为 "First Last"；去掉括号中的别名）"""
+    name = re.sub(r"\(.*?\)", " ", name or "")
+    if name.count(",") == 1:
+        last, first = name.split(",")
+        name = f"{first} {last}"
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(ch for ch in name if not unicodedata.combining(ch)).lower()
+    return _WORD_RE.findall(name)
+
+
+def name_keys(name: str) -> tuple:
+    """(全名键, 首字母键)：全名键为去掉单字母缩写后排序的词，首字母键为「名的首字母 + 姓」"""
+    tokens = _tokens(name)
+    if not tokens:
+        return None, None
+    full = [t for t in tokens if len(t) > 1]
+    full_key = " ".join(sorted(full)) if len(full) >= 2 else None
+    initial_key = f"{tokens[0][0]} {tokens[-1]}" if len(tokens) >= 2 else None
+    return full_key, initial_key
+
+
+def _build_index():
+    full_index, initial_index, collisions = {}, {}, set()
+    for canonical in PRIORITY_AUTHORS:
+        for alias in [canonical] + AUTHOR_ALIASES.get(canonical, []):
+            full_key, initial_key = name_keys(alias)
+            if full_key:
+                full_index[full_key] = canonical
+            if initial_key:
+                if initial_index.get(initial_key, canonical) != canonical:
+                    collisions.add(initial_key)
+                initial_index[initial_key] = canonical
+    for key in collisions:
+        del initial_index[key]
+    return full_index, initial_index
+
+
+# 模块加载时构建一次（进程池的每个 worker 导入时各构建一次）
+_FULL_INDEX, _INITIAL_INDEX = _build_index()
+
+
+def lookup_author(name: str):
+    """作者名 → 追踪名单中的名字（不在名单中时返回 None）"""
+    full_key, initial_key = name_keys(name)
+    if full_key:
+        return _FULL_INDEX.get(full_key)
+    # 名只有缩写（"S. Levine"）时才用首字母键，避免同姓不同名的作者误匹配
+    return _INITIAL_INDEX.get(initial_key) if initial_key else None
+
+
+def find_tracked_author(authors):
+    """论文作者中第一个被追踪的作者"""
+    for name in authors:
+        canonical = lookup_author(name)
+        if canonical:
+            return canonical
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up author names in the tracked-author index")
+    parser.add_argument("names", nargs="+")
+    args = parser.parse_args(argv)
+    for name in args.names:
+        print(f"{name} -> {lookup_author(name)}  {name_keys(name)}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 行内 markdown 解析基准
+用生成的大报告对比 feishu.parse_text_with_styles（单遍扫描）与原先「粗体 / 链接两个正则
+各自从当前位置向后搜索」的实现，段落越长、链接越多差距越大。运行前先核对 CASES 中容易解析错的行内文本（反斜杠、公式中的下划线、
+单词内的星号等），结果不符时直接失败。
+
+用法:
+  python bench_inline.py [--paragraphs 200] [--links 20 200 1000]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+
+from feishu import parse_markdown_to_blocks, parse_text_with_styles
+
+WORDS = "robot policy world model action token scaling benchmark latency dexterous grasp".split()
+
+# (原文, 期望的 [(文本, 样式)])：反斜杠只转义 ASCII 标点；* / _ 按 CommonMark 左右侧翼规则，_ 不在单词内强调
+CASES = [
+    (r"C:\Users\x and \alpha", [(r"C:\Users\x and \alpha", None)]),
+    (r"\pi", [(r"\pi", None)]),
+    (r"\*not italic\*", [("*not italic*", None)]),
+    (r"$\pi_{\theta}$ is trained with reward $r_{t}$", [(r"$\pi_{\theta}$ is trained with reward $r_{t}$", None)]),
+    ("snake_case_name", [("snake_case_name", None)]),
+    ("Q*-learning and 2*3*4", [("Q*-learning and 2", None), ("3", {"italic": True}), ("4", None)]),
+    ("a * b * c", [("a * b * c", None)]),
+    ("**摘要**：见 [论文](https://arxiv.org/abs/2602.00001)",
+     [("摘要", {"bold": True}), ("：见 ", None), ("论文", {"link": {"url": "https://arxiv.org/abs/2602.00001"}})]),
+]
+
+
+def legacy_parse_text_with_styles(text: str) -> list:
+    """原实现：每次匹配后对剩余文本重新搜索粗体和链接（仅用于对比）"""
+    elements = []
+    pos = 0
+    bold_pattern = re.compile(r'\*\*([^*]+)\*\*')
+    link_pattern = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+    while pos < len(text):
+        bold_match = bold_pattern.search(text, pos)
+        link_match = link_pattern.search(text, pos)
+        if bold_match and link_match:
+            next_match = bold_match if bold_match.start() < link_match.start() else link_match
+        else:
+            next_match = bold_match or link_match
+        if not next_match:
+            elements.append({"text_run": {"content": text[pos:]}})
+            break
+        if next_match.start() > pos:
+            elements.append({"text_run": {"content": text[pos:next_match.start()]}})
+        if next_match is bold_match:
+            elements.append({"text_run": {"content": next_match.group(1),
+                                          "text_element_style": {"bold": True}}})
+        else:
+            elements.append({"text_run": {"content": next_match.group(1),
+                                          "text_element_style": {"link": {"url": next_match.group(2)}}}})
+        pos = next_match.end()
+    return elements or [{"text_run": {"content": text}}]
+
+
+def check_cases() -> int:
+    """核对 CASES，返回不符的条数"""
+    failed = 0
+    for text, expected in CASES:
+        got = [(e["text_run"]["content"], e["text_run"].get("text_element_style"))
+               for e in parse_text_with_styles(text)]
+        if got != expected:
+            failed += 1
+            print(f"MISMATCH {text!r}:\n  expected {expected}\n  got      {got}")
+    print(f"inline cases: {len(CASES) - failed}/{len(CASES)} ok")
+    return failed
+
+
+def paragraph(rng: random.Random, links: int, bold: bool = True) -> str:
+    """含 links 个链接（bold=True 时还有同等数量粗体）的长段落"""
+    parts = []
+    for k in range(links):
+        parts.append(" ".join(rng.choices(WORDS, k=8)))
+        parts.append(f"[{rng.choice(WORDS)} {k}](https://arxiv.org/abs/2602.{k:05d})")
+        if bold:
+            parts.append(f"**{rng.choice(WORDS)}**")
+    return " ".join(parts)
+
+
+def report(rng: random.Random, paragraphs: int, links: int) -> str:
+    lines = ["# 具身智能论文速递", ""]
+    for p in range(paragraphs):
+        lines.append(f"### [Paper {p}](https://arxiv.org/abs/2602.{p:05d})")
+        lines.append(f"- **一句话摘要**：{paragraph(rng, links // 10 or 1)}")
+        lines.append(f"- **应用启示**：{paragraph(rng, links // 10 or 1)}")
+    return "\n".join(lines)
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark inline markdown parsing")
+    parser.add_argument("--paragraphs", type=int, default=200)
+    parser.add_argument("--links", type=int, nargs="+", default=[20, 200, 1000])
+    args = parser.parse_args(argv)
+    if check_cases():
+        return 1
+    rng = random.Random(0)
+
+    # 没有粗体时原实现每次都要把粗体正则扫到段尾，退化为平方复杂度
+    for bold in (True, False):
+        print(f"single paragraph, links {'+ bold' if bold else 'only'}:")
+        print(f"  {'links':>6} {'chars':>8} {'legacy':>10} {'one-pass':>10}")
+        for links in args.links:
+            text = paragraph(rng, links, bold)
+            legacy = timed(legacy_parse_text_with_styles, text)
+            fast = timed(parse_text_with_styles, text)
+            print(f"  {links:>6} {len(text):>8} {legacy * 1000:>8.1f}ms {fast * 1000:>8.1f}ms")
+
+    md = report(rng, args.paragraphs, max(args.links))
+    start = time.perf_counter()
+    blocks = parse_markdown_to_blocks(md)
+    elapsed = time.perf_counter() - start
+    print(f"\ngenerated report: {len(md)} chars, {len(blocks)} blocks parsed in {elapsed * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 打分阶段基准
+用合成论文对比 fetch.score_papers 在不同进程数下的耗时，并校验并行结果与串行一致。
+
+用法:
+  python bench_scoring.py [--papers 200000] [--workers 1 2 4 8]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from fetch import PRIORITY_AFFILIATIONS, PRIORITY_SERIES, SCORE_FIELDS, TOPIC_KEYWORDS, score_papers
+from records import Paper
+
+FILLER = (
+    "we study robust control of legged and wheeled platforms under partial observability "
+    "with large scale pretraining and careful evaluation on real hardware across many tasks"
+).split()
+
+
+def synthetic_papers(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    keywords = [kw for kws in TOPIC_KEYWORDS.values() for kw in kws]
+    names = ["Alice Zhang", "Bob Li", "Carol Smith", "Dan Wu", "Eve Chen"]
+    papers = []
+    for i in range(n):
+        words = rng.choices(FILLER, k=120)
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words)), rng.choice(keywords))
+        if rng.random() < 0.05:
+            words.insert(rng.randrange(len(words)), rng.choice(PRIORITY_AFFILIATIONS + PRIORITY_SERIES))
+        papers.append(Paper(
+            id=f"2601.{i:05d}",
+            title=" ".join(rng.choices(FILLER, k=10)),
+            summary=" ".join(words),
+            authors=rng.sample(names, 3),
+        ))
+    return papers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark parallel paper scoring")
+    parser.add_argument("--papers", type=int, default=200000)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    args = parser.parse_args(argv)
+    cores = os.cpu_count() or 1
+    workers = args.workers or sorted({1, 2, 4, cores} & set(range(1, cores + 1)))
+
+    print(f"{args.papers} papers, {cores} cores")
+    baseline, reference = None, None
+    for w in workers:
+        papers = synthetic_papers(args.papers)
+        start = time.perf_counter()
+        score_papers(papers, workers=w)
+        elapsed = time.perf_counter() - start
+        result = [tuple(getattr(p, f) for f in SCORE_FIELDS) for p in papers]
+        if reference is None:
+            reference, baseline = result, elapsed
+        elif result != reference:
+            print(f"  workers={w}: results differ from workers={workers[0]}")
+            return 1
+        print(f"  workers={w:<3d} {elapsed:7.2f}s  speedup x{baseline / elapsed:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 启动耗时基准
+对比「每个脚本单独起解释器」与「统一入口 daily_paper.py」的启动开销：
+1. 各命令 --help 的耗时（独立脚本 vs 统一入口子命令）
+2. 日报链路的导入开销：每个阶段一个解释器 vs 同一进程内导入全部阶段
+
+用法:
+  python bench_startup.py [--repeat 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (独立脚本, 统一入口子命令)
+HELP_CASES = [
+    ("fetch.py", ["fetch", "arxiv"]),
+    ("fetch_github.py", ["fetch", "github"]),
+    ("generate_report.py", ["render", "daily"]),
+    ("feishu.py", ["publish"]),
+    ("pipeline.py", ["run"]),
+]
+
+# 日报链路依次涉及的模块
+DAILY_CHAIN = [
+    "fetch", "fetch_semantic_scholar", "fetch_github", "fetch_huggingface",
+    "generate_report", "feishu",
+]
+
+
+def timed(cmd: list, repeat: int) -> float:
+    """运行命令 repeat 次，返回耗时中位数（毫秒）"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=SCRIPTS_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+    py = sys.executable
+
+    print(f"{'command':<28} {'script':>10} {'daily_paper':>12}")
+    for script, sub in HELP_CASES:
+        direct = timed([py, script, "--help"], args.repeat)
+        unified = timed([py, "daily_paper.py", *sub, "--help"], args.repeat)
+        print(f"{' '.join(sub):<28} {direct:>8.1f}ms {unified:>10.1f}ms")
+    top = timed([py, "daily_paper.py", "--help"], args.repeat)
+    print(f"{'(top-level --help)':<28} {'':>10} {top:>10.1f}ms")
+
+    separate = sum(timed([py, "-c", f"import {m}"], args.repeat) for m in DAILY_CHAIN)
+    single = timed([py, "-c", "import " + ", ".join(DAILY_CHAIN)], args.repeat)
+    print()
+    print(f"daily chain imports, one interpreter per stage: {separate:.1f}ms")
+    print(f"daily chain imports, single process:            {single:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,33 +1,19 @@
-import requests
-import json
-
-def create_doc():
-    # Get token
-    resp = requests.post(
-        "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
-        json={"app_id": "cli_a99c1819e3f4900b", "app_secret": "qvYVoPKbRyicpoPXYcBG9bn6AIoKmezw"}
-    )
-    if resp.status_code != 200:
-        print(f"Error getting token: {resp.text}")
-        return
-        
-    token = resp.json().get("tenant_access_token")
-    if not token:
-        print("No token received")
-        return
+import argparse
 
-    # Create doc
-    resp = requests.post(
-        "https://open.feishu.cn/open-apis/docx/v1/documents",
-        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
-        json={"title": "具身智能·每周研究速递（2026-02-17 ~ 2026-02-23）"}
-    )
-    
-    if resp.status_code != 200:
-        print(f"Error creating doc: {resp.text}")
+from feishu_client import request as feishu_request
+
+# 新文档默认授予完全访问权限的成员
+OWNER_OPEN_ID = "ou_6d4bdf64620355814e6bc0cfd8763602"
+
+
+def create_doc(title: str = "具身智能·每周研究速递（2026-02-17 ~ 2026-02-23）"):
+    # Create doc (token comes from the shared cached provider)
+    try:
+        doc_data = feishu_request("POST", "/docx/v1/documents", json={"title": title})
+    except Exception as e:
+        print(f"Error creating doc: {e}")
         return
 
-    doc_data = resp.json()
     if doc_data.get("code") != 0:
         print(f"API Error: {doc_data}")
         return
@@ -36,20 +22,30 @@ def create_doc():
     print(f"DOC_ID:{doc_id}")
     
     # Add permissions
-    perm_resp = requests.post(
-        f"https://open.feishu.cn/open-apis/drive/v1/permissions/{doc_id}/members?type=docx",
-        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+    perm_data = feishu_request(
+        "POST",
+        f"/drive/v1/permissions/{doc_id}/members",
+        params={"type": "docx"},
         json={
             "member_type": "openid",
-            "member_id": "ou_6d4bdf64620355814e6bc0cfd8763602",
+            "member_id": OWNER_OPEN_ID,
             "perm": "full_access"
         }
     )
     
-    if perm_resp.status_code != 200:
-        print(f"Error adding permission: {perm_resp.text}")
+    if perm_data.get("code") != 0:
+        print(f"Error adding permission: {perm_data}")
     else:
         print("Permissions added successfully.")
+    return doc_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create a Feishu document for Daily Paper")
+    parser.add_argument("--title", type=str, default="具身智能·每周研究速递（2026-02-17 ~ 2026-02-23）")
+    args = parser.parse_args(argv)
+    return 0 if create_doc(args.title) else 1
+
 
 if __name__ == "__main__":
-    create_doc()
+    exit(main())
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 常驻调度进程
+按 cron 表达式在进程内调度日报 / 周报流水线，模块、编译好的匹配器、历史索引、
+飞书 token 等在多次运行之间保持常驻；同时监听本地 Unix socket 接受即时触发。
+
+用法:
+  python daemon.py serve [--daily-cron "0 9 * * *"] [--weekly-cron "0 10 * * 1"] [--doc-id <DOC_ID>]
+  python daemon.py trigger daily --date 2026-02-24     # 通过 socket 立即触发
+  python daemon.py trigger status
+"""
+
+import argparse
+import importlib
+import json
+import os
+import shlex
+import signal
+import socket
+import sys
+import threading
+import traceback
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pipeline
+
+SOCKET_PATH = "/tmp/daily-paper.sock"
+DEFAULT_TZ = "Asia/Shanghai"
+DEFAULT_DAILY_CRON = "0 9 * * *"
+DEFAULT_WEEKLY_CRON = "0 10 * * 1"
+
+# 启动时预加载的模块（导入即编译正则、建立匹配表）
+WARM_MODULES = [
+    "fetch", "fetch_semantic_scholar", "fetch_github", "fetch_huggingface",
+    "generate_report", "generate_weekly_report", "generate_card_data",
+]
+
+
+class CronExpr:
+    """五段式 cron 表达式（分 时 日 月 周），支持 *、a-b、a,b、*/n、a-b/n"""
+
+    RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+    def __init__(self, expr: str):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse(f, lo, hi) for f, (lo, hi) in zip(fields, self.RANGES)
+        )
+        # 周日既可写 0 也可写 7
+        if 7 in self.weekdays:
+            self.weekdays.add(0)
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    @staticmethod
+    def _parse(field: str, lo: int, hi: int) -> set:
+        values = set()
+        for part in field.split(","):
+            rng, _, step = part.partition("/")
+            step = int(step) if step else 1
+            if rng == "*":
+                start, end = lo, hi
+            elif "-" in rng:
+                start, end = (int(x) for x in rng.split("-"))
+            else:
+                start = int(rng)
+                end = hi if step > 1 else start
+            values.update(range(start, min(end, 7 if hi == 6 else hi) + 1, step))
+        return values
+
+    def matches(self, dt: datetime) -> bool:
+        if dt.minute not in self.minutes or dt.hour not in self.hours or dt.month not in self.months:
+            return False
+        day_ok = dt.day in self.days
+        weekday_ok = (dt.isoweekday() % 7) in self.weekdays
+        # 与标准 cron 一致：日和周都被限定时，满足其一即可
+        if self.any_day:
+            return weekday_ok
+        if self.any_weekday:
+            return day_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, dt: datetime) -> datetime:
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for _ in range(366 * 24 * 60):
+            if self.matches(t):
+                return t
+            t += timedelta(minutes=1)
+        raise ValueError(f"Cron expression never fires: {self.expr!r}")
+
+
+class Daemon:
+    """常驻调度器：cron 定时 + socket 触发，同名任务不并发执行"""
+
+    def __init__(self, schedules: dict, job_args: dict, tz: str = DEFAULT_TZ,
+                 socket_path: str = SOCKET_PATH):
+        self.schedules = {job: CronExpr(expr) for job, expr in schedules.items() if expr}
+        self.job_args = job_args
+        self.tz = ZoneInfo(tz)
+        self.socket_path = socket_path
+        self.stop_event = threading.Event()
+        self.locks = {job: threading.Lock() for job in ("daily", "weekly")}
+        self.history = []
+
+    def warm_up(self):
+        """预加载模块与历史索引，后续运行直接复用"""
+        for name in WARM_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception as e:
+                print(f"[daemon] warm-up: cannot import {name}: {e}")
+        try:
+            from related_index import open_index
+            index = open_index()
+            print(f"[daemon] related index warm: {len(index)} papers")
+        except Exception as e:
+            print(f"[daemon] warm-up: related index unavailable: {e}")
+
+    def start_job(self, job: str, extra: list = None, source: str = "cron") -> str:
+        """在后台线程执行任务；同名任务正在运行时返回 busy"""
+        lock = self.locks.get(job)
+        if lock is None:
+            return "unknown-job"
+        if not lock.acquire(blocking=False):
+            return "busy"
+        argv = [job] + list(self.job_args.get(job, [])) + list(extra or [])
+
+        def worker():
+            started = datetime.now(self.tz)
+            record = {"job": job, "argv": argv, "source": source, "started": started.isoformat()}
+            try:
+                print(f"[daemon] {source}: pipeline {' '.join(argv)}")
+                record["rc"] = pipeline.main(argv)
+            except BaseException:
+                traceback.print_exc()
+                record["rc"] = -1
+            finally:
+                record["finished"] = datetime.now(self.tz).isoformat()
+                self.history = (self.history + [record])[-50:]
+                lock.release()
+
+        threading.Thread(target=worker, name=f"job-{job}", daemon=True).start()
+        return "started"
+
+    def status(self) -> dict:
+        now = datetime.now(self.tz)
+        return {
+            "running": [job for job, lock in self.locks.items() if lock.locked()],
+            "next": {job: cron.next_after(now).isoformat() for job, cron in self.schedules.items()},
+            "history": self.history[-10:],
+        }
+
+    # ---------- cron 循环 ----------
+
+    def schedule_loop(self):
+        now = datetime.now(self.tz)
+        upcoming = {job: cron.next_after(now) for job, cron in self.schedules.items()}
+        for job, t in upcoming.items():
+            print(f"[daemon] {job} next run at {t.isoformat()}")
+        while not self.stop_event.is_set():
+            if not upcoming:
+                self.stop_event.wait(3600)
+                continue
+            job, fire_at = min(upcoming.items(), key=lambda x: x[1])
+            delay = (fire_at - datetime.now(self.tz)).total_seconds()
+            if delay > 0:
+                # 分段等待，便于及时响应停止信号和系统时间调整
+                self.stop_event.wait(min(delay, 60))
+                continue
+            result = self.start_job(job)
+            if result != "started":
+                print(f"[daemon] {job}: skipped scheduled run ({result})")
+            upcoming[job] = self.schedules[job].next_after(fire_at)
+            print(f"[daemon] {job} next run at {upcoming[job].isoformat()}")
+
+    # ---------- socket 触发 ----------
+
+    def handle(self, line: str) -> dict:
+        parts = shlex.split(line)
+        if not parts:
+            return {"ok": False, "error": "empty command"}
+        if parts[0] == "status":
+            return {"ok": True, "status": self.status()}
+        if parts[0] in self.locks:
+            result = self.start_job(parts[0], parts[1:], source="socket")
+            return {"ok": result == "started", "result": result}
+        return {"ok": False, "error": f"unknown command {parts[0]!r}"}
+
+    def socket_loop(self):
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        os.chmod(self.socket_path, 0o600)
+        server.listen(4)
+        server.settimeout(1.0)
+        print(f"[daemon] listening on {self.socket_path}")
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    continue
+                with conn:
+                    data = b""
+                    while not data.endswith(b"\n"):
+                        chunk = conn.recv(4096)
+                        if not chunk:
+                            break
+                        data += chunk
+                    try:
+                        reply = self.handle(data.decode("utf-8").strip())
+                    except Exception as e:
+                        reply = {"ok": False, "error": str(e)}
+                    conn.sendall((json.dumps(reply, ensure_ascii=False) + "\n").encode("utf-8"))
+        finally:
+            server.close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def serve(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stop_event.set())
+        self.warm_up()
+        listener = threading.Thread(target=self.socket_loop, name="socket", daemon=True)
+        listener.start()
+        self.schedule_loop()
+        listener.join(timeout=5)
+        print("[daemon] stopped")
+
+
+def trigger(command: list, socket_path: str = SOCKET_PATH) -> int:
+    """连接常驻进程发送一条命令并打印回复"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        try:
+            s.connect(socket_path)
+        except OSError as e:
+            print(f"Cannot connect to daemon at {socket_path}: {e}")
+            return 1
+        s.sendall((shlex.join(command) + "\n").encode("utf-8"))
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = s.recv(4096)
+            if not chunk:
+                break
+            data += chunk
+    reply = json.loads(data.decode("utf-8") or "{}")
+    print(json.dumps(reply, ensure_ascii=False, indent=2))
+    return 0 if reply.get("ok") else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily Paper daemon / scheduler")
+    parser.add_argument("--socket", type=str, default=SOCKET_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Run the scheduler")
+    p_serve.add_argument("--daily-cron", type=str, default=DEFAULT_DAILY_CRON, help="'' disables")
+    p_serve.add_argument("--weekly-cron", type=str, default=DEFAULT_WEEKLY_CRON, help="'' disables")
+    p_serve.add_argument("--tz", type=str, default=DEFAULT_TZ)
+    p_serve.add_argument("--doc-id", type=str, default=None, help="Publish scheduled runs to this Feishu doc")
+
+    p_trigger = sub.add_parser("trigger", help="Send a command to a running daemon")
+    p_trigger.add_argument("args", nargs=argparse.REMAINDER, help="daily|weekly [pipeline args] | status")
+    args = parser.parse_args(argv)
+
+    if args.command == "trigger":
+        if not args.args:
+            parser.error("trigger needs a command")
+        return trigger(args.args, args.socket)
+
+    job_args = {"daily": [], "weekly": []}
+    if args.doc_id:
+        for job in job_args:
+            job_args[job] += ["--doc-id", args.doc_id]
+    daemon = Daemon({"daily": args.daily_cron, "weekly": args.weekly_cron}, job_args,
+                    tz=args.tz, socket_path=args.socket)
+    daemon.serve()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 统一命令行入口
+各子命令只在被调用时才导入对应脚本（抓取用的 urllib、发布用的 requests 等），
+--help 和轻量命令不付出无关模块的导入开销；run 在同一进程内跑完整条日报 / 周报链路。
+
+用法:
+  python daily_paper.py fetch arxiv --date 2026-02-24 --output /tmp/arxiv_papers.json
+  python daily_paper.py fetch s2|github|hf|pwc|x [参数...]
+  python daily_paper.py rank --papers /tmp/arxiv_papers.json /tmp/s2_papers.json [--top 12]
+  python daily_paper.py render daily|weekly|card [参数...]
+  python daily_paper.py publish --input report.md --doc-id <DOC_ID>
+  python daily_paper.py run daily|weekly [参数...]       # 进程内执行整条流水线
+  python daily_paper.py daemon serve|trigger [参数...]
+  python daily_paper.py index add|query [参数...]
+  python daily_paper.py cache run|key|gc [参数...]
+"""
+
+import importlib
+import sys
+
+# 子命令 → (模块名, 说明)；带二级名称的命令按第二个参数选模块
+COMMANDS = {
+    "fetch": ({
+        "arxiv": "fetch",
+        "s2": "fetch_semantic_scholar",
+        "github": "fetch_github",
+        "hf": "fetch_huggingface",
+        "pwc": "fetch_pwc",
+        "x": "fetch_x",
+    }, "Fetch one data source"),
+    "rank": (None, "Score and rank papers without rendering"),
+    "render": ({
+        "daily": "generate_report",
+        "weekly": "generate_weekly_report",
+        "card": "generate_card_data",
+    }, "Render a report or card data"),
+    "enrich": ("enrich", "Translate titles and summarize papers (cached)"),
+    "prefetch": ("prefetch", "Prefetch arXiv full text and extract sections"),
+    "affiliations": ("affiliations", "Extract affiliations and code links for papers"),
+    "link": ("linker", "Link papers to GitHub repos and Hugging Face artifacts"),
+    "authors": ("authors", "Look up names in the tracked-author index"),
+    "publish": ("feishu", "Write a report to a Feishu document"),
+    "export": ("export_site", "Export reports to a static HTML site"),
+    "summary": ("summaries", "Daily summaries and period rollups"),
+    "trends": ("trends", "Term statistics and Crossing Trend detection"),
+    "run": ("pipeline", "Run the daily / weekly pipeline in this process"),
+    "daemon": ("daemon", "Scheduler daemon"),
+    "index": ("related_index", "Related prior work index"),
+    "cache": ("stage_cache", "Stage cache maintenance"),
+}
+
+
+def usage() -> str:
+    lines = ["usage: daily_paper.py <command> [args...]", "", "commands:"]
+    for name, (target, help_text) in COMMANDS.items():
+        sub = f" {'|'.join(target)}" if isinstance(target, dict) else ""
+        lines.append(f"  {name + sub:<32} {help_text}")
+    return "\n".join(lines)
+
+
+def rank(argv: list) -> int:
+    """按日报打分规则排序论文并输出 top-k（不生成报告、不更新历史索引）"""
+    import argparse
+    import json
+
+    from generate_report import SCORE_WEIGHTS, rank_papers, score_paper
+    from jsonio import dump_document
+
+    parser = argparse.ArgumentParser(prog="daily_paper.py rank", description="Rank papers")
+    parser.add_argument("--papers", nargs="+", required=True, help="Paper sources (.json or .jsonl)")
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--weights", type=str, default=None, help="JSON object overriding SCORE_WEIGHTS")
+    parser.add_argument("--follow", action="store_true", help="Follow .jsonl sources until producers finish")
+    parser.add_argument("--output", type=str, default=None, help="Write ranked papers as JSON")
+    args = parser.parse_args(argv)
+
+    weights = dict(SCORE_WEIGHTS)
+    if args.weights:
+        weights.update(json.loads(args.weights))
+    ranked = rank_papers(args.papers, weights, k=args.top, follow=args.follow)
+    for i, p in enumerate(ranked, 1):
+        print(f"{i:2d}. [{score_paper(p, weights):2d}] {p.title}")
+    if args.output:
+        dump_document(args.output, [p.to_dict() for p in ranked])
+        print(f"Saved to {args.output}")
+    return 0
+
+
+def main(argv=None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0 if argv else 2
+
+    command, rest = argv[0], argv[1:]
+    if command not in COMMANDS:
+        print(f"Unknown command: {command}\n\n{usage()}")
+        return 2
+    target = COMMANDS[command][0]
+
+    if target is None:
+        return rank(rest)
+    if isinstance(target, dict):
+        if not rest or rest[0] not in target:
+            print(f"usage: daily_paper.py {command} {{{','.join(target)}}} [args...]")
+            return 0 if rest[:1] in (["-h"], ["--help"]) else 2
+        module, rest = target[rest[0]], rest[1:]
+    else:
+        module = target
+
+    try:
+        rc = importlib.import_module(module).main(rest)
+    except SystemExit as e:
+        rc = e.code
+    return rc or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
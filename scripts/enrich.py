@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 论文增强（中文标题 + 结构化摘要）
+为入选论文生成中文标题、一句话摘要、解决痛点、核心改进和应用场景，替代报告中的占位文字。
+
+- 后端可插拔：stub（本地规则生成，离线 / 测试用）、http（OpenAI 兼容的 chat completions 接口）
+- 批量：每次调用处理一批论文（后端的 batch_size）
+- 缓存：按「论文 id + 版本」缓存结果（<ENRICH_CACHE_DIR>/<后端>/），日报、周报、卡片共用，
+  同一篇论文只会被增强一次；论文更新版本后重新生成
+
+结果保存在 Paper.extra["enrichment"]，随论文记录一起序列化。
+
+用法:
+  python enrich.py --input /tmp/arxiv_papers.json --output /tmp/arxiv_enriched.json --backend stub
+  ENRICH_API_URL=https://.../v1/chat/completions ENRICH_API_KEY=... python enrich.py --input ... --backend http
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import urllib.request
+
+from jsonio import dump_document, load_document
+from ranking import iter_records
+from records import papers as as_papers
+
+ENRICH_CACHE_DIR = "/workspace/data/enrich-cache"
+
+# 结果字段变化时递增（旧缓存随之失效）
+ENRICH_VERSION = 1
+
+# 增强结果字段 → 报告中的字段名
+ENRICH_FIELDS = {
+    "title_zh": "中文标题",
+    "one_liner": "一句话摘要",
+    "pain_point": "解决痛点",
+    "improvements": "核心改进",
+    "applications": "应用场景",
+}
+
+# 默认后端（为空时不做增强）及 http 后端配置
+ENRICH_BACKEND = os.environ.get("ENRICH_BACKEND", "")
+ENRICH_API_URL = os.environ.get("ENRICH_API_URL", "")
+ENRICH_API_KEY = os.environ.get("ENRICH_API_KEY", "")
+ENRICH_MODEL = os.environ.get("ENRICH_MODEL", "")
+
+_VERSION_RE = re.compile(r"^(.+?)(v\d+)$")
+_SENTENCE_RE = re.compile(r"(?<=[.!?。！？])\s+")
+
+
+def paper_version(paper) -> tuple:
+    """(论文 id, 版本)：arXiv id 自带版本号时取版本号，否则取标题 + 摘要的哈希"""
+    m = _VERSION_RE.match(paper.id or "")
+    if m:
+        return m.group(1), m.group(2)
+    digest = hashlib.sha1(f"{paper.title}\n{paper.summary}".encode("utf-8")).hexdigest()[:12]
+    return paper.id or digest, digest
+
+
+def get_enrichment(paper) -> dict:
+    """论文已有的增强结果（没有时为空 dict）"""
+    return (paper.extra or {}).get("enrichment") or {}
+
+
+# ---------- 后端 ----------
+
+class StubSummarizer:
+    """本地规则后端：直接从摘要中抽句子，不访问网络，结果确定（用于测试和离线运行）"""
+
+    name = "stub"
+    batch_size = 32
+
+    def summarize(self, papers: list) -> list:
+        results = []
+        for p in papers:
+            sentences = [s.strip() for s in _SENTENCE_RE.split(p.summary or "") if s.strip()]
+            numeric = [s for s in sentences[1:] if re.search(r"\d", s)]
+            results.append({
+                "title_zh": p.title,
+                "one_liner": (sentences[0] if sentences else p.title)[:100],
+                "pain_point": sentences[1][:150] if len(sentences) > 1 else "",
+                "improvements": [s[:150] for s in numeric[:3]],
+                "applications": p.primary_topic or "",
+            })
+        return results
+
+
+class HTTPSummarizer:
+    """OpenAI 兼容的 chat completions 接口，一批论文一次请求，要求模型返回 JSON 数组"""
+
+    name = "http"
+    batch_size = 8
+
+    PROMPT = (
+        "你是具身智能领域的研究助理。对下面每篇论文输出一个 JSON 对象，字段为："
+        "title_zh（中文标题）、one_liner（50 字以内的一句话摘要）、pain_point（解决的工程/算法瓶颈，50-100 字）、"
+        "improvements（相对 SOTA 的核心改进点，最多 3 条的字符串数组，尽量带数据）、"
+        "applications（潜在应用场景）。按输入顺序输出一个 JSON 数组，不要输出其它内容。"
+    )
+
+    def __init__(self, url: str = None, api_key: str = None, model: str = None, timeout: int = 120):
+        self.url = url or ENRICH_API_URL
+        self.api_key = api_key or ENRICH_API_KEY
+        self.model = model or ENRICH_MODEL
+        self.timeout = timeout
+        if not self.url:
+            raise ValueError("http backend needs ENRICH_API_URL")
+
+    def summarize(self, papers: list) -> list:
+        items = [{"id": p.id, "title": p.title, "abstract": p.summary} for p in papers]
+        body = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": self.PROMPT},
+                {"role": "user", "content": json.dumps(items, ensure_ascii=False)},
+            ],
+            "temperature": 0.2,
+        }
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        req = urllib.request.Request(self.url, data=json.dumps(body).encode("utf-8"), headers=headers)
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            data = json.loads(resp.read().decode("utf-8"))
+        content = data["choices"][0]["message"]["content"].strip()
+        # 去掉模型可能加上的 ```json 代码块
+        content = re.sub(r"^```(?:json)?\s*|\s*```$", "", content)
+        results = json.loads(content)
+        if not isinstance(results, list) or len(results) != len(papers):
+            raise ValueError(f"expected {len(papers)} results, got {type(results).__name__}")
+        return results
+
+
+BACKENDS = {
+    "stub": StubSummarizer,
+    "http": HTTPSummarizer,
+}
+
+
+def get_backend(name: str):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown enrich backend {name!r} (available: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
+
+
+# ---------- 缓存 + 批量 ----------
+
+class EnrichCache:
+    """每篇论文一个 JSON 文件：<cache_dir>/<后端>/<id>@<版本>.json"""
+
+    def __init__(self, backend_name: str, cache_dir: str = ENRICH_CACHE_DIR):
+        self.dir = os.path.join(cache_dir, backend_name)
+
+    def path(self, paper) -> str:
+        paper_id, version = paper_version(paper)
+        safe_id = re.sub(r"[^A-Za-z0-9._-]", "_", paper_id)
+        return os.path.join(self.dir, f"{safe_id}@{version}.json")
+
+    def get(self, paper):
+        path = self.path(paper)
+        if not os.path.exists(path):
+            return None
+        entry = load_document(path)
+        if entry.get("version") != ENRICH_VERSION:
+            return None
+        return entry["result"]
+
+    def put(self, paper, result: dict):
+        path = self.path(paper)
+        os.makedirs(self.dir, exist_ok=True)
+        tmp = f"{path}.tmp{os.getpid()}"
+        dump_document(tmp, {"version": ENRICH_VERSION, "id": paper.id, "result": result})
+        os.replace(tmp, path)
+
+
+def _clean(result: dict) -> dict:
+    """只保留已知字段，改进点统一为字符串列表"""
+    cleaned = {k: result.get(k) for k in ENRICH_FIELDS if result.get(k)}
+    improvements = cleaned.get("improvements")
+    if isinstance(improvements, str):
+        cleaned["improvements"] = [improvements]
+    return cleaned
+
+
+def enrich_papers(papers: list, backend="stub", cache_dir: str = ENRICH_CACHE_DIR,
+                  batch_size: int = None) -> dict:
+    """
+    为论文补充增强结果（写入 paper.extra["enrichment"]），已有或已缓存的直接复用
+    某一批调用失败、或某篇的结果清洗后为空时，这些论文保持原样（报告回退到原来的字段）且不写缓存，返回 {"cached", "enriched", "failed"}
+    """
+    if isinstance(backend, str):
+        backend = get_backend(backend)
+    cache = EnrichCache(backend.name, cache_dir)
+    stats = {"cached": 0, "enriched": 0, "failed": 0}
+
+    pending = []
+    for p in papers:
+        if get_enrichment(p):
+            stats["cached"] += 1
+            continue
+        result = cache.get(p)
+        if result is not None:
+            p.extra = dict(p.extra or {}, enrichment=result)
+            stats["cached"] += 1
+        else:
+            pending.append(p)
+
+    size = batch_size or backend.batch_size
+    for i in range(0, len(pending), size):
+        batch = pending[i:i + size]
+        try:
+            results = backend.summarize(batch)
+        except Exception as e:
+            print(f"Warning: enrich backend {backend.name} failed on {len(batch)} papers: {e}")
+            stats["failed"] += len(batch)
+            continue
+        # 结果条数不足时，缺的论文按失败计
+        results = list(results or [])
+        results += [None] * (len(batch) - len(results))
+        for p, result in zip(batch, results):
+            result = _clean(result or {})
+            if not result:
+                # 清洗后为空（后端只返回了未知或空字段）：不写缓存，下次运行重试
+                stats["failed"] += 1
+                continue
+            cache.put(p, result)
+            p.extra = dict(p.extra or {}, enrichment=result)
+            stats["enriched"] += 1
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Enrich papers with translated titles and structured summaries")
+    parser.add_argument("--input", nargs="+", required=True, help="Paper sources (.json or .jsonl)")
+    parser.add_argument("--output", type=str, required=True, help="Enriched papers JSON")
+    parser.add_argument("--backend", type=str, default=ENRICH_BACKEND or "stub", choices=sorted(BACKENDS))
+    parser.add_argument("--cache-dir", type=str, default=ENRICH_CACHE_DIR)
+    parser.add_argument("--batch-size", type=int, default=None)
+    parser.add_argument("--limit", type=int, default=None, help="Only enrich the first N papers")
+    args = parser.parse_args(argv)
+
+    papers = list(as_papers(iter_records(args.input)))
+    targets = papers[:args.limit] if args.limit else papers
+    stats = enrich_papers(targets, args.backend, args.cache_dir, args.batch_size)
+    dump_document(args.output, {"papers": [p.to_dict() for p in papers]})
+    print(f"Enriched {len(targets)} papers with {args.backend}: {stats['cached']} cached, "
+          f"{stats['enriched']} new, {stats['failed']} failed -> {args.output}")
+    return 0 if not stats["failed"] else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 静态 HTML 归档站点
+把 /workspace/daily-papers 下的日报 / 周报 / 月报渲染为静态 HTML，并预先构建分片的客户端搜索索引，
+不需要服务器即可浏览和搜索全部历史报告。
+
+- 页面：每份报告一个 reports/<name>.html，index.html 按日期倒序列出全部报告并提供搜索框
+- 索引：词项（英文单词 + 中文二元组）按 FNV-1a 哈希分到 SEARCH_SHARDS 个分片，
+  倒排表写在 search/shard-xx.js（JSONP：dpShard(i, {...})）；查询时浏览器用 <script> 只加载
+  查询词所在的分片，直接用 file:// 打开也能搜索，不需要静态服务器
+- 链接：报告中的链接只保留 http / https，其它协议（javascript: 等）按纯文本输出
+- 增量：search/state.json 记录每份报告的内容哈希及其词项所在分片，只有新增 / 变化 / 删除的
+  报告会被重新渲染，也只重写受影响的分片
+
+用法:
+  python export_site.py [--reports-dir /workspace/daily-papers] [--output /workspace/site]
+  python export_site.py --rebuild        # 忽略已有索引，全部重建
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import urllib.parse
+from collections import Counter
+
+from feishu import parse_text_with_styles
+
+REPORTS_DIR = "/workspace/daily-papers"
+SITE_DIR = "/workspace/site"
+
+# 搜索索引分片数（浏览器按需加载；改动后需 --rebuild）
+SEARCH_SHARDS = 64
+
+# 页面模板 / 分词规则变化时递增，已导出的报告会全部重新生成
+SITE_VERSION = "2"
+
+_DAILY_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})-cn\.md$")
+_PERIOD_RE = re.compile(r"^(weekly|monthly)-(\d{4}-\d{2}-\d{2})-to-(\d{4}-\d{2}-\d{2})\.md$")
+
+KIND_LABELS = {"daily": "日报", "weekly": "周报", "monthly": "月报"}
+
+# 与 SEARCH_JS 中的 tokenize 保持一致
+_TERM_RE = re.compile(r"[a-z0-9]+|[\u4e00-\u9fff]+")
+
+STYLE = """
+body{max-width:860px;margin:2em auto;padding:0 1em;font:16px/1.7 -apple-system,"PingFang SC","Microsoft YaHei",sans-serif;color:#222}
+a{color:#3370ff;text-decoration:none}a:hover{text-decoration:underline}
+h1{font-size:1.6em}h2{margin-top:1.6em;border-bottom:1px solid #eee}code{background:#f4f4f4;padding:0 .3em}
+nav{margin-bottom:1.5em}.kind{display:inline-block;min-width:3em;color:#888;font-size:.85em}
+#q{width:100%;padding:.5em;font-size:1em;box-sizing:border-box}#results li,#reports li{margin:.2em 0}
+"""
+
+SEARCH_JS = """
+const SHARDS = %(shards)d;
+const KINDS = %(kinds)s;
+const cache = {}, loaders = {};
+let docs = null;
+// 分片与文档表是 JSONP 脚本（file:// 下不能 fetch），加载后回调 dpShard / dpDocs
+function dpShard(i, data) { if (loaders["shard" + i]) loaders["shard" + i](data); }
+function dpDocs(data) { if (loaders.docs) loaders.docs(data); }
+function load(src, key, fallback) {
+  return new Promise(resolve => {
+    loaders[key] = resolve;
+    const s = document.createElement("script");
+    s.src = src;
+    s.onerror = () => resolve(fallback);
+    document.head.appendChild(s);
+  });
+}
+function fnv(s) {
+  let h = 0x811c9dc5;
+  for (let i = 0; i < s.length; i++) { h ^= s.charCodeAt(i); h = Math.imul(h, 16777619) >>> 0; }
+  return h;
+}
+function tokenize(text) {
+  const out = [];
+  for (const m of text.toLowerCase().matchAll(/[a-z0-9]+|[\\u4e00-\\u9fff]+/g)) {
+    const w = m[0];
+    if (/^[a-z0-9]/.test(w)) { if (w.length > 1) out.push(w); }
+    else if (w.length === 1) out.push(w);
+    else for (let i = 0; i < w.length - 1; i++) out.push(w.slice(i, i + 2));
+  }
+  return [...new Set(out)];
+}
+function shard(i) {
+  if (!cache[i]) cache[i] = load("search/shard-" + i.toString(16).padStart(2, "0") + ".js", "shard" + i, {});
+  return cache[i];
+}
+async function search(query) {
+  const terms = tokenize(query);
+  if (!terms.length) return [];
+  if (!docs) docs = await load("search/docs.js", "docs", []);
+  const postings = await Promise.all(terms.map(t => shard(fnv(t) %% SHARDS).then(s => s[t] || [])));
+  let scores = null;
+  for (const list of postings) {
+    const next = new Map();
+    for (const [id, tf] of list) if (!scores || scores.has(id)) next.set(id, (scores ? scores.get(id) : 0) + tf);
+    scores = next;
+  }
+  return [...scores].map(([id, score]) => ({doc: docs[id], score}))
+    .filter(r => r.doc).sort((a, b) => b.score - a.score || b.doc.date.localeCompare(a.doc.date)).slice(0, 50);
+}
+const esc = s => s.replace(/[&<>"]/g, c => ({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;"})[c]);
+const q = document.getElementById("q"), results = document.getElementById("results");
+let pending = 0;
+q.addEventListener("input", async () => {
+  const ticket = ++pending, hits = await search(q.value);
+  if (ticket !== pending) return;
+  results.innerHTML = hits.map(h => `<li><span class="kind">${KINDS[h.doc.kind]}</span> <a href="${h.doc.url}">${esc(h.doc.title)}</a></li>`).join("");
+  document.getElementById("reports").style.display = q.value.trim() ? "none" : "";
+});
+"""
+
+
+def report_info(name: str):
+    """从文件名识别报告类型和日期，不是日报 / 周报 / 月报时返回 None"""
+    m = _DAILY_RE.match(name)
+    if m:
+        return "daily", m.group(1)
+    m = _PERIOD_RE.match(name)
+    if m:
+        return m.group(1), m.group(3)
+    return None
+
+
+def list_reports(reports_dir: str) -> dict:
+    """{报告名: (路径, 类型, 日期)}"""
+    reports = {}
+    if not os.path.isdir(reports_dir):
+        return reports
+    for name in os.listdir(reports_dir):
+        info = report_info(name)
+        if info:
+            stem = os.path.splitext(name)[0]
+            reports[stem] = (os.path.join(reports_dir, name),) + info
+    return reports
+
+
+# ---------- Markdown → HTML ----------
+
+def safe_url(url: str):
+    """只允许 http / https 链接，其它协议（javascript:、data: 等）返回 None"""
+    url = (url or "").strip()
+    try:
+        scheme = urllib.parse.urlsplit(url).scheme.lower()
+    except ValueError:
+        return None
+    return url if scheme in ("http", "https") else None
+
+
+def inline_html(text: str) -> tuple:
+    """行内 markdown → (HTML, 纯文本)，与飞书发布共用同一套行内解析"""
+    parts, plain = [], []
+    for el in parse_text_with_styles(text):
+        run = el["text_run"]
+        content = run["content"]
+        style = run.get("text_element_style", {})
+        piece = html.escape(content)
+        if style.get("inline_code"):
+            piece = f"<code>{piece}</code>"
+        if style.get("bold"):
+            piece = f"<strong>{piece}</strong>"
+        if style.get("italic"):
+            piece = f"<em>{piece}</em>"
+        if style.get("strikethrough"):
+            piece = f"<del>{piece}</del>"
+        url = safe_url(style["link"]["url"]) if "link" in style else None
+        if url:
+            piece = f'<a href="{html.escape(url)}">{piece}</a>'
+        parts.append(piece)
+        plain.append(content)
+    return "".join(parts), "".join(plain)
+
+
+def markdown_to_html(content: str) -> tuple:
+    """报告 markdown → (标题, 正文 HTML, 纯文本)"""
+    title, body, text = "", [], []
+    in_list = False
+    for line in content.split("\n"):
+        stripped = line.strip()
+        is_bullet = stripped.startswith(("- ", "* "))
+        if in_list and not is_bullet:
+            body.append("</ul>")
+            in_list = False
+        if not stripped:
+            continue
+        heading = re.match(r"^(#{1,6})\s+(.*)$", stripped)
+        if heading:
+            level = len(heading.group(1))
+            rendered, plain = inline_html(heading.group(2))
+            title = title or plain
+            body.append(f"<h{level}>{rendered}</h{level}>")
+        elif stripped in ("---", "***"):
+            body.append("<hr>")
+            continue
+        elif is_bullet:
+            if not in_list:
+                body.append("<ul>")
+                in_list = True
+            rendered, plain = inline_html(stripped[2:])
+            body.append(f"<li>{rendered}</li>")
+        else:
+            rendered, plain = inline_html(stripped)
+            body.append(f"<p>{rendered}</p>")
+        text.append(plain)
+    if in_list:
+        body.append("</ul>")
+    return title, "\n".join(body), "\n".join(text)
+
+
+def page(title: str, body: str, root: str = None) -> str:
+    """完整 HTML 页面；root 为站点根目录的相对路径，给出时页首带返回首页的链接"""
+    nav = "" if root is None else f'<nav><a href="{root}index.html">← 全部报告</a></nav>\n'
+    return (
+        '<!DOCTYPE html>\n<html lang="zh-CN">\n<head>\n<meta charset="utf-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+        f"<title>{html.escape(title)}</title>\n<style>{STYLE}</style>\n</head>\n<body>\n"
+        f"{nav}{body}\n</body>\n</html>\n"
+    )
+
+
+# ---------- 搜索索引 ----------
+
+def tokenize(text: str) -> list:
+    """英文 / 数字按单词、中文按相邻二元组切分（与 SEARCH_JS 一致）"""
+    terms = []
+    for w in _TERM_RE.findall(text.lower()):
+        if w[0].isascii():
+            if len(w) > 1:
+                terms.append(w)
+        elif len(w) == 1:
+            terms.append(w)
+        else:
+            terms.extend(w[i:i + 2] for i in range(len(w) - 1))
+    return terms
+
+
+def shard_of(term: str, shards: int = SEARCH_SHARDS) -> int:
+    """32 位 FNV-1a（词项都在 BMP 内，码点即浏览器端的 UTF-16 码元）"""
+    h = 0x811C9DC5
+    for ch in term:
+        h = ((h ^ ord(ch)) * 16777619) & 0xFFFFFFFF
+    return h % shards
+
+
+def _write_text(path: str, text: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def _write_json(path: str, obj):
+    _write_text(path, _dumps(obj))
+
+
+def _write_jsonp(path: str, callback: str, *args):
+    """JSONP 脚本 callback(arg, ...);"""
+    _write_text(path, f"{callback}({','.join(_dumps(a) for a in args)});\n")
+
+
+def _read_shard(path: str) -> dict:
+    """读回 dpShard(i, {...}); 中的倒排表"""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    return json.loads(text[text.index(",") + 1:text.rindex(")")])
+
+
+class SearchIndex:
+    """分片倒排索引：分片按需加载，只回写被修改的分片"""
+
+    def __init__(self, site_dir: str, rebuild: bool = False):
+        self.search_dir = os.path.join(site_dir, "search")
+        self.state_path = os.path.join(self.search_dir, "state.json")
+        self.state = {"version": SITE_VERSION, "shards": SEARCH_SHARDS, "next_id": 0, "docs": {}}
+        if not rebuild and os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            # 分片数或站点版本变化时全量重建（旧版本的分片格式不同）
+            if state.get("shards") == SEARCH_SHARDS and state.get("version") == SITE_VERSION:
+                self.state = state
+        self.rebuild = rebuild or self.state["next_id"] == 0
+        self._shards = {}
+        self._dirty = set()
+
+    @property
+    def docs(self) -> dict:
+        return self.state["docs"]
+
+    def _shard_path(self, i: int) -> str:
+        return os.path.join(self.search_dir, f"shard-{i:02x}.js")
+
+    def _shard(self, i: int) -> dict:
+        if i not in self._shards:
+            path = self._shard_path(i)
+            if not self.rebuild and os.path.exists(path):
+                self._shards[i] = _read_shard(path)
+            else:
+                self._shards[i] = {}
+        return self._shards[i]
+
+    def remove(self, name: str):
+        entry = self.docs.pop(name, None)
+        if not entry:
+            return
+        doc_id = entry["id"]
+        for i in entry["shards"]:
+            shard = self._shard(i)
+            for term in [t for t, postings in shard.items() if any(p[0] == doc_id for p in postings)]:
+                remaining = [p for p in shard[term] if p[0] != doc_id]
+                if remaining:
+                    shard[term] = remaining
+                else:
+                    del shard[term]
+            self._dirty.add(i)
+
+    def add(self, name: str, meta: dict, text: str):
+        previous = self.docs.get(name)
+        self.remove(name)
+        # 更新的报告沿用原 id，docs.json 中的空位只来自已删除的报告
+        if previous:
+            doc_id = previous["id"]
+        else:
+            doc_id = self.state["next_id"]
+            self.state["next_id"] += 1
+        touched = set()
+        for term, tf in Counter(tokenize(text)).items():
+            i = shard_of(term)
+            self._shard(i).setdefault(term, []).append([doc_id, tf])
+            touched.add(i)
+        self._dirty |= touched
+        self.docs[name] = dict(meta, id=doc_id, shards=sorted(touched))
+
+    def save(self):
+        for i in sorted(self._dirty):
+            _write_jsonp(self._shard_path(i), "dpShard", i, self._shards[i])
+        if self.rebuild:
+            # 全量重建时把没有词项的分片也写成空表，避免浏览器请求到旧分片
+            for i in range(SEARCH_SHARDS):
+                if i not in self._dirty:
+                    _write_jsonp(self._shard_path(i), "dpShard", i, {})
+        # docs.js 按文档 id 索引（已删除的报告留空位）
+        table = [None] * self.state["next_id"]
+        for entry in self.docs.values():
+            table[entry["id"]] = {k: entry[k] for k in ("title", "url", "date", "kind")}
+        _write_jsonp(os.path.join(self.search_dir, "docs.js"), "dpDocs", table)
+        _write_json(self.state_path, self.state)
+        written = len(self._dirty)
+        self._dirty.clear()
+        return written
+
+
+# ---------- 导出 ----------
+
+def render_index(docs: dict) -> str:
+    entries = sorted(docs.values(), key=lambda d: (d["date"], d["kind"]), reverse=True)
+    items = "\n".join(
+        f'<li><span class="kind">{KIND_LABELS[d["kind"]]}</span> '
+        f'<a href="{d["url"]}">{html.escape(d["title"])}</a></li>'
+        for d in entries
+    )
+    body = (
+        "<h1>具身智能论文速递 · 归档</h1>\n"
+        '<input id="q" type="search" placeholder="搜索论文、机构、关键词…" autofocus>\n'
+        '<ul id="results"></ul>\n'
+        f'<ul id="reports">\n{items}\n</ul>\n'
+        f"<script>{SEARCH_JS % {'shards': SEARCH_SHARDS, 'kinds': json.dumps(KIND_LABELS, ensure_ascii=False)}}</script>"
+    )
+    return page("具身智能论文速递 · 归档", body)
+
+
+def export_site(reports_dir: str = REPORTS_DIR, site_dir: str = SITE_DIR, rebuild: bool = False) -> dict:
+    """导出站点，返回 {"added": n, "updated": n, "removed": n, "unchanged": n}"""
+    index = SearchIndex(site_dir, rebuild=rebuild)
+    reports = list_reports(reports_dir)
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+    for name in [n for n in index.docs if n not in reports]:
+        index.remove(name)
+        page_path = os.path.join(site_dir, "reports", f"{name}.html")
+        if os.path.exists(page_path):
+            os.remove(page_path)
+        stats["removed"] += 1
+
+    for name, (path, kind, day) in sorted(reports.items(), key=lambda kv: kv[1][2]):
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read()
+        digest = hashlib.sha256((SITE_VERSION + content).encode("utf-8")).hexdigest()
+        url = f"reports/{name}.html"
+        page_path = os.path.join(site_dir, url)
+        previous = index.docs.get(name)
+        if previous and previous["hash"] == digest and os.path.exists(page_path):
+            stats["unchanged"] += 1
+            continue
+
+        title, body, text = markdown_to_html(content)
+        title = title or name
+        os.makedirs(os.path.dirname(page_path), exist_ok=True)
+        with open(page_path, "w", encoding="utf-8") as f:
+            f.write(page(title, body, root="../"))
+        index.add(name, {"title": title, "url": url, "date": day, "kind": kind, "hash": digest}, text)
+        stats["updated" if previous else "added"] += 1
+
+    shards = index.save()
+    with open(os.path.join(site_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(render_index(index.docs))
+    print(f"Exported {len(reports)} reports to {site_dir}: {stats['added']} added, {stats['updated']} updated, "
+          f"{stats['removed']} removed, {shards} index shards rewritten")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export reports to a static HTML site with client-side search")
+    parser.add_argument("--reports-dir", type=str, default=REPORTS_DIR, help="Directory with report markdown")
+    parser.add_argument("--output", type=str, default=SITE_DIR, help="Site output directory")
+    parser.add_argument("--rebuild", action="store_true", help="Re-render every report and rebuild the index")
+    args = parser.parse_args(argv)
+
+    export_site(args.reports_dir, args.output, rebuild=args.rebuild)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -5,96 +5,186 @@ Daily Paper - 飞书文档写入脚本
 """
 
 import argparse
-import requests
+import difflib
+import hashlib
+import itertools
 import json
+import os
 import re
+import string
+import time
+import unicodedata
+import uuid
 from typing import List, Dict
 
-# 飞书应用凭证
-FEISHU_APP_ID = "cli_a99c1819e3f4900b"
-FEISHU_APP_SECRET = "qvYVoPKbRyicpoPXYcBG9bn6AIoKmezw"
+from feishu_client import get_tenant_token, request as feishu_request
+from report_model import is_model, load_report, render_feishu_blocks
 
 
-def get_tenant_token() -> str:
-    """获取飞书 tenant_access_token"""
-    resp = requests.post(
-        "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal",
-        json={"app_id": FEISHU_APP_ID, "app_secret": FEISHU_APP_SECRET}
-    )
-    data = resp.json()
-    if data.get("code") != 0:
-        raise Exception(f"Failed to get token: {data}")
-    return data["tenant_access_token"]
+# 行内标记之外的普通文本（一次跳过整段）
+_PLAIN_RE = re.compile(r'[^\\`*_~\[\]]+')
+
+
+# 反斜杠只转义 ASCII 标点（CommonMark），其它字符前的反斜杠按原文保留（C:\Users、\pi）
+_ESCAPABLE = frozenset(string.punctuation)
+
+
+def _is_space(ch: str) -> bool:
+    """行首 / 行尾按空白处理"""
+    return not ch or ch.isspace()
+
+
+def _is_punct(ch: str) -> bool:
+    return bool(ch) and unicodedata.category(ch)[0] in "PS"
+
+
+def _flanking(ch: str, before: str, after: str) -> tuple:
+    """
+    分隔符串能否 (开启, 闭合) 强调，按 CommonMark 的左 / 右侧翼规则：
+    左侧翼 = 后一字符不是空白，且不是标点或前一字符是空白 / 标点；右侧翼对称。
+    _ 不能在单词内部开启或闭合（snake_case、$\pi_{\theta}$）
+    """
+    left = not _is_space(after) and (not _is_punct(after) or _is_space(before) or _is_punct(before))
+    right = not _is_space(before) and (not _is_punct(before) or _is_space(after) or _is_punct(after))
+    if ch == '_':
+        return left and (not right or _is_punct(before)), right and (not left or _is_punct(after))
+    return left, right
 
 
 def parse_text_with_styles(text: str) -> List[Dict]:
-    """解析文本中的 markdown 格式，返回飞书 elements 数组"""
-    elements = []
-    pos = 0
+    """
+    解析文本中的 markdown 行内格式，返回飞书 elements 数组
+    单遍扫描（线性时间）：支持 **粗体** / __粗体__、*斜体* / _斜体_、~~删除线~~、`代码`、
+    [链接](url) 以及相互嵌套（如链接中的粗体）；未闭合的标记按原文输出，相邻同样式片段合并
+    * / _ / ~~ 能否开启、闭合按 CommonMark 侧翼规则判断，反斜杠只转义 ASCII 标点
+    """
+    # 片段：[文本, 所在的标记 id 元组]；标记：id -> [样式, 是否闭合, 链接 url]
+    segments = []
+    markers = {}
+    # 当前打开的标记：样式 -> 标记 id（链接单独用栈，支持 [ 出现在链接文字中）
+    open_styles = {}
+    link_stack = []
     
-    # Pattern for bold: **text**
-    bold_pattern = re.compile(r'\*\*([^*]+)\*\*')
-    # Pattern for link: [text](url)
-    link_pattern = re.compile(r'\[([^\]]+)\]\(([^)]+)\)')
+    def active():
+        return tuple(open_styles.values()) + tuple(link_stack)
     
-    while pos < len(text):
-        # Find next bold
-        bold_match = bold_pattern.search(text, pos)
-        # Find next link
-        link_match = link_pattern.search(text, pos)
-        
-        # Determine which comes first
-        next_match = None
-        match_type = None
+    def open_marker(style, literal):
+        marker_id = len(markers)
+        markers[marker_id] = [style, False, None]
+        # 占位片段：标记未闭合时输出原文
+        segments.append([literal, (), marker_id])
+        return marker_id
+    
+    # 已确认在当前位置之后不再出现的闭合字符（避免反复向后查找，保证线性）
+    exhausted = set()
+    
+    def find_close(ch, start):
+        if ch in exhausted:
+            return -1
+        pos = text.find(ch, start)
+        if pos == -1:
+            exhausted.add(ch)
+        return pos
+    
+    n = len(text)
+    i = 0
+    while i < n:
+        plain = _PLAIN_RE.match(text, i)
+        if plain:
+            segments.append([plain.group(), active(), None])
+            i = plain.end()
+            continue
         
-        if bold_match and link_match:
-            if bold_match.start() < link_match.start():
-                next_match = bold_match
-                match_type = 'bold'
+        ch = text[i]
+        if ch == '\\':
+            if i + 1 < n and text[i + 1] in _ESCAPABLE:
+                segments.append([text[i + 1], active(), None])
+                i += 2
             else:
-                next_match = link_match
-                match_type = 'link'
-        elif bold_match:
-            next_match = bold_match
-            match_type = 'bold'
-        elif link_match:
-            next_match = link_match
-            match_type = 'link'
-            
-        if next_match:
-            # Add text before match
-            if next_match.start() > pos:
-                elements.append({"text_run": {"content": text[pos:next_match.start()]}})
-            
-            if match_type == 'bold':
-                content = next_match.group(1)
-                elements.append({
-                    "text_run": {
-                        "content": content,
-                        "text_element_style": {"bold": True}
-                    }
-                })
-            elif match_type == 'link':
-                content = next_match.group(1)
-                url = next_match.group(2)
-                elements.append({
-                    "text_run": {
-                        "content": content,
-                        "text_element_style": {
-                            "link": {"url": url}
-                        }
-                    }
-                })
-            
-            pos = next_match.end()
+                segments.append(['\\', active(), None])
+                i += 1
+        elif ch == '`':
+            close = find_close('`', i + 1)
+            if close == -1:
+                segments.append(['`', active(), None])
+                i += 1
+            else:
+                marker_id = len(markers)
+                markers[marker_id] = ["inline_code", True, None]
+                segments.append([text[i + 1:close], active() + (marker_id,), None])
+                i = close + 1
+        elif ch in '*_~':
+            run = 2 if text.startswith(ch * 2, i) else 1
+            if ch == '~' and run == 1:
+                segments.append(['~', active(), None])
+                i += 1
+                continue
+            style = {('*', 2): "bold", ('_', 2): "bold", ('*', 1): "italic",
+                     ('_', 1): "italic", ('~', 2): "strikethrough"}[(ch, run)]
+            before = text[i - 1] if i > 0 else ''
+            after = text[i + run] if i + run < n else ''
+            can_open, can_close = _flanking(ch, before, after)
+            if style in open_styles and can_close:
+                markers[open_styles.pop(style)][1] = True
+            elif can_open:
+                open_styles[style] = open_marker(style, ch * run)
+            else:
+                segments.append([ch * run, active(), None])
+            i += run
+        elif ch == '[':
+            link_stack.append(open_marker("link", '['))
+            i += 1
+        elif ch == ']' and link_stack:
+            close = find_close(')', i + 2) if text.startswith('(', i + 1) else -1
+            if close == -1:
+                # 不是链接：对应的 [ 按原文输出
+                link_stack.pop()
+                segments.append([']', active(), None])
+                i += 1
+                continue
+            marker = markers[link_stack.pop()]
+            marker[1] = True
+            marker[2] = text[i + 2:close]
+            i = close + 1
         else:
-            # No more matches
-            elements.append({"text_run": {"content": text[pos:]}})
-            break
-            
+            segments.append([ch, active(), None])
+            i += 1
+    
+    # 组装：只有闭合的标记生效，同样式的相邻片段合并
+    elements = []
+    resolved = {}
+    last_key = None
+    for content, marker_ids, placeholder in segments:
+        if placeholder is not None:
+            if markers[placeholder][1]:
+                continue
+            marker_ids = ()
+        if not content:
+            continue
+        if marker_ids not in resolved:
+            style = {}
+            for marker_id in marker_ids:
+                kind, closed, url = markers[marker_id]
+                if not closed:
+                    continue
+                if kind == "link":
+                    style["link"] = {"url": url}
+                else:
+                    style[kind] = True
+            resolved[marker_ids] = (json.dumps(style, sort_keys=True), style)
+        key, style = resolved[marker_ids]
+        if key == last_key:
+            elements[-1]["text_run"]["content"] += content
+            continue
+        run = {"content": content}
+        if style:
+            run["text_element_style"] = dict(style)
+        elements.append({"text_run": run})
+        last_key = key
+    
     if not elements:
         elements = [{"text_run": {"content": text}}]
-        
+    
     return elements
 
 
@@ -138,6 +228,21 @@ def make_heading_block(level: int, text: str) -> Dict:
     }
 
 
+def make_quote_block(text: str) -> Dict:
+    """创建引用块（以斜体文本呈现）"""
+    elements = parse_text_with_styles(text)
+    # 添加斜体样式
+    for elem in elements:
+        if "text_run" in elem:
+            if "text_element_style" not in elem["text_run"]:
+                elem["text_run"]["text_element_style"] = {}
+            elem["text_run"]["text_element_style"]["italic"] = True
+    return {
+        "block_type": 2,
+        "text": {"elements": elements}
+    }
+
+
 def make_divider() -> Dict:
     """创建分隔线"""
     return {"block_type": 22, "divider": {}}
@@ -213,18 +318,7 @@ def parse_markdown_to_blocks(content: str) -> List[Dict]:
         elif stripped.startswith('> '):
             # 引用块 - 转为斜体文本
             list_stack = []
-            quote_text = stripped[2:]
-            elements = parse_text_with_styles(quote_text)
-            # 添加斜体样式
-            for elem in elements:
-                if "text_run" in elem:
-                    if "text_element_style" not in elem["text_run"]:
-                        elem["text_run"]["text_element_style"] = {}
-                    elem["text_run"]["text_element_style"]["italic"] = True
-            children.append({
-                "block_type": 2,
-                "text": {"elements": elements}
-            })
+            children.append(make_quote_block(stripped[2:]))
         elif stripped:
             list_stack = []
             children.append(make_text_block(stripped))
@@ -232,30 +326,418 @@ def parse_markdown_to_blocks(content: str) -> List[Dict]:
     return children
 
 
-def write_to_feishu_doc(doc_id: str, blocks: List[Dict], token: str, prepend: bool = True) -> bool:
+def parse_markdown_to_tree(content: str) -> List[Dict]:
+    """
+    将 Markdown 转换为飞书块树：嵌套列表项作为父列表块的 children（真正的嵌套），
+    其余块与 parse_markdown_to_blocks 一致
+    """
+    roots = []
+    # 当前列表路径：[(indent_level, block)]
+    list_stack = []
+    
+    for line in content.split('\n'):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        
+        heading = re.match(r'^(#{1,4}) ', line)
+        if heading:
+            list_stack = []
+            level = len(heading.group(1))
+            roots.append(make_heading_block(level, line[level + 1:]))
+        elif line.startswith('---'):
+            list_stack = []
+            roots.append(make_divider())
+        elif stripped.startswith('- ') or re.match(r'^\d+\.\s+', stripped):
+            block = make_bullet_block(stripped) if stripped.startswith('- ') else make_numbered_block(stripped)
+            indent_level = get_indent_level(line)
+            while list_stack and list_stack[-1][0] >= indent_level:
+                list_stack.pop()
+            if list_stack:
+                list_stack[-1][1].setdefault("children", []).append(block)
+            else:
+                roots.append(block)
+            list_stack.append((indent_level, block))
+        elif stripped.startswith('> '):
+            list_stack = []
+            roots.append(make_quote_block(stripped[2:]))
+        else:
+            list_stack = []
+            roots.append(make_text_block(stripped))
+    
+    return roots
+
+
+def tree_size(node: Dict) -> int:
+    """块树中的块总数"""
+    return 1 + sum(tree_size(c) for c in node.get("children", ()))
+
+
+def flatten_tree(nodes: List[Dict], descendants: List[Dict], counter: List[int]) -> List[str]:
+    """把块树展开为 descendant 接口的扁平列表（临时 block_id + children id 列表），返回这一层的 id"""
+    ids = []
+    for node in nodes:
+        counter[0] += 1
+        block_id = f"tmp_{counter[0]}"
+        block = {k: v for k, v in node.items() if k != "children"}
+        block["block_id"] = block_id
+        descendants.append(block)
+        child_ids = flatten_tree(node.get("children", []), descendants, counter)
+        if child_ids:
+            block["children"] = child_ids
+        ids.append(block_id)
+    return ids
+
+
+# 单次创建子块的上限（飞书接口限制）与重试参数
+MAX_BATCH_SIZE = 50
+# descendant 接口单次最多创建的块数（含嵌套子块）
+MAX_DESCENDANTS = 1000
+MAX_RETRIES = 4
+RETRY_BACKOFF = 1.0
+
+# 请求体过大（HTTP 413）/ 块数超出限制：缩小批次后重试
+# 参数错误（1770001 等）不在其中，直接失败，不把坏请求拆成单块逐个重试
+SIZE_ERROR_CODES = {413, 1770004}
+# 限流 / 服务端暂时不可用 / 网络异常：原批次退避后重试
+RETRY_ERROR_CODES = {-1, 429, 500, 502, 503, 504, 99991400, 1771001}
+
+
+def write_with_retry(method: str, path: str, payload: Dict, token: str, label: str = "Batch") -> Dict:
+    """
+    写入类请求：限流 / 网络错误原地退避重试，其它错误直接返回
+    同一请求重试时复用 client_token，避免超时后重复写入
+    """
+    params = {"document_revision_id": -1, "client_token": str(uuid.uuid4())}
+    result = {}
+    for attempt in range(MAX_RETRIES):
+        try:
+            result = feishu_request(method, path, token=token, params=params, json=payload)
+        except Exception as e:
+            result = {"code": -1, "msg": str(e)}
+        code = result.get("code")
+        if code == 0 or code in SIZE_ERROR_CODES or code not in RETRY_ERROR_CODES:
+            break
+        delay = RETRY_BACKOFF * (2 ** attempt)
+        print(f"{label} error: {result.get('msg')}, retrying in {delay:.0f}s")
+        time.sleep(delay)
+    return result
+
+
+def listed_block_ids(doc_id: str, parent_id: str, index: int, count: int, token: str) -> List[str]:
+    """
+    接口响应里缺少新块 id 时重新列出 parent_id 的子块补齐：index 处起 count 个（index=-1 时取末尾 count 个）
+    仍然拿不到时抛出 RuntimeError，避免清单里记下 None
+    """
+    if index >= 0:
+        items = list(itertools.islice(iter_children(doc_id, parent_id, token), index + count))[index:]
+    else:
+        items = list(iter_children(doc_id, parent_id, token))[-count:] if count else []
+    ids = [item.get("block_id") for item in items]
+    if len(ids) != count or not all(ids):
+        raise RuntimeError(f"created {count} blocks but could not read back their ids")
+    return ids
+
+
+def create_children(doc_id: str, parent_id: str, blocks: List[Dict], token: str,
+                    index: int = -1) -> List[str]:
+    """
+    在 parent_id 下从 index 处依次插入 blocks（index=-1 追加到末尾），返回成功插入的块 id 列表
+    响应里缺少块 id 时重新列出子块补齐，仍拿不到时抛出 RuntimeError
+    - 批次从 MAX_BATCH_SIZE 开始，遇到请求体过大类错误时减半后重试
+    - 限流 / 网络错误原地退避重试（见 write_with_retry）
+    - 只有批次成功后才推进 index，某一批次最终失败时立即停止，不留下错位的后续内容
+    """
+    created = []
+    size = MAX_BATCH_SIZE
+    batch_no = 0
+    while len(created) < len(blocks):
+        pos = len(created)
+        batch = blocks[pos:pos + size]
+        payload = {"children": batch}
+        if index >= 0:
+            payload["index"] = index
+        result = write_with_retry("POST", f"/docx/v1/documents/{doc_id}/blocks/{parent_id}/children",
+                                  payload, token, label=f"Batch {batch_no + 1}")
+        code = result.get("code")
+        if code == 0:
+            batch_no += 1
+            ids = [c.get("block_id") for c in result.get("data", {}).get("children", [])]
+            if len(ids) != len(batch) or not all(ids):
+                ids = listed_block_ids(doc_id, parent_id, index, len(batch), token)
+            created += ids
+            if index >= 0:
+                index += len(batch)
+            print(f"Batch {batch_no}: Added {len(batch)} blocks")
+        elif code in SIZE_ERROR_CODES and size > 1:
+            size = max(1, len(batch) // 2)
+            print(f"Batch {batch_no + 1} too large ({result.get('msg')}), shrinking to {size} blocks")
+        else:
+            print(f"Batch {batch_no + 1} error: {result.get('msg')}")
+            break
+    return created
+
+
+def _is_section_start(node: Dict) -> bool:
+    return node.get("block_type") in (3, 4, 5, 6)
+
+
+def create_descendants(doc_id: str, parent_id: str, nodes: List[Dict], token: str,
+                       index: int = -1) -> List[str]:
+    """
+    用 descendant 接口在 parent_id 下从 index 处插入整棵块树，返回成功插入的顶层块 id 列表
+    每次调用尽量装满 MAX_DESCENDANTS 个块，并在章节（标题）边界处切分；
+    请求体过大时减小单次块数，失败重试与停止策略同 create_children
+    """
+    created = []
+    limit = MAX_DESCENDANTS
+    call_no = 0
+    while len(created) < len(nodes):
+        pos = len(created)
+        # 装入尽量多的完整子树
+        end, total = pos, 0
+        while end < len(nodes) and (end == pos or total + tree_size(nodes[end]) <= limit):
+            total += tree_size(nodes[end])
+            end += 1
+        # 没装完时回退到本组最后一个章节开头，让章节不被拆到两次调用里
+        if end < len(nodes) and not _is_section_start(nodes[end]):
+            for cut in range(end - 1, pos, -1):
+                if _is_section_start(nodes[cut]):
+                    end = cut
+                    break
+        group = nodes[pos:end]
+        
+        descendants = []
+        children_id = flatten_tree(group, descendants, [0])
+        payload = {"children_id": children_id, "descendants": descendants}
+        if index >= 0:
+            payload["index"] = index
+        result = write_with_retry("POST", f"/docx/v1/documents/{doc_id}/blocks/{parent_id}/descendant",
+                                  payload, token, label=f"Call {call_no + 1}")
+        code = result.get("code")
+        if code == 0:
+            call_no += 1
+            relations = {r.get("temporary_block_id"): r.get("block_id")
+                         for r in result.get("data", {}).get("block_id_relations", [])}
+            ids = [relations.get(t) for t in children_id]
+            if not all(ids):
+                ids = listed_block_ids(doc_id, parent_id, index, len(group), token)
+            created += ids
+            if index >= 0:
+                index += len(group)
+            print(f"Call {call_no}: Added {len(descendants)} blocks ({len(group)} top-level)")
+        elif code in SIZE_ERROR_CODES and len(group) > 1:
+            limit = max(1, sum(tree_size(n) for n in group) // 2)
+            print(f"Call {call_no + 1} too large ({result.get('msg')}), shrinking to {limit} blocks")
+        else:
+            print(f"Call {call_no + 1} error: {result.get('msg')}")
+            break
+    return created
+
+
+def delete_children(doc_id: str, parent_id: str, start_index: int, end_index: int, token: str) -> bool:
+    """删除 parent_id 下 [start_index, end_index) 范围的子块"""
+    result = feishu_request(
+        "DELETE", f"/docx/v1/documents/{doc_id}/blocks/{parent_id}/children/batch_delete",
+        token=token, params={"document_revision_id": -1},
+        json={"start_index": start_index, "end_index": end_index}
+    )
+    return result.get("code") == 0
+
+
+# 已发布报告的块清单（block id + 内容哈希），用于重发时增量同步
+MANIFEST_DIR = "/workspace/data/feishu-manifests"
+
+# 可以原地改写文字内容的块类型 → 块内容字段
+TEXT_BLOCK_KEYS = {2: "text", 3: "heading1", 4: "heading2", 5: "heading3", 6: "heading4",
+                   12: "bullet", 13: "ordered"}
+# batch_update 单次最多的更新请求数
+MAX_UPDATE_BATCH = 200
+
+
+def block_hash(node: Dict) -> str:
+    """块（含子树）内容哈希"""
+    data = json.dumps(node, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def manifest_path(doc_id: str, report_path: str, manifest_dir: str = MANIFEST_DIR) -> str:
+    return os.path.join(manifest_dir, doc_id, os.path.basename(report_path) + ".json")
+
+
+def load_manifest(path: str):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(path: str, doc_id: str, blocks: List[Dict], ids: List[str], nested: bool):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    manifest = {
+        "doc_id": doc_id,
+        "nested": nested,
+        "blocks": [
+            {"id": block_id, "hash": block_hash(node), "type": node.get("block_type"),
+             "children": bool(node.get("children"))}
+            for node, block_id in zip(blocks, ids)
+        ],
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def iter_children(doc_id: str, parent_id: str, token: str, page_size: int = 500):
+    """
+    惰性分页遍历 parent_id 的子块：按需逐页请求（page_token），调用方停止迭代后不再请求
+    只需要开头几个块时传较小的 page_size（如顶部插入只需第一个块，page_size=1）
+    """
+    page_token = None
+    while True:
+        params = {"page_size": page_size, "document_revision_id": -1}
+        if page_token:
+            params["page_token"] = page_token
+        resp = feishu_request(
+            "GET", f"/docx/v1/documents/{doc_id}/blocks/{parent_id}/children", token=token, params=params
+        )
+        if resp.get("code") not in (0, None):
+            raise RuntimeError(f"Failed to list blocks: {resp.get('msg')}")
+        data = resp.get("data", {})
+        yield from data.get("items", [])
+        page_token = data.get("page_token")
+        if not data.get("has_more") or not page_token:
+            return
+
+
+def update_text_blocks(doc_id: str, updates: List[tuple], token: str) -> bool:
+    """批量改写块的文字内容 updates=[(block_id, block)]"""
+    for i in range(0, len(updates), MAX_UPDATE_BATCH):
+        requests_ = [
+            {"block_id": block_id,
+             "update_text_elements": {"elements": block[TEXT_BLOCK_KEYS[block["block_type"]]]["elements"]}}
+            for block_id, block in updates[i:i + MAX_UPDATE_BATCH]
+        ]
+        result = write_with_retry("PATCH", f"/docx/v1/documents/{doc_id}/blocks/batch_update",
+                                  {"requests": requests_}, token, label="Update")
+        if result.get("code") != 0:
+            print(f"Update error: {result.get('msg')}")
+            return False
+    return True
+
+
+def sync_feishu_doc(doc_id: str, blocks: List[Dict], token: str, manifest: Dict, nested: bool = False):
+    """
+    按清单增量同步已发布的报告：对比新旧块哈希序列，只改写 / 插入 / 删除变化的块
+    返回新的块 id 列表；清单中的块在文档里已不连续（被手动编辑过）时返回 None，由调用方整体重发；
+    同步中途失败时抛出 RuntimeError（文档已部分修改，需用 --full 重发）
+    """
+    blocks = blocks + [make_divider()]
+    old = manifest["blocks"]
+    old_ids = [b["id"] for b in old]
+    if not old_ids:
+        return None
+    
+    # 定位报告在文档中的起始位置，并确认清单中的块仍然连续
+    base, current = None, []
+    # 报告通常在文档顶部，第一页取清单长度即可
+    page_size = min(500, max(len(old_ids), 50))
+    for i, item in enumerate(iter_children(doc_id, doc_id, token, page_size=page_size)):
+        block_id = item.get("block_id")
+        if base is None and block_id == old_ids[0]:
+            base = i
+        if base is not None:
+            current.append(block_id)
+            if len(current) == len(old_ids):
+                break
+    if current != old_ids:
+        print("Published blocks no longer match the manifest")
+        return None
+    
+    new_hashes = [block_hash(b) for b in blocks]
+    opcodes = difflib.SequenceMatcher(None, [b["hash"] for b in old], new_hashes, autojunk=False).get_opcodes()
+    changed = sum(1 for op in opcodes if op[0] != "equal")
+    print(f"Sync: {len(old)} -> {len(blocks)} blocks, {changed} changed ranges")
+    
+    # 从后往前处理，前面范围的下标不受影响
+    segments, updates = [], []
+    for tag, i1, i2, j1, j2 in reversed(opcodes):
+        if tag == "equal":
+            segments.append(old_ids[i1:i2])
+            continue
+        if tag == "replace" and i2 - i1 == j2 - j1 and all(
+            o["type"] == n.get("block_type") and o["type"] in TEXT_BLOCK_KEYS
+            and not o["children"] and not n.get("children")
+            for o, n in zip(old[i1:i2], blocks[j1:j2])
+        ):
+            # 块类型不变，只改写文字
+            updates += list(zip(old_ids[i1:i2], blocks[j1:j2]))
+            segments.append(old_ids[i1:i2])
+            continue
+        if i2 > i1 and not delete_children(doc_id, doc_id, base + i1, base + i2, token):
+            raise RuntimeError(f"failed to delete blocks {i1}-{i2}")
+        created = []
+        if j2 > j1:
+            create = create_descendants if nested else create_children
+            created = create(doc_id, doc_id, blocks[j1:j2], token, index=base + i1)
+            if len(created) < j2 - j1:
+                raise RuntimeError(f"failed to insert blocks {j1}-{j2}")
+        segments.append(created)
+    
+    if updates and not update_text_blocks(doc_id, updates, token):
+        raise RuntimeError("failed to update changed blocks")
+    print(f"Sync: {len(updates)} blocks rewritten in place")
+    return [block_id for seg in reversed(segments) for block_id in seg]
+
+
+def delete_manifest_blocks(doc_id: str, manifest: Dict, token: str) -> int:
+    """
+    删除清单中记录、仍在文档里的顶层块（上一次发布的同一份报告），返回删除的块数
+    整篇重发前调用，避免文档里同时留下新旧两份；手动插入的其它块不受影响。
+    按连续区间从后往前删除，前面区间的下标不变；删除失败时抛出 RuntimeError
+    """
+    ids = {b["id"] for b in manifest.get("blocks", [])}
+    if not ids:
+        return 0
+    positions = [i for i, item in enumerate(iter_children(doc_id, doc_id, token))
+                 if item.get("block_id") in ids]
+    runs = []
+    for i in positions:
+        if runs and runs[-1][1] == i:
+            runs[-1][1] = i + 1
+        else:
+            runs.append([i, i + 1])
+    for start, end in reversed(runs):
+        if not delete_children(doc_id, doc_id, start, end, token):
+            raise RuntimeError(f"failed to delete previously published blocks {start}-{end}")
+    return len(positions)
+
+
+def write_to_feishu_doc(doc_id: str, blocks: List[Dict], token: str, prepend: bool = True,
+                        nested: bool = False, manifest: str = None) -> bool:
     """将内容块写入飞书文档
     
     Args:
         doc_id: 飞书文档 ID
-        blocks: 要写入的内容块
+        blocks: 要写入的内容块（nested=True 时为 parse_markdown_to_tree 生成的块树）
         token: 飞书 access token
         prepend: True=插入到顶部（时间倒序），False=追加到底部
+        nested: True=用 descendant 接口整树创建（保留列表嵌套，请求更少）
+        manifest: 写入成功后把块清单保存到该路径，供重发时增量同步
     """
     
-    # 获取文档现有块
-    blocks_resp = requests.get(
-        f"https://open.feishu.cn/open-apis/docx/v1/documents/{doc_id}/blocks/{doc_id}/children",
-        headers={"Authorization": f"Bearer {token}"}
-    )
-    existing_blocks = blocks_resp.json().get("data", {}).get("items", [])
-    
     # 在新内容后添加分隔线
     blocks = blocks + [make_divider()]
     
+    # 顶部插入只需要知道文档是否已有内容：只取第一个子块（page_size=1），
+    # 文档越来越长也不影响发布开销；追加到末尾时不需要读取
+    first_block = next(iter_children(doc_id, doc_id, token, page_size=1), None) if prepend else None
+    
     # 确定插入位置
-    if prepend and existing_blocks:
+    if first_block is not None:
         # 插入到第一个块之前
-        first_block_id = existing_blocks[0].get("block_id")
+        first_block_id = first_block.get("block_id")
         index = 0
         print(f"Prepending before block: {first_block_id}")
     else:
@@ -265,60 +747,93 @@ def write_to_feishu_doc(doc_id: str, blocks: List[Dict], token: str, prepend: bo
         print("Appending to end of document")
     
     # 批量创建块
-    batch_size = 30
-    success_count = 0
+    create = create_descendants if nested else create_children
+    try:
+        created = create(doc_id, doc_id, blocks, token, index=index)
+    except RuntimeError as e:
+        # 块已写入但拿不到 id，无法记录清单或撤回，需人工检查文档
+        print(f"Error: {e}; check the document before republishing")
+        return False
+    success_count = len(created)
+    print(f"Total blocks added: {success_count}/{len(blocks)}")
     
-    for i in range(0, len(blocks), batch_size):
-        batch = blocks[i:i+batch_size]
-        
-        # 构建请求
-        payload = {"children": batch}
-        if prepend and existing_blocks:
-            payload["index"] = index
-            # 每批次后更新 index（已插入的块数）
-            index += len(batch)
-        
-        resp = requests.post(
-            f"https://open.feishu.cn/open-apis/docx/v1/documents/{doc_id}/blocks/{doc_id}/children",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            },
-            json=payload
-        )
-        result = resp.json()
-        if result.get("code") == 0:
-            success_count += len(batch)
-            print(f"Batch {i//batch_size + 1}: Added {len(batch)} blocks")
-        else:
-            print(f"Batch {i//batch_size + 1} error: {result.get('msg')}")
+    if manifest and success_count == len(blocks):
+        save_manifest(manifest, doc_id, blocks, created, nested)
     
-    print(f"Total blocks added: {success_count}/{len(blocks)}")
+    if success_count < len(blocks) and success_count and index == 0:
+        # 顶部插入失败时撤回已插入的部分，避免文档里留下半份报告
+        if delete_children(doc_id, doc_id, 0, success_count, token):
+            print(f"Rolled back {success_count} partially written blocks")
+        else:
+            print("Warning: failed to roll back partially written blocks")
     return success_count == len(blocks)
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Write Daily Paper to Feishu Doc")
-    parser.add_argument("--input", type=str, required=True, help="Input markdown file")
+    parser.add_argument("--input", type=str, required=True,
+                        help="Input markdown file, or report model JSON from the generators")
     parser.add_argument("--doc-id", type=str, required=True, help="Feishu document ID")
     parser.add_argument("--append", action="store_true", help="Append to end instead of prepend to top")
-    args = parser.parse_args()
-    
-    # 读取 markdown 文件
-    with open(args.input, "r", encoding="utf-8") as f:
-        content = f.read()
+    parser.add_argument("--nested", action="store_true",
+                        help="Create a real block tree (nested lists) via the descendant API")
+    parser.add_argument("--manifest-dir", type=str, default=MANIFEST_DIR,
+                        help="Where block manifests of published reports are kept")
+    parser.add_argument("--full", action="store_true",
+                        help="Publish the whole report again instead of syncing changes")
+    args = parser.parse_args(argv)
     
-    print(f"Read {len(content)} characters from {args.input}")
-    
-    # 转换为飞书块
-    blocks = parse_markdown_to_blocks(content)
-    print(f"Parsed {len(blocks)} blocks")
+    if is_model(args.input):
+        # 结构化报告模型：直接渲染为飞书块，不经过 markdown 解析
+        blocks = render_feishu_blocks(load_report(args.input), nested=args.nested)
+        print(f"Rendered {len(blocks)} blocks from report model {args.input}")
+    else:
+        # 读取 markdown 文件
+        with open(args.input, "r", encoding="utf-8") as f:
+            content = f.read()
+        print(f"Read {len(content)} characters from {args.input}")
+        
+        # 转换为飞书块
+        if args.nested:
+            blocks = parse_markdown_to_tree(content)
+            print(f"Parsed {sum(tree_size(b) for b in blocks)} blocks ({len(blocks)} top-level)")
+        else:
+            blocks = parse_markdown_to_blocks(content)
+            print(f"Parsed {len(blocks)} blocks")
     
     # 获取 token
     token = get_tenant_token()
     
+    # 同一份报告已发布过：按清单只同步变化的块
+    # 模型 JSON 与同名 Markdown 共用一份清单，切换输入格式不会导致整篇重发
+    report_name = os.path.splitext(args.input)[0] + ".md" if is_model(args.input) else args.input
+    mpath = manifest_path(args.doc_id, report_name, args.manifest_dir)
+    published = load_manifest(mpath)
+    previous = None if args.full else published
+    if previous is not None:
+        try:
+            ids = sync_feishu_doc(args.doc_id, blocks, token, previous, nested=args.nested)
+        except RuntimeError as e:
+            print(f"Sync failed: {e}; rerun with --full to publish the whole report")
+            return 1
+        if ids is not None:
+            save_manifest(mpath, args.doc_id, blocks + [make_divider()], ids, args.nested)
+            print(f"Successfully synced https://chj.feishu.cn/docx/{args.doc_id}")
+            return 0
+        print("Publishing the whole report instead")
+    
+    if published is not None:
+        # 整篇重发：先删掉上一次发布的同一份报告，文档里不会出现两份
+        try:
+            removed = delete_manifest_blocks(args.doc_id, published, token)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            return 1
+        print(f"Removed {removed} blocks of the previously published copy")
+    
     # 写入飞书（默认 prepend=True，即新内容放顶部）
-    success = write_to_feishu_doc(args.doc_id, blocks, token, prepend=not args.append)
+    success = write_to_feishu_doc(args.doc_id, blocks, token, prepend=not args.append,
+                                  nested=args.nested, manifest=mpath)
     
     if success:
         print(f"Successfully wrote to https://chj.feishu.cn/docx/{args.doc_id}")
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 飞书 API 公共客户端
+- tenant_access_token：内存 + 磁盘缓存（有效期约 2 小时），到期前 REFRESH_MARGIN 秒主动刷新，
+  多次发布 / 多个脚本之间复用，不必每次都走一次鉴权请求
+- 所有请求共用一个带连接池的 requests.Session，复用 TLS 连接
+- token 被服务端判定失效时自动刷新并重试一次
+
+feishu.py、create_feishu_doc.py 等脚本统一通过本模块访问飞书。
+"""
+
+import json
+import os
+import threading
+import time
+
+# 飞书应用凭证
+FEISHU_APP_ID = "cli_a99c1819e3f4900b"
+FEISHU_APP_SECRET = "qvYVoPKbRyicpoPXYcBG9bn6AIoKmezw"
+
+FEISHU_API = "https://open.feishu.cn/open-apis"
+
+# 磁盘 token 缓存（跨进程复用）
+TOKEN_CACHE_PATH = "/tmp/daily-paper/feishu_token.json"
+
+# 距过期不足该秒数时主动刷新
+REFRESH_MARGIN = 300
+
+# 连接池大小 / 请求超时（秒）
+POOL_SIZE = 8
+REQUEST_TIMEOUT = 30
+
+# 表示 token 无效或过期的错误码
+TOKEN_ERROR_CODES = {99991661, 99991663, 99991668}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """进程内共享的连接池 Session（首次使用时才导入 requests）"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+class TokenProvider:
+    """tenant_access_token 提供者：内存缓存 → 磁盘缓存 → 请求新 token"""
+
+    def __init__(self, app_id: str = FEISHU_APP_ID, app_secret: str = FEISHU_APP_SECRET,
+                 cache_path: str = TOKEN_CACHE_PATH):
+        self.app_id = app_id
+        self.app_secret = app_secret
+        self.cache_path = cache_path
+        self._token = None
+        self._expire_at = 0.0
+        self._lock = threading.Lock()
+
+    def _fresh(self, expire_at: float) -> bool:
+        return time.time() < expire_at - REFRESH_MARGIN
+
+    def _load_disk(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        entry = data.get(self.app_id)
+        if entry and self._fresh(entry.get("expire_at", 0)):
+            self._token = entry["token"]
+            self._expire_at = entry["expire_at"]
+
+    def _save_disk(self):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            data = {}
+            if os.path.exists(self.cache_path):
+                try:
+                    with open(self.cache_path, "r", encoding="utf-8") as f:
+                        data = json.load(f)
+                except ValueError:
+                    data = {}
+            data[self.app_id] = {"token": self._token, "expire_at": self._expire_at}
+            tmp = f"{self.cache_path}.tmp{os.getpid()}"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            print(f"Warning: cannot write token cache {self.cache_path}: {e}")
+
+    def _request_token(self):
+        resp = get_session().post(
+            f"{FEISHU_API}/auth/v3/tenant_access_token/internal",
+            json={"app_id": self.app_id, "app_secret": self.app_secret},
+            timeout=REQUEST_TIMEOUT,
+        )
+        data = resp.json()
+        if data.get("code") != 0:
+            raise Exception(f"Failed to get token: {data}")
+        self._token = data["tenant_access_token"]
+        self._expire_at = time.time() + data.get("expire", 7200)
+        self._save_disk()
+
+    def get(self, force: bool = False) -> str:
+        """返回有效 token；force=True 时忽略缓存重新获取"""
+        with self._lock:
+            if not force and self._token and self._fresh(self._expire_at):
+                return self._token
+            if not force:
+                self._load_disk()
+                if self._token and self._fresh(self._expire_at):
+                    return self._token
+            self._request_token()
+            return self._token
+
+    def invalidate(self):
+        with self._lock:
+            self._token = None
+            self._expire_at = 0.0
+
+
+_default_provider = TokenProvider()
+
+
+def get_tenant_token(force: bool = False) -> str:
+    """获取飞书 tenant_access_token（默认应用，带缓存）"""
+    return _default_provider.get(force)
+
+
+def request(method: str, path: str, token: str = None, **kwargs) -> dict:
+    """
+    调用飞书开放接口，返回解析后的 JSON
+    path 为 /open-apis 之后的部分（如 /docx/v1/documents）；未传 token 时使用默认应用的
+    缓存 token，并在 token 失效时刷新后重试一次
+    """
+    url = path if path.startswith("http") else FEISHU_API + path
+    kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+    headers = dict(kwargs.pop("headers", None) or {})
+    for attempt in range(2):
+        headers["Authorization"] = f"Bearer {token or get_tenant_token(force=attempt > 0)}"
+        resp = get_session().request(method, url, headers=headers, **kwargs)
+        try:
+            data = resp.json()
+        except ValueError:
+            data = {"code": resp.status_code, "msg": resp.text[:200]}
+        if token is None and data.get("code") in TOKEN_ERROR_CODES and attempt == 0:
+            continue
+        return data
+    return data
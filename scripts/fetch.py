@@ -2,15 +2,23 @@
 """
 Daily Paper - arXiv 论文获取脚本
 用法: python daily_paper_fetch.py [--date YYYY-MM-DD] [--output /path/to/output.json]
+      python daily_paper_fetch.py --start 2026-01-01 --end 2026-01-31 [--shard-by day|category] [--workers 2]
 """
 
 import argparse
-import json
+import os
+import threading
+import time
 import urllib.request
 import urllib.parse
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
-import re
+
+from affiliations import canonical_affiliation, match_affiliations, normalize_affiliations
+from authors import find_tracked_author
+from jsonio import JsonlWriter, dump_document, is_stream, load_document
+from records import Paper
 
 # 重点关注机构
 PRIORITY_AFFILIATIONS = [
@@ -39,6 +47,9 @@ PRIORITY_SERIES = [
     "JEPA", "I-JEPA", "V-JEPA",
 ]
 
+# 重点机构的规范名（别名表见 affiliations.py），判断时为集合查找
+_PRIORITY_CANONICAL = frozenset(canonical_affiliation(aff) for aff in PRIORITY_AFFILIATIONS)
+
 # 筛选主题关键词
 TOPIC_KEYWORDS = {
     "VLA": [
@@ -59,19 +70,73 @@ TOPIC_KEYWORDS = {
     ],
 }
 
-def fetch_arxiv_papers(date_str: str, categories: list = None) -> list:
+# 主题关键词（小写），模块加载时构建；进程池的每个 worker 导入模块时各构建一次
+_TOPIC_MATCHERS = [(topic, [kw.lower() for kw in keywords]) for topic, keywords in TOPIC_KEYWORDS.items()]
+
+# 论文数不少于该值时自动启用进程池打分；每个任务的论文数
+PARALLEL_MIN_PAPERS = 20000
+SCORE_CHUNK_SIZE = 2000
+
+ARXIV_API = "http://export.arxiv.org/api/query"
+ARXIV_NS = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom",
+            "opensearch": "http://a9.com/-/spec/opensearch/1.1/"}
+DEFAULT_CATEGORIES = ["cs.RO", "cs.LG", "cs.CV", "cs.AI"]
+
+# 回填：arXiv API 要求请求间隔不少于 3 秒；每页条数；分片进度目录
+ARXIV_REQUEST_INTERVAL = 3.0
+BACKFILL_PAGE_SIZE = 200
+BACKFILL_CHECKPOINT_DIR = "/tmp/daily-paper/backfill"
+
+
+def parse_entry(entry) -> Paper:
+    """把 arXiv Atom entry 解析为 Paper"""
+    ns = ARXIV_NS
+    # PDF 链接
+    pdf_link = None
+    for link in entry.findall("atom:link", ns):
+        if link.get("title") == "pdf":
+            pdf_link = link.get("href")
+            break
+
+    # 分类
+    categories = []
+    for cat in entry.findall("arxiv:primary_category", ns):
+        if cat.get("term"):
+            categories.append(cat.get("term"))
+    for cat in entry.findall("atom:category", ns):
+        term = cat.get("term")
+        if term and term not in categories:
+            categories.append(term)
+
+    # 作者与机构（arxiv:affiliation 为作者的子元素，按别名表归一化）
+    authors, affiliations = [], []
+    for author in entry.findall("atom:author", ns):
+        authors.append(author.find("atom:name", ns).text)
+        affiliations.extend(aff.text for aff in author.findall("arxiv:affiliation", ns) if aff.text)
+
+    return Paper(
+        id=entry.find("atom:id", ns).text.split("/abs/")[-1],
+        title=entry.find("atom:title", ns).text.strip().replace("\n", " "),
+        summary=entry.find("atom:summary", ns).text.strip().replace("\n", " "),
+        authors=authors,
+        affiliations=normalize_affiliations(affiliations),
+        published=entry.find("atom:published", ns).text,
+        link=entry.find("atom:id", ns).text,
+        pdf_link=pdf_link,
+        categories=categories,
+    )
+
+
+def iter_arxiv_papers(date_str: str, categories: list = None):
     """
-    从 arXiv API 获取指定日期的论文
+    从 arXiv API 获取指定日期的论文，逐条解析产出
     """
     if categories is None:
-        categories = ["cs.RO", "cs.LG", "cs.CV", "cs.AI"]
+        categories = DEFAULT_CATEGORIES
     
     # 构建查询
     cat_query = " OR ".join([f"cat:{cat}" for cat in categories])
     
-    # arXiv API URL
-    base_url = "http://export.arxiv.org/api/query"
-    
     # 查询参数 - 获取最近的论文
     params = {
         "search_query": cat_query,
@@ -80,7 +145,7 @@ def fetch_arxiv_papers(date_str: str, categories: list = None) -> list:
         "max_results": 300,
     }
     
-    url = f"{base_url}?{urllib.parse.urlencode(params)}"
+    url = f"{ARXIV_API}?{urllib.parse.urlencode(params)}"
     
     print(f"Fetching from arXiv: {url[:100]}...")
     
@@ -89,19 +154,17 @@ def fetch_arxiv_papers(date_str: str, categories: list = None) -> list:
             xml_data = response.read().decode('utf-8')
     except Exception as e:
         print(f"Error fetching arXiv: {e}")
-        return []
+        return
     
     # 解析 XML
     root = ET.fromstring(xml_data)
-    ns = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
     
-    papers = []
     target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
     
-    for entry in root.findall("atom:entry", ns):
+    for entry in root.findall("atom:entry", ARXIV_NS):
         try:
             # 获取发布日期
-            published = entry.find("atom:published", ns).text
+            published = entry.find("atom:published", ARXIV_NS).text
             pub_date = datetime.fromisoformat(published.replace("Z", "+00:00")).date()
             
             # 只保留目标日期前后 3 天的论文（考虑时区差异）
@@ -109,111 +172,132 @@ def fetch_arxiv_papers(date_str: str, categories: list = None) -> list:
             if date_diff > 3:
                 continue
             
-            # 提取信息
-            paper = {
-                "id": entry.find("atom:id", ns).text.split("/abs/")[-1],
-                "title": entry.find("atom:title", ns).text.strip().replace("\n", " "),
-                "summary": entry.find("atom:summary", ns).text.strip().replace("\n", " "),
-                "authors": [author.find("atom:name", ns).text for author in entry.findall("atom:author", ns)],
-                "published": published,
-                "link": entry.find("atom:id", ns).text,
-                "pdf_link": None,
-                "categories": [],
-            }
-            
-            # PDF 链接
-            for link in entry.findall("atom:link", ns):
-                if link.get("title") == "pdf":
-                    paper["pdf_link"] = link.get("href")
-                    break
-            
-            # 分类
-            for cat in entry.findall("arxiv:primary_category", ns):
-                paper["categories"].append(cat.get("term"))
-            for cat in entry.findall("atom:category", ns):
-                term = cat.get("term")
-                if term and term not in paper["categories"]:
-                    paper["categories"].append(term)
-            
-            papers.append(paper)
+            yield parse_entry(entry)
             
         except Exception as e:
             continue
-    
+
+
+def fetch_arxiv_papers(date_str: str, categories: list = None) -> list:
+    """
+    从 arXiv API 获取指定日期的论文
+    """
+    papers = list(iter_arxiv_papers(date_str, categories))
     print(f"Fetched {len(papers)} papers from arXiv")
     return papers
 
 
-def check_topic_relevance(paper: dict) -> dict:
+def check_topic_relevance(paper: Paper) -> Paper:
     """
     检查论文与主题的相关性
     """
-    text = (paper["title"] + " " + paper["summary"]).lower()
+    text = (paper.title + " " + paper.summary).lower()
     
     relevance = {"VLA": 0, "World Model": 0, "RL": 0}
     
-    for topic, keywords in TOPIC_KEYWORDS.items():
+    for topic, keywords in _TOPIC_MATCHERS:
         for kw in keywords:
-            if kw.lower() in text:
+            if kw in text:
                 relevance[topic] += 1
     
-    paper["topic_relevance"] = relevance
-    paper["primary_topic"] = max(relevance, key=relevance.get) if max(relevance.values()) > 0 else None
-    paper["is_relevant"] = max(relevance.values()) > 0
+    paper.topic_relevance = relevance
+    paper.primary_topic = max(relevance, key=relevance.get) if max(relevance.values()) > 0 else None
+    paper.is_relevant = max(relevance.values()) > 0
     
     return paper
 
 
-def check_priority(paper: dict) -> dict:
+def check_priority(paper: Paper) -> Paper:
     """
-    检查是否来自重点机构或属于重点系列
+    检查是否来自重点机构、属于重点系列，以及作者中是否有追踪作者
+    重点机构取两部分的并集：机构信息的规范名（优先），以及用别名索引扫描标题 / 摘要 / 作者的结果
+    （机构字段不全时，如只抽到部分作者的机构或摘要中点名 LeCun，也不会漏判）
     """
-    text = paper["title"] + " " + paper["summary"] + " " + " ".join(paper["authors"])
-    
-    # 检查重点机构（使用单词边界匹配，避免 "submit" 匹配到 "MIT"）
-    paper["priority_affiliation"] = None
-    for aff in PRIORITY_AFFILIATIONS:
-        # 对于短缩写（如 MIT, FAIR），使用单词边界匹配
-        if len(aff) <= 4:
-            pattern = r'\b' + re.escape(aff) + r'\b'
-            if re.search(pattern, text, re.IGNORECASE):
-                paper["priority_affiliation"] = aff
-                break
-        else:
-            if aff.lower() in text.lower():
-                paper["priority_affiliation"] = aff
-                break
+    text = paper.title + " " + paper.summary + " " + " ".join(paper.authors)
+    
+    text_lower = text.lower()
+    
+    # 检查重点机构
+    candidates = [canonical_affiliation(aff) for aff in paper.affiliations]
+    candidates += match_affiliations(text, free_text=True)
+    paper.priority_affiliation = next((aff for aff in candidates if aff in _PRIORITY_CANONICAL), None)
     
     # 检查重点系列
-    paper["priority_series"] = None
+    paper.priority_series = None
     for series in PRIORITY_SERIES:
-        if series.lower() in text.lower():
-            paper["priority_series"] = series
+        if series.lower() in text_lower:
+            paper.priority_series = series
             break
     
-    paper["is_priority"] = paper["priority_affiliation"] is not None or paper["priority_series"] is not None
+    paper.is_priority = paper.priority_affiliation is not None or paper.priority_series is not None
+    
+    # 追踪作者（归一化姓名索引，每个作者一次哈希查找；S2 抓取时已标记的保留）
+    if not paper.tracked_author:
+        paper.tracked_author = find_tracked_author(paper.authors)
     
     return paper
 
 
-def filter_and_rank_papers(papers: list) -> list:
+# 打分产生的字段（进程池 worker 只回传这些字段，避免来回序列化整篇论文）
+SCORE_FIELDS = ("topic_relevance", "primary_topic", "is_relevant",
+                "priority_affiliation", "priority_series", "is_priority", "tracked_author")
+
+
+def _score_chunk(chunk: list) -> list:
+    """worker 端：对一批 (title, summary, authors, affiliations, tracked_author) 打分，返回各篇的打分字段"""
+    results = []
+    for title, summary, authors, affiliations, tracked_author in chunk:
+        paper = Paper(title=title, summary=summary, authors=authors, affiliations=affiliations,
+                      tracked_author=tracked_author)
+        check_topic_relevance(paper)
+        check_priority(paper)
+        results.append(tuple(getattr(paper, f) for f in SCORE_FIELDS))
+    return results
+
+
+def score_papers(papers: list, workers: int = 0, chunk_size: int = SCORE_CHUNK_SIZE) -> list:
+    """
+    为论文计算主题相关性和优先级（原地更新）
+    workers=0 时按规模自动选择：少于 PARALLEL_MIN_PAPERS 篇在当前进程内完成，
+    否则按 chunk_size 分块交给进程池，结果按输入顺序写回
+    """
+    if workers <= 0:
+        workers = (os.cpu_count() or 1) if len(papers) >= PARALLEL_MIN_PAPERS else 1
+    if workers == 1 or len(papers) <= chunk_size:
+        for paper in papers:
+            check_topic_relevance(paper)
+            check_priority(paper)
+        return papers
+
+    chunks = [
+        [(p.title, p.summary, p.authors, p.affiliations, p.tracked_author) for p in papers[i:i + chunk_size]]
+        for i in range(0, len(papers), chunk_size)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # map 按提交顺序返回，论文与结果一一对应
+        scored = (values for chunk in pool.map(_score_chunk, chunks) for values in chunk)
+        for paper, values in zip(papers, scored):
+            for field, value in zip(SCORE_FIELDS, values):
+                setattr(paper, field, value)
+    return papers
+
+
+def filter_and_rank_papers(papers: list, workers: int = 0) -> list:
     """
     筛选和排序论文
     """
     # 添加相关性和优先级信息
-    for paper in papers:
-        check_topic_relevance(paper)
-        check_priority(paper)
+    score_papers(papers, workers)
     
     # 只保留相关论文
-    relevant_papers = [p for p in papers if p["is_relevant"]]
+    relevant_papers = [p for p in papers if p.is_relevant]
     
     print(f"Relevant papers: {len(relevant_papers)}")
     
     # 排序：优先级 > 相关性分数
     def sort_key(p):
-        priority_score = 10 if p["is_priority"] else 0
-        relevance_score = sum(p["topic_relevance"].values())
+        priority_score = 10 if p.is_priority else 0
+        relevance_score = sum(p.topic_relevance.values())
         return (priority_score, relevance_score)
     
     relevant_papers.sort(key=sort_key, reverse=True)
@@ -221,25 +305,201 @@ def filter_and_rank_papers(papers: list) -> list:
     return relevant_papers
 
 
-def main():
+# ---------- 多日回填 ----------
+
+class RateLimiter:
+    """跨线程共享的请求间隔限制"""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def backfill_shards(start: str, end: str, by: str = "day", categories: list = None) -> list:
+    """把日期区间拆成分片 [(shard_id, day, categories)]；by="category" 时按天 × 分类拆分"""
+    categories = categories or DEFAULT_CATEGORIES
+    d0 = datetime.strptime(start, "%Y-%m-%d").date()
+    d1 = datetime.strptime(end, "%Y-%m-%d").date()
+    shards = []
+    day = d0
+    while day <= d1:
+        if by == "category":
+            for cat in categories:
+                shards.append((f"{day.isoformat()}_{cat}", day, [cat]))
+        else:
+            shards.append((day.isoformat(), day, categories))
+        day += timedelta(days=1)
+    return shards
+
+
+def fetch_shard(day, categories: list, limiter: RateLimiter, retries: int = 3) -> list:
+    """
+    按提交日期区间查询一天的论文，分页直到取完
+    （submittedDate 范围查询不受「最新 300 条」限制）
+    """
+    stamp = day.strftime("%Y%m%d")
+    cat_query = " OR ".join([f"cat:{cat}" for cat in categories])
+    query = f"({cat_query}) AND submittedDate:[{stamp}0000 TO {stamp}2359]"
+    papers = []
+    offset = 0
+    while True:
+        params = {
+            "search_query": query,
+            "sortBy": "submittedDate",
+            "sortOrder": "ascending",
+            "start": offset,
+            "max_results": BACKFILL_PAGE_SIZE,
+        }
+        url = f"{ARXIV_API}?{urllib.parse.urlencode(params)}"
+        for attempt in range(retries):
+            limiter.wait()
+            try:
+                with urllib.request.urlopen(url, timeout=60) as response:
+                    root = ET.fromstring(response.read())
+                break
+            except Exception as e:
+                if attempt == retries - 1:
+                    raise
+                print(f"  {stamp} page {offset}: {e}, retrying")
+                time.sleep(ARXIV_REQUEST_INTERVAL * (attempt + 1))
+
+        entries = root.findall("atom:entry", ARXIV_NS)
+        for entry in entries:
+            try:
+                papers.append(parse_entry(entry))
+            except Exception:
+                continue
+        total_el = root.find("opensearch:totalResults", ARXIV_NS)
+        total = int(total_el.text) if total_el is not None else 0
+        offset += len(entries)
+        if not entries or offset >= total:
+            return papers
+
+
+def backfill_arxiv_papers(start: str, end: str, by: str = "day", categories: list = None,
+                          workers: int = 2, checkpoint_dir: str = BACKFILL_CHECKPOINT_DIR):
+    """
+    多日回填：各分片并发抓取（共享 arXiv 请求间隔），每个完成的分片立即写入
+    checkpoint_dir/<shard>.json（未打分的原始论文，打分规则变化后无需重新抓取）；
+    中断后重跑时已完成的分片直接读取，不再请求。按分片完成顺序产出 Paper（跨分片按 id 去重）。
+    """
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    limiter = RateLimiter(ARXIV_REQUEST_INTERVAL)
+    shards = backfill_shards(start, end, by, categories)
+
+    def shard_path(shard_id):
+        return os.path.join(checkpoint_dir, f"{shard_id}.json")
+
+    def run_shard(shard):
+        shard_id, day, cats = shard
+        papers = fetch_shard(day, cats, limiter)
+        tmp = shard_path(shard_id) + ".tmp"
+        dump_document(tmp, {"shard": shard_id, "total_fetched": len(papers),
+                            "papers": [p.to_dict() for p in papers]})
+        os.replace(tmp, shard_path(shard_id))
+        return shard_id, papers
+
+    seen = set()
+
+    def emit(papers):
+        for paper in papers:
+            if paper.id not in seen:
+                seen.add(paper.id)
+                yield paper
+
+    pending = []
+    for shard in shards:
+        path = shard_path(shard[0])
+        if os.path.exists(path):
+            yield from emit(Paper.from_dict(p) for p in load_document(path)["papers"])
+        else:
+            pending.append(shard)
+    print(f"Backfill {start} ~ {end}: {len(shards)} shards, {len(shards) - len(pending)} already done")
+
+    failed = []
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_shard, shard): shard[0] for shard in pending}
+        for fut in as_completed(futures):
+            try:
+                shard_id, papers = fut.result()
+            except Exception as e:
+                failed.append(futures[fut])
+                print(f"  shard {futures[fut]} failed: {e}")
+                continue
+            print(f"  shard {shard_id}: {len(papers)} papers")
+            yield from emit(papers)
+    if failed:
+        raise RuntimeError(f"{len(failed)} shards failed ({', '.join(sorted(failed))}); rerun to resume")
+
+
+def main(argv=None):
     parser = argparse.ArgumentParser(description="Fetch arXiv papers for Daily Paper")
     parser.add_argument("--date", type=str, default=None, help="Target date (YYYY-MM-DD)")
-    parser.add_argument("--output", type=str, default="/tmp/arxiv_papers.json", help="Output JSON file")
-    args = parser.parse_args()
-    
-    # 默认获取昨天的论文
-    if args.date is None:
-        target_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    parser.add_argument("--start", type=str, default=None, help="Backfill start date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, default=None, help="Backfill end date (YYYY-MM-DD), defaults to --start")
+    parser.add_argument("--shard-by", choices=["day", "category"], default="day",
+                        help="Backfill shard granularity")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent backfill shards")
+    parser.add_argument("--checkpoint-dir", type=str, default=None,
+                        help=f"Completed backfill shards (default {BACKFILL_CHECKPOINT_DIR}/<start>_<end>)")
+    parser.add_argument("--score-workers", type=int, default=0,
+                        help=f"Processes for scoring (default: all cores from {PARALLEL_MIN_PAPERS} papers up)")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="Max papers in a .json output (default 80, unlimited for backfill)")
+    parser.add_argument("--output", type=str, default="/tmp/arxiv_papers.json",
+                        help="Output file (.json document, or .jsonl to stream records as they are scored)")
+    args = parser.parse_args(argv)
+    
+    if args.start:
+        # 多日回填
+        end = args.end or args.start
+        target_date = f"{args.start}~{end}"
+        checkpoint_dir = args.checkpoint_dir or os.path.join(
+            BACKFILL_CHECKPOINT_DIR, f"{args.start}_{end}_{args.shard_by}")
+        source = backfill_arxiv_papers(args.start, end, by=args.shard_by, workers=args.workers,
+                                       checkpoint_dir=checkpoint_dir)
+        limit = args.limit
     else:
-        target_date = args.date
+        # 默认获取昨天的论文
+        if args.date is None:
+            target_date = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        else:
+            target_date = args.date
+        source = iter_arxiv_papers(target_date)
+        limit = args.limit or 80  # 最多 80 篇候选
     
     print(f"Fetching papers for date: {target_date}")
     
+    if is_stream(args.output):
+        # 流式输出：每篇相关论文打分后立即追加，排序交给下游
+        total = 0
+        with JsonlWriter(args.output) as out:
+            for paper in source:
+                total += 1
+                check_topic_relevance(paper)
+                check_priority(paper)
+                if paper.is_relevant:
+                    out.write(paper.to_dict())
+            out.close({"date": target_date, "total_fetched": total})
+        print(f"Streamed {out.count}/{total} relevant papers to {args.output}")
+        return
+    
     # 获取论文
-    papers = fetch_arxiv_papers(target_date)
+    papers = list(source)
+    print(f"Fetched {len(papers)} papers from arXiv")
     
     # 筛选和排序
-    filtered_papers = filter_and_rank_papers(papers)
+    filtered_papers = filter_and_rank_papers(papers, workers=args.score_workers)
+    selected = filtered_papers[:limit] if limit else filtered_papers
     
     # 输出结果
     result = {
@@ -247,21 +507,20 @@ def main():
         "fetch_time": datetime.now().isoformat(),
         "total_fetched": len(papers),
         "total_relevant": len(filtered_papers),
-        "papers": filtered_papers[:80],  # 最多 80 篇候选
+        "papers": [p.to_dict() for p in selected],
     }
     
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    dump_document(args.output, result)
     
-    print(f"Saved {len(filtered_papers[:80])} papers to {args.output}")
+    print(f"Saved {len(selected)} papers to {args.output}")
     
     # 打印统计
     by_topic = {"VLA": 0, "World Model": 0, "RL": 0}
     priority_count = 0
-    for p in filtered_papers[:80]:
-        if p["primary_topic"]:
-            by_topic[p["primary_topic"]] += 1
-        if p["is_priority"]:
+    for p in selected:
+        if p.primary_topic:
+            by_topic[p.primary_topic] += 1
+        if p.is_priority:
             priority_count += 1
     
     print(f"\nStatistics:")
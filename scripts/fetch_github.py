@@ -10,6 +10,9 @@ import urllib.request
 from datetime import datetime, timedelta
 import re
 
+from jsonio import JsonlWriter, dump_document, is_stream
+from records import Repo
+
 # GitHub API
 GITHUB_API = "https://api.github.com"
 
@@ -59,26 +62,24 @@ def search_repos(query: str, days: int = 7, limit: int = 30) -> list:
     
     for item in data.get("items", []):
         try:
-            repo = {
-                "source": "github",
-                "name": item.get("full_name"),
-                "description": item.get("description", ""),
-                "url": item.get("html_url"),
-                "stars": item.get("stargazers_count", 0),
-                "forks": item.get("forks_count", 0),
-                "language": item.get("language"),
-                "topics": item.get("topics", []),
-                "created_at": item.get("created_at"),
-                "updated_at": item.get("updated_at"),
-                "is_new": False,
-            }
+            repo = Repo(
+                name=item.get("full_name"),
+                description=item.get("description"),
+                url=item.get("html_url"),
+                stars=item.get("stargazers_count", 0),
+                forks=item.get("forks_count", 0),
+                language=item.get("language"),
+                topics=item.get("topics"),
+                created_at=item.get("created_at"),
+                updated_at=item.get("updated_at"),
+            )
             
             # 检查是否是最近创建的新项目
             created = item.get("created_at")
             if created:
                 created_dt = datetime.strptime(created[:10], "%Y-%m-%d")
                 if (datetime.now() - created_dt).days <= days:
-                    repo["is_new"] = True
+                    repo.is_new = True
             
             repos.append(repo)
         except:
@@ -87,61 +88,82 @@ def search_repos(query: str, days: int = 7, limit: int = 30) -> list:
     return repos
 
 
-def fetch_trending_topics() -> list:
-    """获取相关 topic 下的热门仓库"""
+def fetch_trending_topics(on_batch=None) -> list:
+    """获取相关 topic 下的热门仓库（on_batch: 每个 topic 完成后的回调）"""
     all_repos = []
     
     for topic in TOPICS:
         repos = search_repos(f"topic:{topic}", days=7, limit=20)
         for r in repos:
-            r["matched_topic"] = topic
+            r.matched_topic = topic
         all_repos.extend(repos)
         print(f"  Topic '{topic}': {len(repos)} repos")
+        if on_batch:
+            on_batch(repos)
     
     return all_repos
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--days", type=int, default=7)
-    parser.add_argument("--output", type=str, default="/tmp/github_repos.json")
-    args = parser.parse_args()
-    
-    all_repos = []
-    
+def fetch_all(days: int, collect):
+    """按 topic 和关键词搜索，每批结果交给 collect"""
     # 按 topic 搜索
     print("Fetching from topics...")
-    all_repos.extend(fetch_trending_topics())
+    fetch_trending_topics(on_batch=collect)
     
     # 按关键词搜索
     print("Fetching from keywords...")
     for kw in KEYWORDS[:5]:  # 限制请求数
-        repos = search_repos(kw, args.days, limit=20)
-        all_repos.extend(repos)
+        repos = search_repos(kw, days, limit=20)
+        collect(repos)
         print(f"  Keyword '{kw}': {len(repos)} repos")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--output", type=str, default="/tmp/github_repos.json",
+                        help="Output file (.json document, or .jsonl to stream repos per query)")
+    args = parser.parse_args(argv)
     
-    # 去重并按 stars 排序
+    # 去重（边抓取边进行）
     seen = set()
     unique_repos = []
-    for r in all_repos:
-        if r["name"] not in seen:
-            seen.add(r["name"])
+    
+    def collect(repos, stream=None):
+        for r in repos:
+            if r.name in seen:
+                continue
+            seen.add(r.name)
             unique_repos.append(r)
+            # 流式输出：满足筛选条件的新仓库立即追加，排序交给下游
+            if stream and r.description and r.stars >= 10:
+                stream.write(r.to_dict())
+    
+    if is_stream(args.output):
+        # 抓取中途出错时写出 .failed 标记，follow 模式的消费者立即失败而不是等到超时
+        with JsonlWriter(args.output) as stream:
+            fetch_all(args.days, lambda repos: collect(repos, stream))
+            stream.close({"source": "github"})
+        print(f"Streamed {stream.count} repos to {args.output}")
+        return 0
+    
+    fetch_all(args.days, collect)
     
-    unique_repos.sort(key=lambda x: x["stars"], reverse=True)
+    # 按 stars 排序
+    unique_repos.sort(key=lambda x: x.stars, reverse=True)
     
     # 筛选：只保留有意义的项目（有描述、有一定 stars）
-    filtered = [r for r in unique_repos if r.get("description") and r.get("stars", 0) >= 10]
+    filtered = [r for r in unique_repos if r.description and r.stars >= 10]
     
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump({
-            "source": "github",
-            "fetch_date": datetime.now().isoformat(),
-            "repos": filtered[:50]
-        }, f, ensure_ascii=False, indent=2)
+    dump_document(args.output, {
+        "source": "github",
+        "fetch_date": datetime.now().isoformat(),
+        "repos": [r.to_dict() for r in filtered[:50]]
+    })
     
     print(f"Saved {len(filtered[:50])} repos to {args.output}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    exit(main())
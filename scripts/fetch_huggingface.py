@@ -10,6 +10,9 @@ import urllib.request
 import urllib.parse
 from datetime import datetime, timedelta
 
+from jsonio import JsonlWriter, dump_document, is_stream
+from records import HFItem
+
 # Hugging Face API
 HF_API = "https://huggingface.co/api"
 
@@ -72,20 +75,19 @@ def fetch_models(tags: list = None, limit: int = 50, days: int = 7) -> list:
                 if mod_dt.replace(tzinfo=None) < cutoff_date:
                     continue
             
-            model = {
-                "source": "huggingface",
-                "type": "model",
-                "id": item.get("id"),
-                "name": item.get("modelId") or item.get("id"),
-                "author": item.get("author"),
-                "description": item.get("description", ""),
-                "tags": item.get("tags", []),
-                "downloads": item.get("downloads", 0),
-                "likes": item.get("likes", 0),
-                "last_modified": last_modified,
-                "url": f"https://huggingface.co/{item.get('id')}",
-                "is_priority": any(org in str(item.get("author", "")).lower() for org in PRIORITY_ORGS),
-            }
+            model = HFItem(
+                type="model",
+                id=item.get("id"),
+                name=item.get("modelId") or item.get("id"),
+                author=item.get("author"),
+                description=item.get("description"),
+                tags=item.get("tags"),
+                downloads=item.get("downloads", 0),
+                likes=item.get("likes", 0),
+                last_modified=last_modified,
+                url=f"https://huggingface.co/{item.get('id')}",
+                is_priority=any(org in str(item.get("author", "")).lower() for org in PRIORITY_ORGS),
+            )
             models.append(model)
         except Exception as e:
             continue
@@ -127,20 +129,19 @@ def fetch_datasets(tags: list = None, limit: int = 30, days: int = 7) -> list:
                 if mod_dt.replace(tzinfo=None) < cutoff_date:
                     continue
             
-            dataset = {
-                "source": "huggingface",
-                "type": "dataset",
-                "id": item.get("id"),
-                "name": item.get("id"),
-                "author": item.get("author"),
-                "description": item.get("description", ""),
-                "tags": item.get("tags", []),
-                "downloads": item.get("downloads", 0),
-                "likes": item.get("likes", 0),
-                "last_modified": last_modified,
-                "url": f"https://huggingface.co/datasets/{item.get('id')}",
-                "is_priority": any(org in str(item.get("author", "")).lower() for org in PRIORITY_ORGS),
-            }
+            dataset = HFItem(
+                type="dataset",
+                id=item.get("id"),
+                name=item.get("id"),
+                author=item.get("author"),
+                description=item.get("description"),
+                tags=item.get("tags"),
+                downloads=item.get("downloads", 0),
+                likes=item.get("likes", 0),
+                last_modified=last_modified,
+                url=f"https://huggingface.co/datasets/{item.get('id')}",
+                is_priority=any(org in str(item.get("author", "")).lower() for org in PRIORITY_ORGS),
+            )
             datasets.append(dataset)
         except:
             continue
@@ -179,18 +180,17 @@ def fetch_spaces(limit: int = 30, days: int = 7) -> list:
                 if mod_dt.replace(tzinfo=None) < cutoff_date:
                     continue
             
-            space = {
-                "source": "huggingface",
-                "type": "space",
-                "id": item.get("id"),
-                "name": item.get("id"),
-                "author": item.get("author"),
-                "sdk": item.get("sdk"),
-                "likes": item.get("likes", 0),
-                "last_modified": last_modified,
-                "url": f"https://huggingface.co/spaces/{item.get('id')}",
-                "is_priority": any(org in str(item.get("author", "")).lower() for org in PRIORITY_ORGS),
-            }
+            space = HFItem(
+                type="space",
+                id=item.get("id"),
+                name=item.get("id"),
+                author=item.get("author"),
+                sdk=item.get("sdk"),
+                likes=item.get("likes", 0),
+                last_modified=last_modified,
+                url=f"https://huggingface.co/spaces/{item.get('id')}",
+                is_priority=any(org in str(item.get("author", "")).lower() for org in PRIORITY_ORGS),
+            )
             spaces.append(space)
         except:
             continue
@@ -198,61 +198,83 @@ def fetch_spaces(limit: int = 30, days: int = 7) -> list:
     return spaces
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--days", type=int, default=7)
-    parser.add_argument("--output", type=str, default="/tmp/huggingface.json")
-    args = parser.parse_args()
-    
-    all_items = []
-    
+def fetch_all(days: int, collect):
+    """依次抓取模型 / 数据集 / Spaces，每批结果交给 collect"""
     # 获取相关标签的模型
     print("Fetching models...")
     for tag in MODEL_TAGS:
-        models = fetch_models(tags=[tag], limit=20, days=args.days)
-        all_items.extend(models)
+        models = fetch_models(tags=[tag], limit=20, days=days)
+        collect(models)
         print(f"  Tag '{tag}': {len(models)} models")
     
     # 获取数据集
     print("Fetching datasets...")
-    datasets = fetch_datasets(tags=["robotics", "reinforcement-learning"], limit=30, days=args.days)
-    all_items.extend(datasets)
+    datasets = fetch_datasets(tags=["robotics", "reinforcement-learning"], limit=30, days=days)
+    collect(datasets)
     print(f"  Datasets: {len(datasets)}")
     
     # 获取 Spaces
     print("Fetching spaces...")
-    spaces = fetch_spaces(limit=30, days=args.days)
-    all_items.extend(spaces)
+    spaces = fetch_spaces(limit=30, days=days)
+    collect(spaces)
     print(f"  Spaces: {len(spaces)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--output", type=str, default="/tmp/huggingface.json",
+                        help="Output file (.json document, or .jsonl to stream items per query)")
+    args = parser.parse_args(argv)
     
-    # 去重
+    # 去重（边抓取边进行）
     seen = set()
     unique_items = []
-    for item in all_items:
-        if item["id"] not in seen:
-            seen.add(item["id"])
-            unique_items.append(item)
+    
+    def collect(items, stream=None):
+        for item in items:
+            if item.id not in seen:
+                seen.add(item.id)
+                unique_items.append(item)
+                if stream:
+                    stream.write(item.to_dict())
+    
+    def item_stats():
+        return {
+            "models": len([i for i in unique_items if i.type == "model"]),
+            "datasets": len([i for i in unique_items if i.type == "dataset"]),
+            "spaces": len([i for i in unique_items if i.type == "space"]),
+        }
+    
+    if is_stream(args.output):
+        # 抓取中途出错时写出 .failed 标记，follow 模式的消费者立即失败而不是等到超时
+        with JsonlWriter(args.output) as stream:
+            fetch_all(args.days, lambda items: collect(items, stream))
+            stats = item_stats()
+            stream.close({"source": "huggingface", "stats": stats})
+        print(f"\nStreamed {stream.count} items to {args.output}")
+        print(f"Stats: {stats}")
+        return 0
+    
+    fetch_all(args.days, collect)
+    stats = item_stats()
     
     # 按 likes/downloads 排序
-    unique_items.sort(key=lambda x: x.get("likes", 0) + x.get("downloads", 0), reverse=True)
+    unique_items.sort(key=lambda x: x.likes + x.downloads, reverse=True)
     
     result = {
         "source": "huggingface",
         "fetch_date": datetime.now().isoformat(),
-        "items": unique_items[:100],
-        "stats": {
-            "models": len([i for i in unique_items if i["type"] == "model"]),
-            "datasets": len([i for i in unique_items if i["type"] == "dataset"]),
-            "spaces": len([i for i in unique_items if i["type"] == "space"]),
-        }
+        "items": [i.to_dict() for i in unique_items[:100]],
+        "stats": stats,
     }
     
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(result, f, ensure_ascii=False, indent=2)
+    dump_document(args.output, result)
     
     print(f"\nSaved {len(unique_items[:100])} items to {args.output}")
     print(f"Stats: {result['stats']}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    exit(main())
@@ -9,11 +9,14 @@ import json
 import urllib.request
 from datetime import datetime, timedelta
 
+from jsonio import JsonlWriter, dump_document, is_stream
+from records import Paper
+
 # Papers With Code API
 PWC_API = "https://paperswithcode.com/api/v1"
 
-def fetch_latest_papers(days: int = 1, limit: int = 50) -> list:
-    """获取最近几天的论文"""
+def fetch_latest_papers(days: int = 1, limit: int = 50, on_paper=None) -> list:
+    """获取最近几天的论文（on_paper: 每篇论文补全代码仓库后的回调）"""
     papers = []
     
     # 获取最新论文
@@ -37,18 +40,17 @@ def fetch_latest_papers(days: int = 1, limit: int = 50) -> list:
                 if pub_dt < cutoff_date:
                     continue
             
-            paper = {
-                "source": "papers_with_code",
-                "id": item.get("id"),
-                "title": item.get("title"),
-                "abstract": item.get("abstract", ""),
-                "authors": item.get("authors", []),
-                "published": pub_date,
-                "url": item.get("url_abs"),
-                "pdf_url": item.get("url_pdf"),
-                "code_url": None,
-                "stars": 0,
-            }
+            paper = Paper(
+                source="papers_with_code",
+                id=item.get("id"),
+                title=item.get("title"),
+                summary=item.get("abstract"),
+                authors=item.get("authors", []),
+                published=pub_date,
+                link=item.get("url_abs"),
+                pdf_link=item.get("url_pdf"),
+                stars=0,
+            )
             
             # 获取代码仓库
             paper_id = item.get("id")
@@ -60,12 +62,14 @@ def fetch_latest_papers(days: int = 1, limit: int = 50) -> list:
                         repos = json.loads(resp.read().decode('utf-8'))
                         if repos.get("results"):
                             best_repo = max(repos["results"], key=lambda x: x.get("stars", 0))
-                            paper["code_url"] = best_repo.get("url")
-                            paper["stars"] = best_repo.get("stars", 0)
+                            paper.code_url = best_repo.get("url")
+                            paper.stars = best_repo.get("stars", 0)
                 except:
                     pass
             
             papers.append(paper)
+            if on_paper:
+                on_paper(paper)
         except Exception as e:
             continue
     
@@ -73,20 +77,25 @@ def fetch_latest_papers(days: int = 1, limit: int = 50) -> list:
     return papers
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument("--days", type=int, default=1)
     parser.add_argument("--limit", type=int, default=50)
-    parser.add_argument("--output", type=str, default="/tmp/pwc_papers.json")
-    args = parser.parse_args()
-    
-    papers = fetch_latest_papers(args.days, args.limit)
+    parser.add_argument("--output", type=str, default="/tmp/pwc_papers.json",
+                        help="Output file (.json document, or .jsonl to stream papers as they are enriched)")
+    args = parser.parse_args(argv)
     
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump({"source": "papers_with_code", "papers": papers}, f, ensure_ascii=False, indent=2)
+    if is_stream(args.output):
+        with JsonlWriter(args.output) as out:
+            fetch_latest_papers(args.days, args.limit, on_paper=lambda p: out.write(p.to_dict()))
+            out.close({"source": "papers_with_code"})
+    else:
+        papers = fetch_latest_papers(args.days, args.limit)
+        dump_document(args.output, {"source": "papers_with_code", "papers": [p.to_dict() for p in papers]})
     
     print(f"Saved to {args.output}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    exit(main())
@@ -2,6 +2,8 @@
 """
 Daily Paper - Semantic Scholar 获取脚本
 追踪特定作者的最新论文
+arXiv 论文的追踪作者由 fetch.py 按 authors.py 的姓名索引直接标记，本脚本主要用于补充
+arXiv 之外的论文和引用数：默认只做主题搜索，逐个作者查询（每个作者一次请求）需显式加 --authors
 """
 
 import argparse
@@ -11,11 +13,15 @@ import urllib.parse
 from datetime import datetime, timedelta
 import time
 
+from jsonio import JsonlWriter, dump_document, is_stream
+from records import Paper
+
 # Semantic Scholar API (免费，有速率限制)
 S2_API = "https://api.semanticscholar.org/graph/v1"
 
 # 重点作者 Semantic Scholar IDs
 # 可通过搜索 https://www.semanticscholar.org/search 获取
+# 同时是 authors.py 姓名索引的名单（其它写法加到 authors.AUTHOR_ALIASES）
 PRIORITY_AUTHORS = {
     "Yann LeCun": "1688882",
     "Pieter Abbeel": "1736370",
@@ -58,17 +64,17 @@ def fetch_author_papers(author_id: str, author_name: str, days: int = 7) -> list
                 if pub_dt < cutoff_date:
                     continue
             
-            paper = {
-                "source": "semantic_scholar",
-                "title": item.get("title"),
-                "abstract": item.get("abstract", ""),
-                "authors": [a.get("name") for a in item.get("authors", [])],
-                "published": pub_date,
-                "url": item.get("url"),
-                "pdf_url": item.get("openAccessPdf", {}).get("url") if item.get("openAccessPdf") else None,
-                "citations": item.get("citationCount", 0),
-                "tracked_author": author_name,
-            }
+            paper = Paper(
+                source="semantic_scholar",
+                title=item.get("title"),
+                summary=item.get("abstract"),
+                authors=[a.get("name") for a in item.get("authors", [])],
+                published=pub_date,
+                link=item.get("url"),
+                pdf_link=item.get("openAccessPdf", {}).get("url") if item.get("openAccessPdf") else None,
+                citations=item.get("citationCount", 0),
+                tracked_author=author_name,
+            )
             papers.append(paper)
         except Exception as e:
             continue
@@ -106,16 +112,16 @@ def search_papers(query: str, days: int = 1, limit: int = 50) -> list:
                 if pub_dt < cutoff_date:
                     continue
             
-            paper = {
-                "source": "semantic_scholar",
-                "title": item.get("title"),
-                "abstract": item.get("abstract", ""),
-                "authors": [a.get("name") for a in item.get("authors", [])],
-                "published": pub_date,
-                "url": item.get("url"),
-                "pdf_url": item.get("openAccessPdf", {}).get("url") if item.get("openAccessPdf") else None,
-                "citations": item.get("citationCount", 0),
-            }
+            paper = Paper(
+                source="semantic_scholar",
+                title=item.get("title"),
+                summary=item.get("abstract"),
+                authors=[a.get("name") for a in item.get("authors", [])],
+                published=pub_date,
+                link=item.get("url"),
+                pdf_link=item.get("openAccessPdf", {}).get("url") if item.get("openAccessPdf") else None,
+                citations=item.get("citationCount", 0),
+            )
             papers.append(paper)
         except:
             continue
@@ -123,22 +129,16 @@ def search_papers(query: str, days: int = 1, limit: int = 50) -> list:
     return papers
 
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--days", type=int, default=7)
-    parser.add_argument("--output", type=str, default="/tmp/s2_papers.json")
-    parser.add_argument("--authors-only", action="store_true", help="只获取重点作者")
-    args = parser.parse_args()
-    
-    all_papers = []
-    
-    # 获取重点作者的论文
-    print("Fetching papers from priority authors...")
-    for name, author_id in PRIORITY_AUTHORS.items():
-        papers = fetch_author_papers(author_id, name, args.days)
-        all_papers.extend(papers)
-        print(f"  {name}: {len(papers)} papers")
-        time.sleep(1)  # 速率限制
+def fetch_all(args, collect):
+    """按命令行参数依次抓取重点作者 / 主题搜索，每批结果交给 collect"""
+    # 获取重点作者的论文（流水线不传 --authors，避免每次运行都逐个作者请求 S2）
+    if args.authors or args.authors_only:
+        print("Fetching papers from priority authors...")
+        for name, author_id in PRIORITY_AUTHORS.items():
+            papers = fetch_author_papers(author_id, name, args.days)
+            collect(papers)
+            print(f"  {name}: {len(papers)} papers")
+            time.sleep(1)  # 速率限制
     
     if not args.authors_only:
         # 搜索相关主题
@@ -149,24 +149,47 @@ def main():
         ]
         for query in queries:
             papers = search_papers(query, args.days)
-            all_papers.extend(papers)
+            collect(papers)
             print(f"  Query '{query}': {len(papers)} papers")
             time.sleep(1)
-    
-    # 去重
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--output", type=str, default="/tmp/s2_papers.json",
+                        help="Output file (.json document, or .jsonl to stream papers per author/query)")
+    parser.add_argument("--authors", action="store_true",
+                        help="Also query each priority author (one request per author; arXiv papers are already "
+                             "tagged by the name index in fetch.py)")
+    parser.add_argument("--authors-only", action="store_true", help="只获取重点作者（隐含 --authors）")
+    args = parser.parse_args(argv)
+    
+    # 去重（边抓取边进行）
     seen = set()
     unique_papers = []
-    for p in all_papers:
-        key = p.get("title", "").lower()
-        if key not in seen:
-            seen.add(key)
-            unique_papers.append(p)
     
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump({"source": "semantic_scholar", "papers": unique_papers}, f, ensure_ascii=False, indent=2)
+    def collect(papers, stream=None):
+        for p in papers:
+            key = p.title.lower()
+            if key not in seen:
+                seen.add(key)
+                unique_papers.append(p)
+                if stream:
+                    stream.write(p.to_dict())
+    
+    if is_stream(args.output):
+        # 抓取中途出错时写出 .failed 标记，follow 模式的消费者立即失败而不是等到超时
+        with JsonlWriter(args.output) as stream:
+            fetch_all(args, lambda papers: collect(papers, stream))
+            stream.close({"source": "semantic_scholar"})
+    else:
+        fetch_all(args, collect)
+        dump_document(args.output, {"source": "semantic_scholar", "papers": [p.to_dict() for p in unique_papers]})
     
     print(f"Saved {len(unique_papers)} unique papers to {args.output}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    exit(main())
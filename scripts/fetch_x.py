@@ -11,6 +11,8 @@ import os
 import subprocess
 from datetime import datetime
 
+from jsonio import JsonlWriter, is_stream
+
 # X credentials 配置路径
 X_CREDENTIALS_PATH = "/workspace/ai-masters-quotes/config/x_credentials.json"
 
@@ -49,9 +51,9 @@ def load_credentials() -> tuple:
         return None, None
 
 
-def fetch_with_bird_cli(accounts: list, output_path: str) -> dict:
+def fetch_with_bird_cli(accounts: list, output_path: str, on_tweets=None) -> dict:
     """
-    使用 bird CLI 获取推文
+    使用 bird CLI 获取推文（on_tweets: 每个账号取到推文后的回调）
     """
     results = {
         "source": "x_twitter",
@@ -79,6 +81,8 @@ def fetch_with_bird_cli(accounts: list, output_path: str) -> dict:
             if result.returncode == 0:
                 tweets = parse_bird_output(result.stdout, account)
                 results["tweets"].extend(tweets)
+                if on_tweets:
+                    on_tweets(tweets)
                 print(f"  @{account}: {len(tweets)} tweets")
             else:
                 error_msg = result.stderr[:100] if result.stderr else "Unknown error"
@@ -128,28 +132,40 @@ def filter_paper_related(tweets: list) -> list:
     return [t for t in tweets if t.get("has_paper")]
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser()
-    parser.add_argument("--output", type=str, default="/tmp/x_tweets.json")
+    parser.add_argument("--output", type=str, default="/tmp/x_tweets.json",
+                        help="Output file (.json document, or .jsonl to stream tweets per account)")
     parser.add_argument("--accounts", type=str, nargs="*", default=PRIORITY_ACCOUNTS)
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     print(f"Fetching tweets from {len(args.accounts)} accounts...")
     
-    results = fetch_with_bird_cli(args.accounts, args.output)
-    
-    # 筛选论文相关
-    paper_tweets = filter_paper_related(results["tweets"])
-    results["paper_related"] = paper_tweets
-    
-    with open(args.output, "w", encoding="utf-8") as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    if is_stream(args.output):
+        # 每行一条推文（带 has_paper 标记，筛选交给下游），抓取错误写入 .done 标记
+        with JsonlWriter(args.output) as stream:
+            def write_tweets(tweets):
+                for t in tweets:
+                    stream.write(t)
+            results = fetch_with_bird_cli(args.accounts, args.output, on_tweets=write_tweets)
+            stream.close({"source": "x_twitter", "fetch_date": results["fetch_date"], "errors": results["errors"]})
+        paper_tweets = filter_paper_related(results["tweets"])
+    else:
+        results = fetch_with_bird_cli(args.accounts, args.output)
+        
+        # 筛选论文相关
+        paper_tweets = filter_paper_related(results["tweets"])
+        results["paper_related"] = paper_tweets
+        
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
     
     print(f"Total tweets: {len(results['tweets'])}")
     print(f"Paper-related: {len(paper_tweets)}")
     print(f"Errors: {len(results['errors'])}")
     print(f"Saved to {args.output}")
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    exit(main())
@@ -1,13 +1,24 @@
+import argparse
 import json
 import re
 import os
 
-def parse_markdown(filepath):
+from report_model import is_model, load_report, render_card
+
+# Default "完整报告" link when no document is given
+DEFAULT_DOC_URL = "https://chj.feishu.cn/docx/UGpidgTYcomcS4xgRjVcsa4qn3e"
+
+def parse_markdown(filepath, date_range=None, doc_url=DEFAULT_DOC_URL):
     with open(filepath, 'r') as f:
         content = f.read()
+    
+    # Take the date range from the report title unless given explicitly
+    if date_range is None:
+        title_match = re.search(r'^# .*?（(.+?)）', content, re.MULTILINE)
+        date_range = title_match.group(1) if title_match else ""
         
     data = {
-        "date_range": "2026-02-17 ~ 2026-02-23",
+        "date_range": date_range,
         "summary": "",
         "papers": [],
         "trends": [],
@@ -61,24 +72,36 @@ def parse_markdown(filepath):
     data['trends'] = trends
         
     # Add Link
-    # I need the doc_id from the previous step. I'll hardcode it or pass it as arg.
-    # For now, I'll use the one I got: UGpidgTYcomcS4xgRjVcsa4qn3e
-    doc_url = "https://chj.feishu.cn/docx/UGpidgTYcomcS4xgRjVcsa4qn3e"
-    data['links'].append({
-        "name": "完整报告",
-        "url": doc_url
-    })
+    if doc_url:
+        data['links'].append({
+            "name": "完整报告",
+            "url": doc_url
+        })
     
     return data
 
-if __name__ == "__main__":
-    md_path = "/workspace/daily-papers/weekly-2026-02-17-to-2026-02-23.md"
-    output_path = "/workspace/data/weekly-paper-2026-02-23.json"
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate weekly card data from the weekly report")
+    parser.add_argument("--input", type=str, required=True,
+                        help="Weekly report model (.json, preferred) or markdown")
+    parser.add_argument("--output", type=str, required=True, help="Card data JSON")
+    parser.add_argument("--range", type=str, default=None, help="Date range, defaults to the report title")
+    parser.add_argument("--doc-url", type=str, default=DEFAULT_DOC_URL, help="Link to the full report")
+    args = parser.parse_args(argv)
     
-    data = parse_markdown(md_path)
+    if is_model(args.input):
+        # Structured report model: no markdown re-parsing, no papers lost to format drift
+        data = render_card(load_report(args.input), args.doc_url)
+        if args.range:
+            data['date_range'] = args.range
+    else:
+        data = parse_markdown(args.input, args.range, args.doc_url)
     
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
         
-    print(f"Card data generated: {output_path}")
+    print(f"Card data generated: {args.output}")
+
+if __name__ == "__main__":
+    main()
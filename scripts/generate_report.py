@@ -1,163 +1,239 @@
+import argparse
 import json
-import os
 import datetime
 import re
+from collections import Counter
 
-def load_json(filepath):
-    if not os.path.exists(filepath):
-        return []
-    try:
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-            if isinstance(data, list):
-                return data
-            elif isinstance(data, dict):
-                for key in ['papers', 'repos', 'items']:
-                    if key in data:
-                        return data[key]
-            return []
-    except Exception as e:
-        print(f"Error loading {filepath}: {e}")
-        return []
+from ranking import StreamingRanker, iter_records, top_k
+from records import papers as as_papers, repos as as_repos, hf_items as as_hf_items
+from related_index import RELATED_INDEX_DIR, open_index
+from report_model import Item, Report, Section, model_path, render_markdown, render_outputs
+from summaries import SUMMARY_DIR, SUMMARY_POOL, save_daily_summary
+from enrich import BACKENDS, ENRICH_BACKEND, ENRICH_CACHE_DIR, enrich_papers, get_enrichment
+from linker import has_code
+
+# Bump when the markdown layout changes (part of the stage cache key)
+TEMPLATE_VERSION = "1"
+
+# Scoring weights; override with --weights '{"tracked_author": 5}' for what-if runs
+SCORE_WEIGHTS = {
+    'priority': 10,
+    'tracked_author': 10,
+    'topic_vla': 5,
+    'topic_world_model': 5,
+    'topic_rl': 3,
+    'recent': 2,
+    'has_code': 3,
+}
 
 def normalize_title(title):
     return re.sub(r'\s+', ' ', title.lower().strip())
 
-def score_paper(paper):
-    score = 0
+def score_components(paper, weights=SCORE_WEIGHTS):
+    """Weighted score contributions by feature (only the ones that fired)"""
+    components = {}
     # Priority flag
-    if paper.get('is_priority', False):
-        score += 10
-    if paper.get('tracked_author'):
-        score += 10
+    if paper.is_priority:
+        components['priority'] = weights['priority']
+    if paper.tracked_author:
+        components['tracked_author'] = weights['tracked_author']
     
     # Topic relevance
-    topic = paper.get('primary_topic', '')
-    if topic in ['VLA', 'World Model']:
-        score += 5
+    topic = paper.primary_topic
+    if topic == 'VLA':
+        components['topic_vla'] = weights['topic_vla']
+    elif topic == 'World Model':
+        components['topic_world_model'] = weights['topic_world_model']
     elif topic == 'RL':
-        score += 3
+        components['topic_rl'] = weights['topic_rl']
     
     # Recency (simple check, assuming data is recent)
-    published = paper.get('published', '')
+    published = paper.published
     if published:
         try:
             pub_date = datetime.datetime.strptime(published[:10], '%Y-%m-%d')
             days_diff = (datetime.datetime.now() - pub_date).days
             if days_diff <= 2:
-                score += 2
+                components['recent'] = weights['recent']
         except:
             pass
+    
+    # Code availability (linked repo, or a GitHub link in the paper)
+    if has_code(paper):
+        components['has_code'] = weights['has_code']
             
-    return score
+    return components
 
-def generate_markdown(papers, repos, hf_items, date_str):
-    lines = []
-    lines.append(f"# 每日论文速递 — {date_str}")
-    lines.append("")
-    
+def score_paper(paper, weights=SCORE_WEIGHTS):
+    return sum(score_components(paper, weights).values())
+
+def count_topics(papers, counts):
+    """Pass papers through, counting each distinct title once by primary topic"""
+    seen = set()
+    for p in papers:
+        key = normalize_title(p.title)
+        if key not in seen:
+            seen.add(key)
+            counts[p.primary_topic or 'Other'] += 1
+        yield p
+
+def rank_papers(sources, weights=SCORE_WEIGHTS, k=12, follow=False, topic_counts=None):
+    """
+    Stream papers from all sources and return the top k (deduplicated by title)
+    Pass a Counter as topic_counts to also count candidates per primary topic
+    """
+    def merge_paper(existing, new):
+        # Tracked authors are tagged on arXiv data by fetch.py; S2 duplicates
+        # still fill in what arXiv lacks (tracked author, citation count)
+        if new.tracked_author and not existing.tracked_author:
+            existing.tracked_author = new.tracked_author
+        if new.citations is not None and existing.citations is None:
+            existing.citations = new.citations
+        return existing
+
+    ranker = StreamingRanker(k, key=lambda p: score_paper(p, weights),
+                             dedup=lambda p: normalize_title(p.title),
+                             merge=merge_paper)
+    papers = as_papers(iter_records(sources, follow=follow))
+    if topic_counts is not None:
+        papers = count_topics(papers, topic_counts)
+    ranker.extend(papers)
+    return ranker.ranked()
+
+
+def build_report(papers, repos, hf_items, date_str):
+    """Build the structured daily report model"""
     # Summary
     total_papers = len(papers)
-    vla_count = sum(1 for p in papers if p.get('primary_topic') == 'VLA')
-    wm_count = sum(1 for p in papers if p.get('primary_topic') == 'World Model')
-    rl_count = sum(1 for p in papers if p.get('primary_topic') == 'RL')
-    
-    lines.append(f"**摘要**：今日共筛选出 {total_papers} 篇高质量论文，其中 VLA 方向 {vla_count} 篇，世界模型方向 {wm_count} 篇，强化学习方向 {rl_count} 篇。此外还有 {len(repos)} 个 GitHub 项目和 {len(hf_items)} 个 HuggingFace 资源值得关注。")
-    lines.append("")
+    vla_count = sum(1 for p in papers if p.primary_topic == 'VLA')
+    wm_count = sum(1 for p in papers if p.primary_topic == 'World Model')
+    rl_count = sum(1 for p in papers if p.primary_topic == 'RL')
+    summary = f"今日共筛选出 {total_papers} 篇高质量论文，其中 VLA 方向 {vla_count} 篇，世界模型方向 {wm_count} 篇，强化学习方向 {rl_count} 篇。此外还有 {len(repos)} 个 GitHub 项目和 {len(hf_items)} 个 HuggingFace 资源值得关注。"
     
     # Group papers by topic
     topics = {'VLA': [], 'World Model': [], 'RL': [], 'Other': []}
     for p in papers:
-        t = p.get('primary_topic', 'Other')
+        t = p.primary_topic or 'Other'
         if t not in topics:
             t = 'Other'
         topics[t].append(p)
-        
+    
+    sections = []
     for topic, topic_papers in topics.items():
         if not topic_papers:
             continue
-        
-        lines.append(f"## {topic}")
-        lines.append("")
-        
+        section = Section(topic, level=2)
         for p in topic_papers:
-            title = p.get('title', 'No Title')
-            # Translate title (mock translation for now, or just keep English)
-            # In a real scenario, we'd use an LLM to translate.
-            # For now, I'll just append a placeholder or keep it as is.
-            lines.append(f"### {title}")
-            lines.append(f"- **一句话摘要**: {p.get('summary', '暂无摘要')[:100]}...")
-            lines.append(f"- **解决痛点**: 针对 {topic} 领域的关键问题...")
-            lines.append(f"- **核心改进**: 提出了新的架构/算法...")
-            lines.append(f"- **应用场景**: 机器人操作/自动驾驶...")
-            lines.append(f"- **链接**: [Paper]({p.get('link', p.get('url', '#'))})")
-            if p.get('code_url'):
-                lines.append(f"- **代码**: [Code]({p.get('code_url')})")
-            lines.append("")
-            
+            title = p.title or 'No Title'
+            # Enrichment (translated title, structured summary) when the enrich stage ran
+            enr = get_enrichment(p)
+            title_zh = enr.get('title_zh')
+            heading = f"{title}（{title_zh}）" if title_zh and title_zh != title else title
+            fields = [
+                ("一句话摘要", enr.get('one_liner') or f"{(p.summary or '暂无摘要')[:100]}..."),
+                ("解决痛点", enr.get('pain_point') or f"针对 {topic} 领域的关键问题..."),
+                ("核心改进", "；".join(enr.get('improvements') or []) or "提出了新的架构/算法..."),
+                ("应用场景", enr.get('applications') or "机器人操作/自动驾驶..."),
+                ("链接", f"[Paper]({p.link or '#'})"),
+            ]
+            if p.code_url:
+                fields.append(("代码", f"[Code]({p.code_url})"))
+            if (p.extra or {}).get('project_url'):
+                fields.append(("项目主页", f"[Project]({p.extra['project_url']})"))
+            if (p.extra or {}).get('checkpoints'):
+                checkpoints = "；".join(f"[{c['id']}]({c['url']})" for c in p.extra['checkpoints'])
+                fields.append(("模型 / 数据集", checkpoints))
+            if p.related:
+                related = "；".join(f"[{r['title']}]({r['link']})" for r in p.related)
+                fields.append(("相关历史工作", related))
+            section.items.append(Item("paper", title, heading=heading, fields=fields,
+                                      meta={"id": p.id, "link": p.link or "", "topic": topic}))
+        sections.append(section)
+    
     # Open Source Projects
     if repos or hf_items:
-        lines.append("## 开源项目精选")
-        lines.append("")
-        
+        section = Section("开源项目精选", level=2)
         for r in repos:
-            lines.append(f"### [GitHub] {r.get('name')}")
-            lines.append(f"- **简介**: {r.get('description', '暂无描述')}")
-            lines.append(f"- **链接**: {r.get('url')}")
-            lines.append(f"- **Stars**: {r.get('stars', 0)}")
-            lines.append("")
-            
+            section.items.append(Item(
+                "repo", r.name, heading=f"[GitHub] {r.name}",
+                fields=[("简介", r.description or '暂无描述'), ("链接", r.url), ("Stars", r.stars)],
+                meta={"url": r.url, "stars": r.stars},
+            ))
         for h in hf_items:
-            lines.append(f"### [HuggingFace] {h.get('id')}")
-            lines.append(f"- **类型**: {h.get('type')}")
-            lines.append(f"- **链接**: {h.get('url')}")
-            lines.append(f"- **Likes**: {h.get('likes', 0)}")
-            lines.append("")
-            
-    return "\n".join(lines)
+            section.items.append(Item(
+                "hf", h.id, heading=f"[HuggingFace] {h.id}",
+                fields=[("类型", h.type), ("链接", h.url), ("Likes", h.likes)],
+                meta={"url": h.url, "likes": h.likes},
+            ))
+        sections.append(section)
+    
+    return Report("daily", f"每日论文速递 — {date_str}", date_range=date_str,
+                  summary=summary, sections=sections)
+
+def generate_markdown(papers, repos, hf_items, date_str):
+    return render_markdown(build_report(papers, repos, hf_items, date_str))
 
-def main():
-    date_str = datetime.datetime.now().strftime('%Y-%m-%d')
-    output_file = f"/workspace/daily-papers/{date_str}-cn.md"
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the Daily Paper report")
+    parser.add_argument("--papers", nargs="+", default=['/tmp/arxiv_papers.json', '/tmp/s2_papers.json'],
+                        help="Paper sources (.json or .jsonl)")
+    parser.add_argument("--repos", nargs="+", default=['/tmp/github_repos.json'])
+    parser.add_argument("--hf", nargs="+", default=['/tmp/huggingface.json'])
+    parser.add_argument("--date", type=str, default=None, help="Report date (YYYY-MM-DD), defaults to today")
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--follow", action="store_true",
+                        help="Keep reading .jsonl sources until their producers finish (overlap with fetching)")
+    parser.add_argument("--weights", type=str, default=None,
+                        help="JSON object overriding SCORE_WEIGHTS")
+    parser.add_argument("--model", type=str, default=None,
+                        help="Report model JSON (defaults to the output path with .json)")
+    parser.add_argument("--summary-dir", type=str, default=SUMMARY_DIR,
+                        help="Where the daily summary for weekly/monthly rollups is written")
+    parser.add_argument("--enrich", type=str, default=ENRICH_BACKEND or None, choices=sorted(BACKENDS),
+                        help="Summarizer backend for translated titles and structured summaries")
+    parser.add_argument("--enrich-cache", type=str, default=ENRICH_CACHE_DIR)
+    args = parser.parse_args(argv)
     
-    # Load data
-    arxiv_papers = load_json('/tmp/arxiv_papers.json')
-    s2_papers = load_json('/tmp/s2_papers.json')
-    repos = load_json('/tmp/github_repos.json')
-    hf_items = load_json('/tmp/huggingface.json')
+    weights = dict(SCORE_WEIGHTS)
+    if args.weights:
+        weights.update(json.loads(args.weights))
     
-    # Combine and deduplicate papers
-    all_papers = {}
-    for p in arxiv_papers + s2_papers:
-        norm_title = normalize_title(p.get('title', ''))
-        if norm_title not in all_papers:
-            all_papers[norm_title] = p
-        else:
-            # Merge info if needed (e.g., if S2 has tracked author info)
-            if p.get('tracked_author'):
-                all_papers[norm_title]['tracked_author'] = p['tracked_author']
+    date_str = args.date or datetime.datetime.now().strftime('%Y-%m-%d')
+    output_file = args.output or f"/workspace/daily-papers/{date_str}-cn.md"
     
-    unique_papers = list(all_papers.values())
+    # Stream papers from all sources, keeping only the summary pool in memory;
+    # the report shows the top 12, the rest compete again in weekly/monthly rollups
+    topic_counts = Counter()
+    pool = rank_papers(args.papers, weights, k=max(12, SUMMARY_POOL), follow=args.follow,
+                       topic_counts=topic_counts)
+    top_papers = pool[:12]
     
-    # Score and sort papers
-    unique_papers.sort(key=score_paper, reverse=True)
-    top_papers = unique_papers[:12]  # Select top 12
+    # Top repos and HF items
+    top_repos = top_k(as_repos(iter_records(args.repos, follow=args.follow)), 3, key=lambda x: x.stars)
+    top_hf = top_k(as_hf_items(iter_records(args.hf, follow=args.follow)), 2, key=lambda x: x.likes)
     
-    # Sort repos and HF items
-    repos.sort(key=lambda x: x.get('stars', 0), reverse=True)
-    top_repos = repos[:3]
+    # Related prior work from the history index, then add today's picks to it
+    related_index = open_index(RELATED_INDEX_DIR)
+    for p in top_papers:
+        p.related = related_index.query(p, k=3)
+    related_index.add(top_papers)
+    related_index.save()
     
-    hf_items.sort(key=lambda x: x.get('likes', 0), reverse=True)
-    top_hf = hf_items[:2]
+    # Enrich only the papers shown; results are cached by paper id + version
+    if args.enrich:
+        stats = enrich_papers(top_papers, args.enrich, args.enrich_cache)
+        print(f"Enrichment: {stats['cached']} cached, {stats['enriched']} new, {stats['failed']} failed")
     
-    # Generate Markdown
-    markdown_content = generate_markdown(top_papers, top_repos, top_hf, date_str)
+    # Build the model, then render markdown and model JSON concurrently
+    report = build_report(top_papers, top_repos, top_hf, date_str)
+    render_outputs(report, markdown=output_file, model=args.model or model_path(output_file))
     
-    # Save to file
-    with open(output_file, 'w') as f:
-        f.write(markdown_content)
+    summary_file = save_daily_summary(
+        date_str, pool, [score_components(p, weights) for p in pool], len(top_papers),
+        topic_counts, sum(topic_counts.values()), top_repos, top_hf, args.summary_dir)
         
     print(f"Report generated at {output_file}")
+    print(f"Daily summary saved to {summary_file}")
 
 if __name__ == "__main__":
     main()
@@ -1,17 +1,14 @@
-import json
-import os
+import argparse
 import datetime
 import re
 
-def load_json(filepath):
-    if not os.path.exists(filepath):
-        print(f"Warning: {filepath} not found.")
-        return []
-    with open(filepath, 'r') as f:
-        data = json.load(f)
-        if isinstance(data, dict):
-            return data.get('papers', []) or data.get('repos', []) or []
-        return data
+from ranking import StreamingRanker, iter_records, top_k
+from records import papers as as_papers, repos as as_repos
+from report_model import Item, Report, Section, Trend, model_path, render_markdown, render_outputs
+from summaries import SUMMARY_DIR, rollup
+from trends import TRENDS_DIR, TrendStore, describe, detect_trends
+from enrich import BACKENDS, ENRICH_BACKEND, ENRICH_CACHE_DIR, enrich_papers, get_enrichment
+from linker import has_code
 
 def clean_text(text):
     if not text:
@@ -19,22 +16,16 @@ def clean_text(text):
     return re.sub(r'\s+', ' ', text).strip()
 
 def get_institution(paper):
-    # Try to find institution in authors list if it's a dict with affiliation
-    # Otherwise return a placeholder or try to guess from email domains if available
-    # For this task, we might need to rely on what's available.
-    # Semantic Scholar data might have it.
-    if 'affiliations' in paper:
-        return paper['affiliations'][0] if paper['affiliations'] else "Unknown"
-    if 'authors' in paper and isinstance(paper['authors'], list) and len(paper['authors']) > 0:
-        first_author = paper['authors'][0]
-        if isinstance(first_author, dict) and 'affiliation' in first_author:
-            return first_author['affiliation']
-    return "Unknown Institution"
+    # Affiliations come from arXiv metadata / full-text front matter (affiliations.py),
+    # normalized to canonical names; the priority institution is shown first
+    if paper.priority_affiliation in paper.affiliations:
+        return paper.priority_affiliation
+    return paper.affiliations[0] if paper.affiliations else "Unknown Institution"
 
 def score_paper(paper):
     score = 0
-    title = paper.get('title', '').lower()
-    summary = paper.get('summary', '').lower()
+    title = paper.title.lower()
+    summary = paper.summary.lower()
     
     keywords = {
         'vla': 3, 'vision-language-action': 3,
@@ -51,135 +42,209 @@ def score_paper(paper):
         if kw in summary:
             score += weight
             
-    # Boost for code availability (if we can detect it)
-    if 'github.com' in summary or 'code' in summary:
+    # Boost for code availability (repo linked by linker.py or a GitHub link in the paper)
+    if has_code(paper):
         score += 2
         
     return score
 
-def select_papers(papers):
-    # Deduplicate by title
-    unique_papers = {}
-    for p in papers:
-        title = clean_text(p.get('title', '')).lower()
-        if title and title not in unique_papers:
-            unique_papers[title] = p
-        elif title in unique_papers:
-            # If we have a duplicate, prefer the one with more info (e.g. from S2)
-            if p.get('source') == 'semantic_scholar':
-                unique_papers[title] = p
-                
-    paper_list = list(unique_papers.values())
+def select_papers(papers, k=6, score=score_paper):
+    # If we have a duplicate, prefer the one with more info (e.g. from S2)
+    def prefer_s2(existing, new):
+        return new if new.source == 'semantic_scholar' else existing
     
-    # Score and sort
-    for p in paper_list:
-        p['score'] = score_paper(p)
-        
-    paper_list.sort(key=lambda x: x['score'], reverse=True)
+    # Deduplicate by title while streaming, keeping only the top k in memory
+    ranker = StreamingRanker(k, key=score,
+                             dedup=lambda p: clean_text(p.title).lower(),
+                             merge=prefer_s2)
+    ranker.extend(p for p in papers if clean_text(p.title))
     
-    return paper_list[:6]
+    selected = ranker.ranked()
+    for p in selected:
+        p.score = score(p)
+    return selected
 
-def select_repos(repos):
-    # Sort by stars if available, otherwise random/first
-    # The fetch_github.py likely puts stars in the data
-    repos.sort(key=lambda x: int(x.get('stars', 0)), reverse=True)
-    return repos[:3]
+def select_repos(repos, k=3):
+    # Sort by stars if available
+    return top_k(repos, k, key=lambda x: x.stars)
 
-def generate_report(papers, repos, date_range):
-    md = f"# 具身智能·每周研究速递（{date_range}）\n\n"
-    
-    # Summary
-    md += "## 本周摘要\n"
-    md += "本周具身智能领域重点关注 VLA 模型与世界模型的结合。多项研究展示了通过大规模数据预训练提升机器人泛化能力的潜力，特别是在复杂环境下的操作任务中。同时，强化学习在 Sim-to-Real 迁移方面取得了新的突破。开源社区活跃，涌现出多个高质量的仿真环境和数据集。\n\n"
-    
+WEEKLY_SUMMARY = "本周具身智能领域重点关注 VLA 模型与世界模型的结合。多项研究展示了通过大规模数据预训练提升机器人泛化能力的潜力，特别是在复杂环境下的操作任务中。同时，强化学习在 Sim-to-Real 迁移方面取得了新的突破。开源社区活跃，涌现出多个高质量的仿真环境和数据集。"
+
+# Ranges longer than this are rendered as a monthly report
+WEEKLY_MAX_DAYS = 7
+
+PERIODS = {
+    'weekly': ("具身智能·每周研究速递", "本周摘要"),
+    'monthly': ("具身智能·月度研究速递", "本月摘要"),
+}
+
+def report_period(start, end):
+    """'weekly' or 'monthly' depending on the length of the range"""
+    days = (datetime.date.fromisoformat(end) - datetime.date.fromisoformat(start)).days + 1
+    return 'weekly' if days <= WEEKLY_MAX_DAYS else 'monthly'
+
+def default_output(start, end):
+    return f"/workspace/daily-papers/{report_period(start, end)}-{start}-to-{end}.md"
+
+def rollup_summary(merged):
+    """Summary built only from the merged daily summaries (topic counts, repos, HF items)"""
+    counts = merged.topic_counts
+    parts = [f"本期 {len(merged.days)} 天共追踪 {merged.candidates} 篇候选论文，其中 VLA 方向 {counts.get('VLA', 0)} 篇，"
+             f"世界模型方向 {counts.get('World Model', 0)} 篇，强化学习方向 {counts.get('RL', 0)} 篇。"]
+    if counts:
+        topic, n = counts.most_common(1)[0]
+        parts.append(f"候选论文最多的方向是 {topic}（{n} 篇）。")
+    if merged.repos:
+        top = max(merged.repos, key=lambda r: r.stars or 0)
+        parts.append(f"收录开源项目 {len(merged.repos)} 个，Star 最多的是 {top.name}（{top.stars or 0}）。")
+    if merged.hf_items:
+        parts.append(f"Hugging Face 新增模型 / 数据集 / Spaces 共 {len(merged.hf_items)} 个。")
+    return "".join(parts)
+
+def build_report(papers, repos, date_range, period='weekly', summary=WEEKLY_SUMMARY, trends=()):
+    """Build the structured weekly (or monthly) report model"""
     # Categorize papers
     categories = {'VLA': [], '世界模型': [], '强化学习': []}
     for p in papers:
-        title = p.get('title', '').lower()
-        summary = p.get('summary', '').lower()
-        if 'vla' in title or 'vision-language-action' in title or 'vision language action' in summary:
+        title = p.title.lower()
+        abstract = p.summary.lower()
+        if 'vla' in title or 'vision-language-action' in title or 'vision language action' in abstract:
             categories['VLA'].append(p)
-        elif 'world model' in title or 'world model' in summary:
+        elif 'world model' in title or 'world model' in abstract:
             categories['世界模型'].append(p)
         else:
             categories['强化学习'].append(p)
-            
-    # Write papers
+    
+    sections = []
     for cat, cat_papers in categories.items():
         if not cat_papers:
             continue
-        md += f"### {cat}\n\n"
+        section = Section(cat, level=3)
         for p in cat_papers:
-            title = clean_text(p.get('title', ''))
-            authors = p.get('authors', [])
-            if isinstance(authors, list):
-                # Handle if authors are dicts or strings
-                author_names = []
-                for a in authors:
-                    if isinstance(a, dict):
-                        author_names.append(a.get('name', ''))
-                    else:
-                        author_names.append(str(a))
-                authors_str = ", ".join(author_names[:3]) + (" et al." if len(author_names) > 3 else "")
-            else:
-                authors_str = str(authors)
-                
+            title = clean_text(p.title)
+            authors_str = ", ".join(p.authors[:3]) + (" et al." if len(p.authors) > 3 else "")
             institution = get_institution(p)
-            summary = clean_text(p.get('summary', ''))
-            # Truncate summary
-            summary = " ".join(summary.split()[:80]) + "..."
-            
-            md += f"#### {title}\n"
-            md += f"- **机构**: {institution}\n"
-            md += f"- **作者**: {authors_str}\n"
-            md += f"- **摘要**: {summary}\n\n"
-            
-    # Write repos
-    md += "## 开源项目精选\n\n"
+            enr = get_enrichment(p)
+            desc = enr.get('one_liner')
+            if not desc:
+                # Truncate summary
+                desc = " ".join(clean_text(p.summary).split()[:80]) + "..."
+            title_zh = enr.get('title_zh')
+            heading = f"{title}（{title_zh}）" if title_zh and title_zh != title else title
+            section.items.append(Item(
+                "paper", title, heading=heading,
+                fields=[("机构", institution), ("作者", authors_str), ("摘要", desc)],
+                meta={"org": institution, "desc": desc, "link": p.link or "", "id": p.id},
+            ))
+        sections.append(section)
+    
+    # Repos
+    repo_section = Section("开源项目精选", level=2)
     for r in repos:
-        name = r.get('name', '')
-        url = r.get('url', '')
-        desc = clean_text(r.get('description', ''))
-        stars = r.get('stars', 0)
-        
-        md += f"### [{name}]({url})\n"
-        md += f"- **Stars**: {stars}\n"
-        md += f"- **简介**: {desc}\n\n"
-        
-    # Trends
-    md += "## Crossing Trend\n\n"
-    md += "### 趋势 1: VLA 模型的规模化与多模态融合\n"
-    md += "本周的研究显示，VLA 模型正朝着更大规模和更多模态融合的方向发展。研究者们不再局限于简单的视觉-语言-动作映射，而是开始探索如何将触觉、听觉等更多模态信息融入模型中，以提升机器人在复杂环境下的感知和决策能力。这种多模态融合趋势预示着未来机器人将具备更接近人类的感知能力。\n\n"
-    md += "### 趋势 2: 世界模型驱动的强化学习\n"
-    md += "世界模型在强化学习中的应用日益成熟。通过构建环境的内部模型，智能体能够在“想象”中进行试错和规划，从而大幅减少对真实环境交互的依赖。本周的几篇论文展示了基于世界模型的 RL 算法在样本效率和最终性能上的显著提升，这对于昂贵的机器人硬件实验尤为重要。\n\n"
-    md += "### 趋势 3: Sim-to-Real 的无缝迁移\n"
-    md += "Sim-to-Real 仍然是具身智能的核心挑战之一。本周的开源项目和论文中，我们可以看到更多关注于高保真仿真环境构建和领域随机化技术的研究。这些进展使得在仿真中训练的策略能够更平滑地迁移到真实机器人上，降低了部署成本和风险。\n\n"
+        url = r.url or ''
+        repo_section.items.append(Item(
+            "repo", r.name, heading=f"[{r.name}]({url})",
+            fields=[("Stars", r.stars), ("简介", clean_text(r.description))],
+            meta={"url": url, "stars": r.stars},
+        ))
+    sections.append(repo_section)
     
-    return md
+    title, summary_heading = PERIODS[period]
+    return Report(
+        period, f"{title}（{date_range}）", date_range=date_range,
+        summary=summary, summary_heading=summary_heading, sections=sections,
+        trends=[Trend(*describe(t)) for t in trends],
+    )
 
-if __name__ == "__main__":
-    # Load all data
-    arxiv_files = ['/tmp/arxiv_week1.json', '/tmp/arxiv_week2.json', '/tmp/arxiv_week3.json']
-    papers = []
-    for f in arxiv_files:
-        papers.extend(load_json(f))
-        
-    s2_papers = load_json('/tmp/s2_papers.json')
-    papers.extend(s2_papers)
+def generate_report(papers, repos, date_range):
+    return render_markdown(build_report(papers, repos, date_range))
+
+def parse_range(value):
+    """Parse 'YYYY-MM-DD~YYYY-MM-DD' (spaces allowed) into (start, end) strings"""
+    start, _, end = value.partition('~')
+    start, end = start.strip(), end.strip()
+    for d in (start, end):
+        datetime.datetime.strptime(d, '%Y-%m-%d')
+    return start, end
+
+def default_range():
+    """The 7 days ending yesterday"""
+    end = datetime.date.today() - datetime.timedelta(days=1)
+    start = end - datetime.timedelta(days=6)
+    return start.isoformat(), end.isoformat()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the weekly Daily Paper report")
+    parser.add_argument("--range", type=str, default=None,
+                        help="Date range 'YYYY-MM-DD~YYYY-MM-DD', defaults to the 7 days ending yesterday")
+    parser.add_argument("--papers", nargs="+",
+                        default=['/tmp/arxiv_week1.json', '/tmp/arxiv_week2.json', '/tmp/arxiv_week3.json',
+                                 '/tmp/s2_papers.json'],
+                        help="Paper sources (.json or .jsonl)")
+    parser.add_argument("--repos", nargs="+", default=['/tmp/github_repos.json'])
+    parser.add_argument("--output", type=str, default=None)
+    parser.add_argument("--follow", action="store_true",
+                        help="Keep reading .jsonl sources until their producers finish")
+    parser.add_argument("--model", type=str, default=None,
+                        help="Report model JSON (defaults to the output path with .json)")
+    parser.add_argument("--card", type=str, default=None, help="Also write weekly card data here")
+    parser.add_argument("--doc-url", type=str, default=None, help="Full report link for the card")
+    parser.add_argument("--from-summaries", action="store_true",
+                        help="Merge the daily summaries in the range instead of reading raw fetch files")
+    parser.add_argument("--summary-dir", type=str, default=SUMMARY_DIR)
+    parser.add_argument("--trends-dir", type=str, default=TRENDS_DIR,
+                        help="Daily term statistics for the Crossing Trend section")
+    parser.add_argument("--enrich", type=str, default=ENRICH_BACKEND or None, choices=sorted(BACKENDS),
+                        help="Summarizer backend for translated titles and one-line summaries")
+    parser.add_argument("--enrich-cache", type=str, default=ENRICH_CACHE_DIR)
+    args = parser.parse_args(argv)
+    
+    start, end = parse_range(args.range) if args.range else default_range()
+    period = report_period(start, end)
+    summary = WEEKLY_SUMMARY if period == 'weekly' else ""
+    score = score_paper
     
-    repos = load_json('/tmp/github_repos.json')
+    if args.from_summaries:
+        # O(days): the daily runs already fetched, scored and kept a candidate pool
+        merged = rollup(start, end, args.summary_dir)
+        if not merged.days:
+            print(f"No daily summaries in {start} ~ {end}")
+            return 1
+        if merged.missing:
+            print(f"Warning: no daily summary for {', '.join(merged.missing)}")
+        papers, repos = merged.papers, merged.repos
+        # Data-driven summary only: no fixed WEEKLY_SUMMARY prose on the rollup path
+        summary = rollup_summary(merged)
+        # Rank by the scores the daily runs stored (re-score only papers without one)
+        def score(paper):
+            stored = merged.score(paper)
+            return score_paper(paper) if stored is None else stored
+    else:
+        # Stream all data
+        papers = as_papers(iter_records(args.papers, follow=args.follow))
+        repos = as_repos(iter_records(args.repos, follow=args.follow))
     
     # Select
-    selected_papers = select_papers(papers)
+    selected_papers = select_papers(papers, score=score)
     selected_repos = select_repos(repos)
     
-    # Generate
-    report = generate_report(selected_papers, selected_repos, "2026-02-17 ~ 2026-02-23")
+    # Papers already enriched by a daily run carry their results (or hit the cache)
+    if args.enrich:
+        stats = enrich_papers(selected_papers, args.enrich, args.enrich_cache)
+        print(f"Enrichment: {stats['cached']} cached, {stats['enriched']} new, {stats['failed']} failed")
     
-    # Save
-    output_path = "/workspace/daily-papers/weekly-2026-02-17-to-2026-02-23.md"
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'w') as f:
-        f.write(report)
+    # Build the model, then render markdown / model JSON / card concurrently
+    # Crossing Trend: term and co-occurrence lift against the previous period of the same length
+    trends = detect_trends(start, end, TrendStore(args.trends_dir))
+    if not trends:
+        print("No term statistics with enough lift in this range; omitting Crossing Trend")
+    
+    report = build_report(selected_papers, selected_repos, f"{start} ~ {end}", period, summary, trends)
+    output_path = args.output or default_output(start, end)
+    render_outputs(report, markdown=output_path, model=args.model or model_path(output_path),
+                   card=args.card, doc_url=args.doc_url)
         
     print(f"Report generated: {output_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 流水线阶段间的 JSON / JSONL 交换
+- .json：整份文档（兼容原有格式）
+- .jsonl：每行一条记录，生产者边产生边追加并 flush，结束时写出 <path>.done 标记
+  （内容为统计信息）；消费者可以 follow 模式增量读取，让打分与抓取重叠进行
+
+安装了 orjson 时自动使用（更快），否则回退到标准库 json。
+"""
+
+import json
+import os
+import time
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+# follow 模式下等待新数据的默认超时（秒，无新数据即停止）
+FOLLOW_IDLE_TIMEOUT = 600
+FOLLOW_POLL_INTERVAL = 0.2
+
+
+def dumps(obj) -> str:
+    """紧凑序列化（保留中文）"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def loads(s):
+    if orjson is not None:
+        return orjson.loads(s)
+    return json.loads(s)
+
+
+def load_document(path: str):
+    """读取整份 JSON 文档"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def dump_document(path: str, obj):
+    """写出整份 JSON 文档（缩进 2，保留中文）"""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+
+
+def is_stream(path: str) -> bool:
+    """按扩展名判断是否为 JSONL 流"""
+    return path.endswith(".jsonl")
+
+
+def done_marker(path: str) -> str:
+    return path + ".done"
+
+
+def failed_marker(path: str) -> str:
+    return path + ".failed"
+
+
+class JsonlWriter:
+    """
+    JSONL 追加写入：每条记录写完立即 flush，close 时写出 .done 标记；
+    作为上下文管理器时生产者抛出异常则改写 .failed 标记，消费者不会把截断的输出当作完整结果
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        # 清掉上一轮的完成 / 失败标记，避免消费者误判
+        for marker in (done_marker(path), failed_marker(path)):
+            if os.path.exists(marker):
+                os.remove(marker)
+        self._f = open(path, "w", encoding="utf-8")
+
+    def write(self, record: dict):
+        self._f.write(dumps(record) + "\n")
+        self._f.flush()
+        self.count += 1
+
+    def close(self, meta: dict = None):
+        if self._f is None:
+            return
+        self._f.close()
+        self._f = None
+        info = {"count": self.count}
+        if meta:
+            info.update(meta)
+        with open(done_marker(self.path), "w", encoding="utf-8") as f:
+            f.write(dumps(info))
+
+    def abort(self, error=None):
+        """生产者出错：关闭文件，写出 .failed 标记（不写 .done）"""
+        if self._f is None:
+            return
+        self._f.close()
+        self._f = None
+        with open(failed_marker(self.path), "w", encoding="utf-8") as f:
+            f.write(dumps({"count": self.count, "error": str(error) if error else None}))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort(exc)
+
+
+def iter_jsonl(path: str, follow: bool = False, idle_timeout: float = FOLLOW_IDLE_TIMEOUT):
+    """
+    增量读取 JSONL
+    follow=True 时一直读到生产者写出 .done 标记为止（文件尚未创建时先等待），
+    超过 idle_timeout 秒没有新数据时抛出 TimeoutError（不把截断的流当作完整结果）；
+    生产者写出 .failed 标记时抛出 RuntimeError
+    """
+    marker = done_marker(path)
+    failed = failed_marker(path)
+    last_progress = time.monotonic()
+
+    def check_failed():
+        if os.path.exists(failed):
+            raise RuntimeError(f"Producer of {path} failed: {loads(open(failed, encoding='utf-8').read())}")
+
+    if follow:
+        while not os.path.exists(path):
+            check_failed()
+            if time.monotonic() - last_progress > idle_timeout:
+                raise TimeoutError(f"Timed out waiting for {path}")
+            time.sleep(FOLLOW_POLL_INTERVAL)
+
+    check_failed()
+    with open(path, "r", encoding="utf-8") as f:
+        pending = ""
+        while True:
+            chunk = f.readline()
+            if chunk:
+                pending += chunk
+                if not pending.endswith("\n"):
+                    # 生产者写到一半，等待剩余部分
+                    if not follow:
+                        break
+                    continue
+                line = pending.strip()
+                pending = ""
+                last_progress = time.monotonic()
+                if line:
+                    yield loads(line)
+                continue
+            if not follow:
+                break
+            check_failed()
+            if os.path.exists(marker):
+                # 标记出现后再读一次，确保不漏掉最后几行
+                rest = f.read()
+                for line in (pending + rest).splitlines():
+                    if line.strip():
+                        yield loads(line)
+                return
+            if time.monotonic() - last_progress > idle_timeout:
+                raise TimeoutError(f"Timed out following {path} (no .done marker)")
+            time.sleep(FOLLOW_POLL_INTERVAL)
+
+        # 非 follow 模式：文件末尾没有换行的最后一条
+        if pending.strip():
+            try:
+                yield loads(pending)
+            except ValueError:
+                pass
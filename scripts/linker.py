@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 跨数据源关联
+把论文与 GitHub 仓库、Hugging Face 模型 / 数据集关联起来：
+
+- 先对仓库、HF 资源和 Papers With Code 记录建两个哈希索引：arXiv id → 资源、归一化 URL → 资源
+  （HF 标签中的 arxiv:XXXX、仓库描述 / README 中的 arXiv 链接、PwC 记录的代码仓库）
+- 再对论文做一遍线性扫描：用论文的 arXiv id 和 code_url / 摘要中的链接查索引，
+  命中的仓库写入 code_url 与 extra["linked_repos"]，模型 / 数据集写入 extra["checkpoints"]
+
+code_url 随之成为排序特征 has_code（日报 SCORE_WEIGHTS、周报 score_paper）。
+
+用法:
+  python linker.py --papers /tmp/arxiv_papers.json /tmp/s2_papers.json --repos /tmp/github_repos.json \\
+      --hf /tmp/huggingface.json --pwc /tmp/pwc_papers.json --output /tmp/papers_linked.json
+"""
+
+import argparse
+import re
+import urllib.parse
+
+from jsonio import dump_document
+from ranking import iter_records
+from records import Repo, hf_items as as_hf_items, papers as as_papers, repos as as_repos
+
+# 每篇论文最多保留的模型 / 数据集数
+MAX_CHECKPOINTS = 5
+
+# 命中方式的可信度（越小越可信）：arXiv id（含 PwC 记录）> 论文自带的 code_url / 项目主页 > 摘要中的链接
+MATCH_ARXIV = 0
+MATCH_LINK = 1
+MATCH_ABSTRACT = 2
+
+_ARXIV_RE = re.compile(r"(?<![\d.])(\d{4}\.\d{4,5})(?:v\d+)?(?![\d])")
+_ARXIV_TAG_RE = re.compile(r"^arxiv:(\d{4}\.\d{4,5})", re.IGNORECASE)
+_URL_RE = re.compile(r"https?://[^\s<>\"')\]]+")
+
+
+def normalize_url(url: str):
+    """
+    URL 归一化为索引键：去掉协议、www.、查询串、锚点、结尾的 / 与 .git，统一小写；
+    GitHub 只保留 owner/repo，arXiv 链接归为 arxiv id
+    """
+    if not url:
+        return None
+    parsed = urllib.parse.urlsplit(url.strip().rstrip(".,;"))
+    host = parsed.netloc.lower().removeprefix("www.")
+    if not host:
+        return None
+    parts = [p for p in parsed.path.split("/") if p]
+    if host == "github.com":
+        if len(parts) < 2:
+            return None
+        return f"github.com/{parts[0].lower()}/{parts[1].lower().removesuffix('.git')}"
+    if host.endswith("arxiv.org"):
+        m = _ARXIV_RE.search(parsed.path)
+        return f"arxiv:{m.group(1)}" if m else None
+    return "/".join([host] + parts).lower()
+
+
+def arxiv_ids(text: str) -> set:
+    """文本中出现的 arXiv id（不带版本号）"""
+    return set(_ARXIV_RE.findall(text or ""))
+
+
+def paper_arxiv_id(paper):
+    """论文自身的 arXiv id（不带版本号），不是 arXiv 论文时返回 None"""
+    for value in (paper.id, paper.link, paper.pdf_link):
+        m = _ARXIV_RE.search(value or "")
+        if m:
+            return m.group(1)
+    return None
+
+
+def hf_url(item) -> str:
+    if item.url:
+        return item.url
+    prefix = {"dataset": "datasets/", "space": "spaces/"}.get(item.type, "")
+    return f"https://huggingface.co/{prefix}{item.id}"
+
+
+class LinkIndex:
+    """arXiv id / 归一化 URL → 仓库、HF 资源的哈希索引"""
+
+    __slots__ = ("by_arxiv", "by_url")
+
+    def __init__(self):
+        # 键 → [(kind, record)]，kind 为 "repo" / "hf"
+        self.by_arxiv = {}
+        self.by_url = {}
+
+    def _add(self, table: dict, key, kind: str, record):
+        if not key:
+            return
+        entries = table.setdefault(key, [])
+        if all(r is not record for _, r in entries):
+            entries.append((kind, record))
+
+    def add_repo(self, repo):
+        self._add(self.by_url, normalize_url(repo.url), "repo", repo)
+        text = " ".join([repo.description, (repo.extra or {}).get("readme") or ""])
+        for aid in arxiv_ids(text):
+            self._add(self.by_arxiv, aid, "repo", repo)
+
+    def add_hf(self, item):
+        self._add(self.by_url, normalize_url(hf_url(item)), "hf", item)
+        for tag in item.tags:
+            m = _ARXIV_TAG_RE.match(tag)
+            if m:
+                self._add(self.by_arxiv, m.group(1), "hf", item)
+        for url in _URL_RE.findall(item.description):
+            key = normalize_url(url)
+            if key and key.startswith("arxiv:"):
+                self._add(self.by_arxiv, key[len("arxiv:"):], "hf", item)
+
+    def add_pwc(self, paper):
+        """PwC 记录自带代码仓库：按 arXiv id 登记一个只有 URL 和星数的仓库"""
+        aid = paper_arxiv_id(paper)
+        if not aid or not paper.code_url:
+            return
+        url_key = normalize_url(paper.code_url)
+        known = [r for kind, r in self.by_url.get(url_key, []) if kind == "repo"]
+        repo = known[0] if known else Repo(name=url_key.split("/", 1)[-1] if url_key else paper.code_url,
+                                           url=paper.code_url, stars=paper.stars, source="papers_with_code")
+        self._add(self.by_url, url_key, "repo", repo)
+        self._add(self.by_arxiv, aid, "repo", repo)
+
+    def lookup(self, paper) -> list:
+        """论文命中的 [(kind, record, match)]（去重保序，同一资源保留最可信的命中方式 MATCH_*）"""
+        urls = [(url, MATCH_LINK) for url in (paper.code_url, (paper.extra or {}).get("project_url"))]
+        urls += [(url, MATCH_ABSTRACT) for url in _URL_RE.findall(paper.summary)]
+        hits = [(kind, record, MATCH_ARXIV) for kind, record in self.by_arxiv.get(paper_arxiv_id(paper), [])]
+        for url, match in urls:
+            key = normalize_url(url)
+            if key and key.startswith("arxiv:"):
+                continue
+            hits += [(kind, record, match) for kind, record in self.by_url.get(key, [])]
+        unique, seen = [], set()
+        for kind, record, match in hits:
+            if id(record) not in seen:
+                seen.add(id(record))
+                unique.append((kind, record, match))
+        return unique
+
+
+def build_index(repos=(), hf_items=(), pwc_papers=()) -> LinkIndex:
+    index = LinkIndex()
+    for repo in repos:
+        index.add_repo(repo)
+    for item in hf_items:
+        index.add_hf(item)
+    for paper in pwc_papers:
+        index.add_pwc(paper)
+    return index
+
+
+def has_code(paper) -> bool:
+    """排序特征：论文有可用的代码仓库（来自关联结果或全文 / 摘要中的 GitHub 链接）"""
+    return bool(paper.code_url)
+
+
+def link_papers(papers, index: LinkIndex) -> dict:
+    """
+    一遍扫描为论文写入关联结果（原地更新）：仓库先按命中方式排序（arXiv id / PwC 优先于摘要链接），
+    同一命中方式内按星数排序，排第一的作为 code_url；全部仓库和模型 / 数据集写入 extra；
+    返回 {"repos", "checkpoints"} 命中计数
+    """
+    stats = {"repos": 0, "checkpoints": 0}
+    for p in papers:
+        hits = index.lookup(p)
+        if not hits:
+            continue
+        # 摘要里顺带提到的高星仓库（基线、依赖库）不能盖过 arXiv id 直接命中的仓库：星数只在同一命中方式内比较
+        repos = [r for _, r, _ in sorted((h for h in hits if h[0] == "repo"),
+                                         key=lambda h: (h[2], -(h[1].stars or 0)))]
+        items = [i for _, i, _ in sorted((h for h in hits if h[0] == "hf"),
+                                         key=lambda h: (h[2], -(h[1].likes + h[1].downloads)))]
+        extra = dict(p.extra or {})
+        if repos:
+            if not p.code_url:
+                p.code_url = repos[0].url
+            if p.stars is None:
+                p.stars = repos[0].stars
+            extra["linked_repos"] = [{"name": r.name, "url": r.url, "stars": r.stars} for r in repos]
+            stats["repos"] += 1
+        if items:
+            extra["checkpoints"] = [{"id": h.id, "type": h.type, "url": hf_url(h)}
+                                    for h in items[:MAX_CHECKPOINTS]]
+            stats["checkpoints"] += 1
+        p.extra = extra
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Link papers to GitHub repos and Hugging Face artifacts")
+    parser.add_argument("--papers", nargs="+", required=True, help="Paper sources (.json or .jsonl)")
+    parser.add_argument("--repos", nargs="+", default=[], help="fetch_github.py output")
+    parser.add_argument("--hf", nargs="+", default=[], help="fetch_huggingface.py output")
+    parser.add_argument("--pwc", nargs="+", default=[], help="fetch_pwc.py output")
+    parser.add_argument("--output", type=str, required=True, help="Linked papers JSON")
+    args = parser.parse_args(argv)
+
+    index = build_index(as_repos(iter_records(args.repos)), as_hf_items(iter_records(args.hf)),
+                        as_papers(iter_records(args.pwc)))
+    papers = list(as_papers(iter_records(args.papers)))
+    stats = link_papers(papers, index)
+    dump_document(args.output, {"papers": [p.to_dict() for p in papers]})
+    print(f"Linked {len(papers)} papers ({len(index.by_arxiv)} arXiv ids, {len(index.by_url)} urls indexed): "
+          f"{stats['repos']} with repos, {stats['checkpoints']} with checkpoints -> {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
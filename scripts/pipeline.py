@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - DAG 流水线（日报 / 周报统一入口）
+声明各阶段及其依赖，互不依赖的阶段（各数据源抓取、卡片与发布等下游渲染）并行执行；
+--date / --range 贯穿所有阶段；每个阶段完成后记录到运行目录的 state.json，
+失败后重跑同一命令即从上次成功的阶段继续。
+
+各阶段在进程内直接调用对应脚本的 main(argv)，产物可选地经过 stage_cache 复用。
+
+用法:
+  python pipeline.py daily [--date 2026-02-24] [--doc-id <DOC_ID>]
+  python pipeline.py weekly [--range 2026-02-17~2026-02-23] [--doc-id <DOC_ID>]
+  python pipeline.py daily --dry-run           # 只打印执行计划
+  python pipeline.py daily --fresh             # 忽略上次的进度重新执行
+"""
+
+import argparse
+import ast
+import functools
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta
+
+from report_model import model_path
+from summaries import SUMMARY_DIR, summary_path
+from trends import TrendStore
+from stage_cache import StageCache, STAGE_CACHE_DIR
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 运行目录（中间产物与进度）、报告目录、卡片数据目录
+RUNS_DIR = "/tmp/daily-paper"
+REPORTS_DIR = "/workspace/daily-papers"
+CARD_DATA_DIR = "/workspace/data"
+SITE_DIR = "/workspace/site"
+
+FEISHU_DOC_URL = "https://chj.feishu.cn/docx/{doc_id}"
+
+# 日报全文预取的候选数：预取排在机构 / 代码链接抽取之前，此时的排名还没有重点机构、has_code 等特征，
+# 最终入选日报的 12 篇可能不在当时的前 12 名，因此预取一个更宽的候选池
+PREFETCH_POOL = 40
+
+
+def run_script(module: str, argv: list):
+    """在当前进程内调用脚本的 main(argv)，非 0 返回值视为失败"""
+    mod = importlib.import_module(module)
+    try:
+        rc = mod.main(argv)
+    except SystemExit as e:
+        rc = e.code
+    if rc not in (None, 0):
+        raise RuntimeError(f"{module} exited with {rc}")
+
+
+@functools.lru_cache(maxsize=None)
+def module_sources(module: str) -> tuple:
+    """
+    模块及其传递导入的本地脚本（scripts/ 下的 .py，含函数内的延迟导入），按名称排序；
+    作为阶段缓存的输入，任一被依赖的脚本改动都会让阶段重新计算
+    """
+    found, pending = set(), [module]
+    while pending:
+        name = pending.pop()
+        path = os.path.join(SCRIPTS_DIR, name + ".py")
+        if name in found or not os.path.exists(path):
+            continue
+        found.add(name)
+        with open(path, "r", encoding="utf-8") as f:
+            tree = ast.parse(f.read(), path)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                pending += [alias.name.split(".")[0] for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                pending.append(node.module.split(".")[0])
+    return tuple(os.path.join(SCRIPTS_DIR, name + ".py") for name in sorted(found))
+
+
+class Stage:
+    """流水线阶段：module 的 main(argv) + 依赖 + 输入输出（用于缓存与断点续跑）"""
+
+    __slots__ = ("name", "module", "argv", "deps", "inputs", "outputs", "cacheable")
+
+    def __init__(self, name: str, module: str, argv: list, deps=(), inputs=(), outputs=(),
+                 cacheable: bool = True):
+        self.name = name
+        self.module = module
+        self.argv = list(argv)
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.cacheable = cacheable
+
+    def run(self):
+        run_script(self.module, self.argv)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, deps={self.deps})"
+
+
+class Pipeline:
+    """按依赖关系调度阶段，记录进度以便失败后续跑"""
+
+    def __init__(self, name: str, stages: list, run_dir: str, workers: int = 4,
+                 cache: StageCache = None, config: dict = None):
+        self.name = name
+        self.stages = {s.name: s for s in stages}
+        self.run_dir = run_dir
+        self.workers = workers
+        self.cache = cache
+        self.config = config or {}
+        self.state_path = os.path.join(run_dir, "state.json")
+        self.state = {}
+        self._lock = threading.Lock()
+        for s in stages:
+            for d in s.deps:
+                if d not in self.stages:
+                    raise ValueError(f"Stage {s.name} depends on unknown stage {d}")
+
+    def load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+
+    def _save_state(self):
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def _mark(self, name: str, status: str, **extra):
+        with self._lock:
+            entry = {"status": status, "time": datetime.now().isoformat()}
+            entry.update(extra)
+            self.state[name] = entry
+            self._save_state()
+
+    def is_done(self, name: str) -> bool:
+        """上次运行已完成且产物仍在"""
+        entry = self.state.get(name)
+        if not entry or entry.get("status") != "done":
+            return False
+        return all(os.path.exists(p) for p in self.stages[name].outputs)
+
+    def order(self) -> list:
+        """拓扑序（用于打印计划和检测环）"""
+        result, visiting, done = [], set(), set()
+
+        def visit(n):
+            if n in done:
+                return
+            if n in visiting:
+                raise ValueError(f"Cycle at stage {n}")
+            visiting.add(n)
+            for d in self.stages[n].deps:
+                visit(d)
+            visiting.discard(n)
+            done.add(n)
+            result.append(n)
+
+        for n in self.stages:
+            visit(n)
+        return result
+
+    def _execute(self, stage: Stage):
+        started = time.monotonic()
+        print(f"[{self.name}] ▶ {stage.name}")
+        if self.cache is not None and stage.cacheable:
+            config = dict(self.config, argv=stage.argv)
+            inputs = stage.inputs + list(module_sources(stage.module))
+            # 模板版本（如 generate_report.TEMPLATE_VERSION）变化时显式失效
+            version = str(getattr(importlib.import_module(stage.module), "TEMPLATE_VERSION", ""))
+            self.cache.run(stage.name, stage.run, inputs=inputs, config=config, outputs=stage.outputs,
+                           version=version)
+        else:
+            stage.run()
+        return time.monotonic() - started
+
+    def run(self) -> bool:
+        """执行整个 DAG，返回是否全部成功"""
+        os.makedirs(self.run_dir, exist_ok=True)
+        self.order()
+        done = {n for n in self.stages if self.is_done(n)}
+        for n in sorted(done):
+            print(f"[{self.name}] ✓ {n} (done in a previous run)")
+        failed = set()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while True:
+                blocked = blocked_closure(self, failed)
+                ready = [s for n, s in self.stages.items()
+                         if n not in done and n not in failed and n not in blocked
+                         and n not in running.values()
+                         and all(d in done for d in s.deps)]
+                for s in ready:
+                    running[pool.submit(self._execute, s)] = s.name
+                if not running:
+                    break
+                finished, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    name = running.pop(fut)
+                    try:
+                        elapsed = fut.result()
+                    except BaseException as e:
+                        print(f"[{self.name}] ✗ {name}: {e}")
+                        failed.add(name)
+                        self._mark(name, "failed", error=str(e))
+                    else:
+                        print(f"[{self.name}] ✓ {name} ({elapsed:.1f}s)")
+                        done.add(name)
+                        self._mark(name, "done", seconds=round(elapsed, 2))
+
+        skipped = [n for n in self.stages if n not in done and n not in failed]
+        if failed:
+            print(f"[{self.name}] failed: {sorted(failed)}; skipped: {skipped}")
+            print(f"[{self.name}] rerun the same command to resume from the failed stages")
+            return False
+        print(f"[{self.name}] all {len(self.stages)} stages done")
+        return True
+
+
+def blocked_closure(pipeline: Pipeline, failed: set) -> set:
+    """所有（传递地）依赖失败阶段的阶段"""
+    blocked = set()
+    changed = True
+    while changed:
+        changed = False
+        for n, s in pipeline.stages.items():
+            if n in blocked or n in failed:
+                continue
+            if any(d in failed or d in blocked for d in s.deps):
+                blocked.add(n)
+                changed = True
+    return blocked
+
+
+# ---------- 日报 / 周报 DAG ----------
+
+def enrich_argv(enrich: str = None) -> list:
+    """渲染阶段的论文增强参数（增强结果按论文缓存，日报 / 周报 / 卡片共用）"""
+    return ["--enrich", enrich] if enrich else []
+
+
+def fetch_stage(name: str, module: str, argv: list, output: str) -> Stage:
+    """
+    网络抓取阶段，不走阶段缓存：抓取脚本遇到网络错误时写出空 / 不完整的结果并正常退出，
+    缓存后同样的命令会一直复用降级的结果；同一次运行内的续跑由进度文件保证不重复抓取
+    """
+    return Stage(name, module, argv, outputs=[output], cacheable=False)
+
+
+def export_stage(render: str) -> Stage:
+    """静态站点导出（自身按报告内容增量更新，不走阶段缓存）"""
+    return Stage("export", "export_site", ["--reports-dir", REPORTS_DIR, "--output", SITE_DIR],
+                 deps=[render], cacheable=False)
+
+
+def daily_stages(day: str, work: str, doc_id: str = None, enrich: str = None,
+                 summary_dir: str = SUMMARY_DIR) -> list:
+    """
+    日报：五个数据源并行抓取 → 全文预取 → 机构 / 代码链接抽取 → 论文与仓库 / HF 资源关联
+    → 渲染 → 发布 / 导出站点（并行：术语统计）
+    day 为报告日期；arXiv 取前一天提交的论文（与 fetch.py 默认的「昨天」一致）
+    """
+    fetch_day = (date.fromisoformat(day) - timedelta(days=1)).isoformat()
+    arxiv = os.path.join(work, "arxiv_papers.json")
+    s2 = os.path.join(work, "s2_papers.json")
+    papers = os.path.join(work, "papers_affiliations.json")
+    linked = os.path.join(work, "papers_linked.json")
+    github = os.path.join(work, "github_repos.json")
+    hf = os.path.join(work, "huggingface.json")
+    pwc = os.path.join(work, "pwc_papers.json")
+    report = os.path.join(REPORTS_DIR, f"{day}-cn.md")
+    model = model_path(report)
+    summary = summary_path(day, summary_dir)
+    trend_counts = TrendStore().day_path(day)
+
+    stages = [
+        fetch_stage("fetch_arxiv", "fetch", ["--date", fetch_day, "--output", arxiv], arxiv),
+        fetch_stage("fetch_s2", "fetch_semantic_scholar", ["--days", "7", "--output", s2], s2),
+        fetch_stage("fetch_github", "fetch_github", ["--output", github], github),
+        fetch_stage("fetch_hf", "fetch_huggingface", ["--output", hf], hf),
+        # PwC 记录自带代码仓库，供关联阶段补全 code_url（接口出错时输出空列表，不阻塞日报）
+        fetch_stage("fetch_pwc", "fetch_pwc", ["--output", pwc], pwc),
+        Stage("render_daily", "generate_report",
+              ["--date", day, "--papers", linked, "--repos", github, "--hf", hf, "--output", report,
+               "--summary-dir", summary_dir, *enrich_argv(enrich)],
+              deps=["link", "fetch_github", "fetch_hf"],
+              inputs=[linked, github, hf], outputs=[report, model, summary]),
+        # 预取候选池的全文并抽取章节，撰写时直接读本地文本
+        Stage("prefetch", "prefetch", ["--papers", arxiv, s2, "--top", str(PREFETCH_POOL)],
+              deps=["fetch_arxiv", "fetch_s2"], inputs=[arxiv, s2], cacheable=False),
+        # 从 arXiv 元数据和已预取的全文首页抽取机构、代码 / 项目链接（读预取缓存，不走阶段缓存）
+        Stage("affiliations", "affiliations", ["--input", arxiv, s2, "--output", papers],
+              deps=["prefetch"], inputs=[arxiv, s2], outputs=[papers], cacheable=False),
+        # 按 arXiv id / 归一化 URL 把论文关联到 GitHub 仓库、HF 模型 / 数据集和 PwC 记录的代码
+        Stage("link", "linker",
+              ["--papers", papers, "--repos", github, "--hf", hf, "--pwc", pwc, "--output", linked],
+              deps=["affiliations", "fetch_github", "fetch_hf", "fetch_pwc"],
+              inputs=[papers, github, hf, pwc], outputs=[linked]),
+        # 当天论文的术语统计（更新共享的认领记录，不走阶段缓存）
+        Stage("trends", "trends", ["add", "--date", day, "--papers", arxiv, s2],
+              deps=["fetch_arxiv", "fetch_s2"], inputs=[arxiv, s2], outputs=[trend_counts], cacheable=False),
+    ]
+    if doc_id:
+        stages.append(Stage("publish", "feishu", ["--input", model, "--doc-id", doc_id],
+                            deps=["render_daily"], inputs=[model]))
+    stages.append(export_stage("render_daily"))
+    return stages
+
+
+def weekly_stages(start: str, end: str, work: str, doc_id: str = None, enrich: str = None,
+                  summary_dir: str = SUMMARY_DIR) -> list:
+    """
+    周报 / 月报：区间内每天都有日报摘要时直接合并摘要渲染，否则回填抓取整个区间的
+    arXiv + S2 + GitHub 再渲染 → 卡片数据 / 发布 / 导出站点
+    """
+    from generate_weekly_report import default_output, report_period
+    from summaries import iter_days, missing_days
+    from trends import previous_range
+
+    period = report_period(start, end)
+    report = default_output(start, end)
+    model = model_path(report)
+    card = os.path.join(CARD_DATA_DIR, f"{period}-paper-{end}.json")
+    # Crossing Trend 读取本期与上期的每日术语统计
+    store = TrendStore()
+    trend_counts = [store.day_path(d) for d in iter_days(*previous_range(start, end))]
+    trend_counts += [store.day_path(d) for d in iter_days(start, end)]
+
+    if not missing_days(start, end, summary_dir):
+        summaries = [summary_path(d, summary_dir) for d in iter_days(start, end)]
+        stages = [Stage("render_weekly", "generate_weekly_report",
+                        ["--range", f"{start}~{end}", "--from-summaries", "--summary-dir", summary_dir,
+                         "--output", report, *enrich_argv(enrich)],
+                        inputs=summaries + trend_counts, outputs=[report, model])]
+        return stages + weekly_outputs(start, end, model, card, doc_id)
+
+    d0 = date.fromisoformat(start)
+    d1 = date.fromisoformat(end)
+    days = (d1 - d0).days + 1
+
+    # 多日回填：按天分片翻页取完整个区间（fetch.py --date 只取最新 300 条，旧的周会几乎为空），
+    # 再按论文发布日期逐天补记术语统计（已计入其它日期的论文会被跳过）
+    arxiv = os.path.join(work, "arxiv_range.json")
+    arxiv_files = [arxiv]
+    # 回填有任一分片失败就非 0 退出，成功退出即说明区间已取完整，可以走阶段缓存
+    stages = [Stage("fetch_arxiv", "fetch", ["--start", start, "--end", end, "--output", arxiv],
+                    outputs=[arxiv])]
+    # 逐天串行：每天的去重依赖前一天认领的论文，结果与按日期顺序运行一致
+    previous = "fetch_arxiv"
+    for day in iter_days(start, end):
+        stages.append(Stage(f"trends_{day}", "trends",
+                            ["add", "--date", day, "--papers", arxiv, "--published-only"],
+                            deps=[previous], inputs=[arxiv], cacheable=False))
+        previous = f"trends_{day}"
+
+    s2 = os.path.join(work, "s2_papers.json")
+    github = os.path.join(work, "github_repos.json")
+    pwc = os.path.join(work, "pwc_papers.json")
+    linked = os.path.join(work, "papers_linked.json")
+    fetches = ["fetch_arxiv", "fetch_s2", "fetch_github", "fetch_pwc"]
+
+    stages += [
+        fetch_stage("fetch_s2", "fetch_semantic_scholar", ["--days", str(days), "--output", s2], s2),
+        fetch_stage("fetch_github", "fetch_github", ["--days", str(days), "--output", github], github),
+        fetch_stage("fetch_pwc", "fetch_pwc", ["--days", str(days), "--output", pwc], pwc),
+        Stage("link", "linker",
+              ["--papers", *arxiv_files, s2, "--repos", github, "--pwc", pwc, "--output", linked],
+              deps=fetches, inputs=arxiv_files + [s2, github, pwc], outputs=[linked]),
+        Stage("render_weekly", "generate_weekly_report",
+              ["--range", f"{start}~{end}", "--papers", linked, "--repos", github, "--output", report,
+               *enrich_argv(enrich)],
+              # 术语统计串行链的最后一天写完后才读取 TrendStore
+              deps=["link", f"trends_{end}"], inputs=[linked, github] + trend_counts, outputs=[report, model]),
+    ]
+    return stages + weekly_outputs(start, end, model, card, doc_id)
+
+
+def weekly_outputs(start: str, end: str, model: str, card: str, doc_id: str = None) -> list:
+    """周报渲染之后的阶段：卡片与发布都直接读报告模型，不再重新解析 Markdown"""
+    stages = []
+    card_argv = ["--input", model, "--output", card, "--range", f"{start} ~ {end}"]
+    if doc_id:
+        card_argv += ["--doc-url", FEISHU_DOC_URL.format(doc_id=doc_id)]
+        stages.append(Stage("publish", "feishu", ["--input", model, "--doc-id", doc_id],
+                            deps=["render_weekly"], inputs=[model]))
+    stages.append(Stage("card", "generate_card_data", card_argv, deps=["render_weekly"],
+                        inputs=[model], outputs=[card]))
+    stages.append(export_stage("render_weekly"))
+    return stages
+
+
+def build_pipeline(job: str, args) -> Pipeline:
+    cache = None if args.no_cache else StageCache(args.cache_dir)
+    if job == "daily":
+        day = args.date or datetime.now().strftime("%Y-%m-%d")
+        work = os.path.join(args.runs_dir, f"daily-{day}")
+        stages = daily_stages(day, work, args.doc_id, args.enrich, args.summary_dir)
+        config = {"date": day}
+    else:
+        from generate_weekly_report import default_range, parse_range
+        start, end = parse_range(args.range) if args.range else default_range()
+        work = os.path.join(args.runs_dir, f"weekly-{start}-to-{end}")
+        stages = weekly_stages(start, end, work, args.doc_id, args.enrich, args.summary_dir)
+        config = {"range": f"{start}~{end}"}
+    return Pipeline(job, stages, work, workers=args.workers, cache=cache, config=config)
+
+
+def add_arguments(parser):
+    parser.add_argument("--doc-id", type=str, default=None, help="Publish to this Feishu document")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel stages")
+    parser.add_argument("--enrich", type=str, default=None,
+                        help="Summarizer backend for the rendered papers (stub / http)")
+    parser.add_argument("--summary-dir", type=str, default=SUMMARY_DIR,
+                        help="Daily summaries written by daily runs and merged by weekly runs")
+    parser.add_argument("--runs-dir", type=str, default=RUNS_DIR)
+    parser.add_argument("--cache-dir", type=str, default=STAGE_CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true", help="Do not reuse cached stage outputs")
+    parser.add_argument("--fresh", action="store_true", help="Ignore progress from a previous run")
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without running")
+
+
+def run(job: str, args) -> int:
+    pipeline = build_pipeline(job, args)
+    if args.dry_run:
+        for n in pipeline.order():
+            s = pipeline.stages[n]
+            deps = f" <- {', '.join(s.deps)}" if s.deps else ""
+            print(f"{n}: {s.module} {' '.join(s.argv)}{deps}")
+        return 0
+    if not args.fresh:
+        pipeline.load_state()
+    return 0 if pipeline.run() else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily Paper pipeline runner")
+    sub = parser.add_subparsers(dest="job", required=True)
+
+    p_daily = sub.add_parser("daily", help="Daily report")
+    p_daily.add_argument("--date", type=str, default=None,
+                         help="Report date (YYYY-MM-DD), defaults to today; arXiv papers are fetched for the day before")
+    add_arguments(p_daily)
+
+    p_weekly = sub.add_parser("weekly", help="Weekly report")
+    p_weekly.add_argument("--range", type=str, default=None,
+                          help="Date range 'YYYY-MM-DD~YYYY-MM-DD', defaults to the 7 days ending yesterday")
+    add_arguments(p_weekly)
+
+    args = parser.parse_args(argv)
+    return run(args.job, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
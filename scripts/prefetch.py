@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - arXiv 全文预取缓存
+写每篇论文之前需要先读 arXiv HTML 全文。本脚本对排名靠前的候选论文并发下载 HTML 版本
+（没有 HTML 时回退到 PDF），并在进程池中抽取摘要 / 引言 / 方法 / 实验 / 结论等章节文本，
+撰写时直接读本地文本，不用再逐篇联网。
+
+- 存储：原文 gzip 压缩后按内容哈希存放（objects/xx/<sha256>.gz），相同内容只存一份；
+  index.json 记录 arXiv id → 内容哈希及最近访问时间
+- 淘汰：原文总大小超过 --max-bytes 时按最近访问时间淘汰
+- 章节：sections/<sha256>.json，同样按内容寻址；另含首页信息 front（作者 / 机构区域文本及链接），
+  供 affiliations.py 抽取机构和代码链接
+
+用法:
+  python prefetch.py --papers /tmp/arxiv_papers.json /tmp/s2_papers.json --top 12
+  python prefetch.py --show 2602.18224
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from html.parser import HTMLParser
+
+from fetch import RateLimiter
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # 可选依赖：没有时 PDF 只缓存原文，不抽取章节
+    PdfReader = None
+
+PREFETCH_DIR = "/workspace/data/paper-cache"
+
+ARXIV_HTML = "https://arxiv.org/html/{id}"
+ARXIV_PDF = "https://arxiv.org/pdf/{id}"
+USER_AGENT = "daily-paper-prefetch/1.0"
+
+# 下载线程数 / 相邻请求的最小间隔（秒，所有线程共享）/ 请求超时
+PREFETCH_WORKERS = 4
+REQUEST_INTERVAL = 0.5
+REQUEST_TIMEOUT = 60
+
+# 原文缓存上限（压缩后字节数）
+MAX_CACHE_BYTES = 2 << 30
+
+# 每个章节保留的最大字符数
+MAX_SECTION_CHARS = 20000
+
+# 章节标题关键词 → 规范章节名（按顺序匹配，先命中者优先）
+SECTION_KEYWORDS = [
+    ("abstract", ("abstract",)),
+    ("introduction", ("introduction",)),
+    ("related_work", ("related work", "background", "preliminar")),
+    ("experiments", ("experiment", "evaluation", "results", "benchmark", "ablation")),
+    ("conclusion", ("conclusion", "discussion", "limitation", "future work")),
+    ("method", ("method", "approach", "framework", "architecture", "formulation", "model", "design")),
+]
+
+# 首页作者 / 机构区域保留的最大字符数
+MAX_FRONT_CHARS = 4000
+
+_URL_RE = re.compile(r"https?://[^\s<>\"')\]]+")
+_ARXIV_ID_RE = re.compile(r"(\d{4}\.\d{4,5}(?:v\d+)?)")
+
+
+def arxiv_id(paper):
+    """论文的 arXiv id（可带版本号），不是 arXiv 论文时返回 None"""
+    for value in (paper.id, paper.link, paper.pdf_link):
+        m = _ARXIV_ID_RE.search(value or "")
+        if m:
+            return m.group(1)
+    return None
+
+
+def section_name(heading: str) -> str:
+    lowered = re.sub(r"^[\d.\s]+", "", heading.lower())
+    for name, keywords in SECTION_KEYWORDS:
+        if any(k in lowered for k in keywords):
+            return name
+    return "other"
+
+
+# ---------- 章节抽取（进程池中执行） ----------
+
+class _ArxivHTMLParser(HTMLParser):
+    """
+    arXiv（LaTeXML）HTML：ltx_abstract 为摘要，h2 为一级章节，更深的标题并入当前章节；
+    ltx_authors 为作者 / 机构区域，第一个 h2 之前的链接视为首页链接
+    """
+
+    SKIP = {"script", "style", "annotation", "annotation-xml", "nav", "footer", "header"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.sections = {}
+        self.headings = []
+        self._current = None
+        self._skip = 0
+        self._heading = None
+        self._abstract_depth = 0
+        self._authors_depth = 0
+        self.front = []
+        self.front_urls = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+            return
+        attrs = dict(attrs)
+        classes = attrs.get("class") or ""
+        if tag == "a" and not self._skip and not self.headings and (attrs.get("href") or "").startswith("http"):
+            self.front_urls.append(attrs["href"])
+        if self._authors_depth:
+            self._authors_depth += tag == "div"
+        elif tag == "div" and "ltx_authors" in classes:
+            self._authors_depth = 1
+        if self._abstract_depth:
+            self._abstract_depth += tag == "div"
+        elif tag == "div" and "ltx_abstract" in classes:
+            self._abstract_depth = 1
+            self._current = "abstract"
+        if tag == "h2" and not self._abstract_depth:
+            self._heading = []
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+            return
+        if self._abstract_depth and tag == "div":
+            self._abstract_depth -= 1
+        if self._authors_depth and tag == "div":
+            self._authors_depth -= 1
+        if tag == "h2" and self._heading is not None:
+            heading = " ".join("".join(self._heading).split())
+            self._heading = None
+            self.headings.append(heading)
+            self._current = section_name(heading)
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._authors_depth:
+            self.front.append(data)
+        if self._heading is not None:
+            self._heading.append(data)
+        elif self._current:
+            self.sections.setdefault(self._current, []).append(data)
+
+
+def _extract_html(data: bytes) -> dict:
+    parser = _ArxivHTMLParser()
+    parser.feed(data.decode("utf-8", errors="replace"))
+    sections = {name: " ".join(" ".join(parts).split())[:MAX_SECTION_CHARS]
+                for name, parts in parser.sections.items()}
+    if "abstract" in sections:
+        sections["abstract"] = re.sub(r"^abstract[\s.:]*", "", sections["abstract"], flags=re.IGNORECASE)
+    front = {"text": " ".join(" ".join(parser.front).split())[:MAX_FRONT_CHARS],
+             "urls": parser.front_urls + _URL_RE.findall(sections.get("abstract", ""))}
+    return {"sections": sections, "headings": parser.headings, "front": front}
+
+
+_PDF_HEADING_RE = re.compile(
+    r"^\s*(?:\d+\.?|[IVX]+\.)?\s*(abstract|introduction|related work|background|method|methods|approach|"
+    r"experiments?|evaluation|results|conclusions?|discussion|limitations)\s*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def _extract_pdf(data: bytes) -> dict:
+    if PdfReader is None:
+        return {"sections": {}, "headings": [], "note": "pypdf not installed"}
+    import io
+
+    reader = PdfReader(io.BytesIO(data))
+    pages = [page.extract_text() or "" for page in reader.pages]
+    text = "\n".join(pages)
+    # 首页：摘要之前的部分为作者 / 机构区域，链接取整个首页
+    first = pages[0] if pages else ""
+    m = re.search(r"^\s*abstract", first, re.IGNORECASE | re.MULTILINE)
+    front = {"text": " ".join((first[:m.start()] if m else first).split())[:MAX_FRONT_CHARS],
+             "urls": _URL_RE.findall(first)}
+    matches = list(_PDF_HEADING_RE.finditer(text))
+    sections, headings = {}, []
+    for i, m in enumerate(matches):
+        body_end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        heading = m.group(0).strip()
+        headings.append(heading)
+        name = section_name(heading)
+        body = " ".join(text[m.end():body_end].split())
+        sections[name] = (sections.get(name, "") + " " + body).strip()[:MAX_SECTION_CHARS]
+    return {"sections": sections, "headings": headings, "front": front}
+
+
+def _extract(job: tuple) -> dict:
+    """worker 端：(类型, gzip 原文路径) → 章节"""
+    kind, path = job
+    with gzip.open(path, "rb") as f:
+        data = f.read()
+    return _extract_html(data) if kind == "html" else _extract_pdf(data)
+
+
+# ---------- 内容寻址缓存 ----------
+
+class PaperCache:
+    """原文与章节的内容寻址缓存"""
+
+    def __init__(self, cache_dir: str = PREFETCH_DIR):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    def object_path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, "objects", sha[:2], f"{sha}.gz")
+
+    def sections_path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, "sections", sha[:2], f"{sha}.json")
+
+    def has(self, key: str) -> bool:
+        entry = self.index.get(key)
+        return bool(entry) and os.path.exists(self.object_path(entry["sha"]))
+
+    def put(self, key: str, kind: str, url: str, data: bytes) -> str:
+        sha = hashlib.sha256(data).hexdigest()
+        path = self.object_path(sha)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with gzip.open(tmp, "wb", compresslevel=6) as f:
+                f.write(data)
+            os.replace(tmp, path)
+        now = time.time()
+        with self._lock:
+            self.index[key] = {"sha": sha, "kind": kind, "url": url, "size": os.path.getsize(path),
+                               "fetched": now, "accessed": now}
+        return sha
+
+    def save_sections(self, sha: str, sections: dict):
+        path = self.sections_path(sha)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(sections, f, ensure_ascii=False)
+
+    def sections(self, key: str):
+        """论文的章节文本（未缓存时返回 None），同时刷新访问时间"""
+        entry = self.index.get(key)
+        if entry is None:
+            # 不带版本号查询时匹配任一版本
+            entry = next((e for k, e in self.index.items() if k.split("v")[0] == key), None)
+        if entry is None or not os.path.exists(self.sections_path(entry["sha"])):
+            return None
+        entry["accessed"] = time.time()
+        with open(self.sections_path(entry["sha"]), "r", encoding="utf-8") as f:
+            return dict(json.load(f), source=entry["kind"], url=entry["url"])
+
+    def evict(self, max_bytes: int = MAX_CACHE_BYTES, keep=()) -> int:
+        """原文总大小超过 max_bytes 时按最近访问时间淘汰（keep 中的论文不淘汰），返回淘汰的论文数"""
+        sizes = {e["sha"]: e["size"] for e in self.index.values()}
+        total = sum(sizes.values())
+        evicted = 0
+        for key, entry in sorted(self.index.items(), key=lambda kv: kv[1]["accessed"]):
+            if total <= max_bytes:
+                break
+            if key in keep:
+                continue
+            del self.index[key]
+            evicted += 1
+            sha = entry["sha"]
+            if any(e["sha"] == sha for e in self.index.values()):
+                continue
+            total -= sizes[sha]
+            for path in (self.object_path(sha), self.sections_path(sha)):
+                if os.path.exists(path):
+                    os.remove(path)
+        return evicted
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp = f"{self.index_path}.tmp{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp, self.index_path)
+
+
+# ---------- 下载 ----------
+
+def _get(url: str, limiter: RateLimiter) -> bytes:
+    limiter.wait()
+    req = urllib.request.Request(url, headers={"User-Agent": USER_AGENT})
+    with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as resp:
+        return resp.read()
+
+
+def download(aid: str, limiter: RateLimiter) -> tuple:
+    """(类型, url, 原文)：优先 HTML，没有 HTML 版本时下载 PDF"""
+    url = ARXIV_HTML.format(id=aid)
+    try:
+        data = _get(url, limiter)
+        if b"ltx_document" in data or b"ltx_page" in data:
+            return "html", url, data
+    except urllib.error.HTTPError as e:
+        if e.code != 404:
+            raise
+    url = ARXIV_PDF.format(id=aid)
+    data = _get(url, limiter)
+    if not data.startswith(b"%PDF"):
+        raise ValueError(f"{url} did not return a PDF")
+    return "pdf", url, data
+
+
+def prefetch(papers: list, cache_dir: str = PREFETCH_DIR, workers: int = PREFETCH_WORKERS,
+             extract_workers: int = 0, max_bytes: int = MAX_CACHE_BYTES, force: bool = False) -> dict:
+    """
+    并发下载论文原文并抽取章节，返回 {"cached", "fetched", "failed", "extract_failed", "evicted"}
+    extract_workers=0 时按 CPU 核数，1 表示在当前进程内抽取
+    单篇下载 / 抽取失败只计入统计；无论成败都会写回缓存索引
+    """
+    cache = PaperCache(cache_dir)
+    stats = {"cached": 0, "fetched": 0, "failed": 0, "extract_failed": 0, "evicted": 0}
+    ids = []
+    for p in papers:
+        aid = arxiv_id(p)
+        if aid and aid not in ids:
+            ids.append(aid)
+    todo = []
+    for aid in ids:
+        if not force and cache.has(aid) and cache.sections(aid) is not None:
+            stats["cached"] += 1
+        else:
+            todo.append(aid)
+
+    limiter = RateLimiter(REQUEST_INTERVAL)
+
+    def fetch_one(aid):
+        try:
+            kind, url, data = download(aid, limiter)
+            sha = cache.put(aid, kind, url, data)
+        except Exception as e:
+            print(f"  {aid}: download failed: {e}")
+            return None
+        print(f"  {aid}: {kind} {len(data) // 1024} KB")
+        return kind, sha
+
+    def save_one(sha, extract):
+        try:
+            cache.save_sections(sha, extract())
+        except Exception as e:
+            print(f"  {sha[:12]}: extraction failed: {e}")
+            stats["extract_failed"] += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            downloaded = [r for r in pool.map(fetch_one, todo)]
+        stats["failed"] = sum(r is None for r in downloaded)
+        stats["fetched"] = len(downloaded) - stats["failed"]
+
+        # 章节抽取是纯 CPU 的 HTML / PDF 解析，放到进程池里；逐篇收集结果，一篇解析失败不影响其它
+        jobs = {sha: kind for kind, sha in filter(None, downloaded)
+                if force or not os.path.exists(cache.sections_path(sha))}
+        n = extract_workers or os.cpu_count() or 1
+        if n > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(n, len(jobs))) as pool:
+                futures = {pool.submit(_extract, (kind, cache.object_path(sha))): sha for sha, kind in jobs.items()}
+                for fut in as_completed(futures):
+                    save_one(futures[fut], fut.result)
+        else:
+            for sha, kind in jobs.items():
+                save_one(sha, lambda: _extract((kind, cache.object_path(sha))))
+
+        stats["evicted"] = cache.evict(max_bytes, keep=set(ids))
+    finally:
+        cache.save()
+    return stats
+
+
+def load_sections(paper_id: str, cache_dir: str = PREFETCH_DIR):
+    """撰写时读取论文的章节文本（{"sections": {...}, "headings": [...], "source", "url"}）"""
+    return PaperCache(cache_dir).sections(paper_id)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prefetch arXiv full text for the top ranked papers")
+    parser.add_argument("--papers", nargs="+", default=None, help="Paper sources (.json or .jsonl)")
+    parser.add_argument("--top", type=int, default=12, help="Prefetch the top N ranked candidates")
+    parser.add_argument("--cache-dir", type=str, default=PREFETCH_DIR)
+    parser.add_argument("--workers", type=int, default=PREFETCH_WORKERS, help="Download threads")
+    parser.add_argument("--extract-workers", type=int, default=0, help="Section extraction processes")
+    parser.add_argument("--max-bytes", type=int, default=MAX_CACHE_BYTES, help="Cache size limit (compressed)")
+    parser.add_argument("--force", action="store_true", help="Download again even if cached")
+    parser.add_argument("--show", type=str, default=None, help="Print the cached sections of one paper")
+    args = parser.parse_args(argv)
+
+    if args.show:
+        doc = load_sections(args.show, args.cache_dir)
+        if doc is None:
+            print(f"{args.show} is not cached")
+            return 1
+        print(f"{args.show} ({doc['source']}: {doc['url']})")
+        for name, text in doc["sections"].items():
+            print(f"\n[{name}] {len(text)} chars\n{text[:300]}...")
+        return 0
+    if not args.papers:
+        parser.error("--papers is required unless --show is given")
+
+    from generate_report import rank_papers
+
+    top = rank_papers(args.papers, k=args.top)
+    print(f"Prefetching {len(top)} papers into {args.cache_dir}")
+    stats = prefetch(top, args.cache_dir, args.workers, args.extract_workers, args.max_bytes, args.force)
+    print(f"Prefetch done: {stats['cached']} cached, {stats['fetched']} fetched, "
+          f"{stats['failed']} failed, {stats['extract_failed']} extraction failed, {stats['evicted']} evicted")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 流式 Top-K 排序
+从任意数量的数据源文件（或任意可迭代对象）惰性读取记录，只维护每个分组的
+Top-K 小顶堆，内存占用与 K 成正比而不是与语料规模成正比。
+
+用法（在其它脚本中）:
+  ranker = StreamingRanker(12, key=score_paper, dedup=lambda p: p.title.lower())
+  ranker.extend(iter_records(["/tmp/arxiv_papers.json", "/tmp/s2_papers.json"]))
+  top = ranker.ranked()
+"""
+
+import heapq
+import itertools
+import os
+
+from jsonio import is_stream, iter_jsonl, load_document
+
+# 数据源文件中记录列表所在的键
+RECORD_KEYS = ("papers", "repos", "items")
+
+_uid = itertools.count()
+
+
+def iter_records(sources, keys=RECORD_KEYS, follow: bool = False):
+    """
+    惰性遍历多个数据源的记录
+    sources 中每一项可以是文件路径（.json 文档或 .jsonl 逐行记录）或可迭代对象；
+    follow=True 时 .jsonl 数据源会一直读到生产者写完（见 jsonio.iter_jsonl）
+    """
+    for source in sources:
+        if not isinstance(source, str):
+            yield from source
+            continue
+        if is_stream(source):
+            if not follow and not os.path.exists(source):
+                print(f"Warning: {source} not found.")
+                continue
+            yield from iter_jsonl(source, follow=follow)
+            continue
+        if not os.path.exists(source):
+            print(f"Warning: {source} not found.")
+            continue
+        try:
+            data = load_document(source)
+        except Exception as e:
+            print(f"Error loading {source}: {e}")
+            continue
+        if isinstance(data, dict):
+            data = next((data[k] for k in keys if data.get(k)), [])
+        # 单个文件处理完即释放
+        yield from data
+        del data
+
+
+class _Heap:
+    """单个分组的 Top-K 小顶堆，支持按 dedup 键合并重复记录"""
+
+    __slots__ = ("k", "heap", "live", "stale")
+
+    def __init__(self, k: int):
+        self.k = k
+        self.heap = []     # [score, -seq, uid, item, dedup_key, alive]
+        self.live = {}     # dedup_key -> entry
+        self.stale = 0
+
+    def _evict(self):
+        while len(self.heap) - self.stale > self.k:
+            entry = heapq.heappop(self.heap)
+            if not entry[5]:
+                self.stale -= 1
+                continue
+            if entry[4] is not None:
+                self.live.pop(entry[4], None)
+        # 懒删除的条目过多时重建堆
+        if self.stale > self.k:
+            self.heap = [e for e in self.heap if e[5]]
+            heapq.heapify(self.heap)
+            self.stale = 0
+
+    def push(self, score, seq, item, dkey):
+        if self.k <= 0:
+            return
+        # uid 保证同分同序号（合并后重新入堆）时不会比较到记录本身
+        entry = [score, -seq, next(_uid), item, dkey, True]
+        if len(self.heap) - self.stale >= self.k and entry[:2] <= self.heap[0][:2]:
+            # 不可能进入 Top-K：先清掉堆顶的失效条目再比较
+            while self.heap and not self.heap[0][5]:
+                heapq.heappop(self.heap)
+                self.stale -= 1
+            if entry[:2] <= self.heap[0][:2]:
+                return
+        heapq.heappush(self.heap, entry)
+        if dkey is not None:
+            self.live[dkey] = entry
+        self._evict()
+
+    def replace(self, old, score, item):
+        """合并后重新打分：旧条目置为失效，以原始顺序号重新入堆"""
+        old[5] = False
+        self.stale += 1
+        self.live.pop(old[4], None)
+        self.push(score, -old[1], item, old[4])
+
+    def ranked(self) -> list:
+        entries = sorted((e for e in self.heap if e[5]), key=lambda e: (e[0], e[1]), reverse=True)
+        return [e[3] for e in entries]
+
+
+class StreamingRanker:
+    """
+    有界内存的流式排序器
+
+    Args:
+        k: 每个分组保留的条数
+        key: 打分函数，分数越高越靠前；同分时先到的记录优先（与稳定排序一致）
+        group: 可选的分组函数（如按 primary_topic），每组各保留 Top-K
+        dedup: 可选的去重键函数；只在当前堆内的记录之间去重
+        merge: 重复记录的合并函数 merge(existing, new) -> 保留的记录，默认保留先到的
+    """
+
+    def __init__(self, k: int, key, group=None, dedup=None, merge=None):
+        self.k = k
+        self.key = key
+        self.group = group
+        self.dedup = dedup
+        self.merge = merge or (lambda existing, new: existing)
+        self.heaps = {}
+        self.seen = 0
+        self._seq = itertools.count()
+
+    def push(self, item):
+        self.seen += 1
+        seq = next(self._seq)
+        gkey = self.group(item) if self.group else None
+        heap = self.heaps.get(gkey)
+        if heap is None:
+            heap = self.heaps[gkey] = _Heap(self.k)
+        dkey = self.dedup(item) if self.dedup else None
+        if dkey is not None and dkey in heap.live:
+            old = heap.live[dkey]
+            kept = self.merge(old[3], item)
+            heap.replace(old, self.key(kept), kept)
+            return
+        heap.push(self.key(item), seq, item, dkey)
+
+    def extend(self, items):
+        for item in items:
+            self.push(item)
+        return self
+
+    def ranked(self) -> list:
+        """按排名输出（有分组时合并所有分组后整体排序）"""
+        if not self.group:
+            heap = self.heaps.get(None)
+            return heap.ranked() if heap else []
+        entries = [e for heap in self.heaps.values() for e in heap.heap if e[5]]
+        entries.sort(key=lambda e: (e[0], e[1]), reverse=True)
+        return [e[3] for e in entries]
+
+    def ranked_by_group(self) -> dict:
+        """按分组输出 {group: [按排名排列的记录]}"""
+        return {g: heap.ranked() for g, heap in self.heaps.items()}
+
+
+def top_k(items, k: int, key, **kwargs) -> list:
+    """便捷函数：对任意可迭代对象取 Top-K，按排名返回"""
+    return StreamingRanker(k, key, **kwargs).extend(items).ranked()
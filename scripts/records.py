@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 共享记录类型
+所有抓取脚本输出、所有生成脚本读取的紧凑记录（__slots__）：
+
+- Paper：arXiv / Semantic Scholar / Papers With Code 论文
+- Repo：GitHub 仓库
+- HFItem：Hugging Face 模型 / 数据集 / Space
+
+from_dict 统一各数据源的字段别名（summary/abstract、link/url、pdf_link/pdf_url、
+作者为字符串或字典等），下游代码不再需要到处做 .get() 兜底和格式归一；
+分类、主题等高重复度字符串做 intern，降低大批量回填时的内存占用。
+"""
+
+import re
+import sys
+
+_intern = sys.intern
+
+
+def _first(d: dict, *keys, default=None):
+    """按顺序返回第一个非空字段"""
+    for k in keys:
+        v = d.get(k)
+        if v is not None and v != "":
+            return v
+    return default
+
+
+def _istr(value):
+    """intern 字符串（None 原样返回）"""
+    return _intern(value) if isinstance(value, str) else value
+
+
+def normalize_authors(authors) -> tuple:
+    """
+    作者归一化：支持 "A, B" 字符串、字符串列表、[{name, affiliation}] 字典列表
+    返回 (作者名列表, 机构列表)
+    """
+    if not authors:
+        return [], []
+    if isinstance(authors, str):
+        return [a.strip() for a in re.split(r",|\band\b", authors) if a.strip()], []
+    names, affiliations = [], []
+    for a in authors:
+        if isinstance(a, dict):
+            name = a.get("name") or ""
+            aff = a.get("affiliation") or a.get("affiliations")
+            if isinstance(aff, list):
+                affiliations.extend(x for x in aff if x)
+            elif aff:
+                affiliations.append(aff)
+        else:
+            name = str(a) if a is not None else ""
+        if name:
+            names.append(name)
+    return names, affiliations
+
+
+class Paper:
+    """论文记录"""
+
+    __slots__ = (
+        "id", "title", "summary", "authors", "affiliations", "published",
+        "link", "pdf_link", "code_url", "categories", "source",
+        "primary_topic", "topic_relevance", "is_relevant",
+        "priority_affiliation", "priority_series", "is_priority",
+        "tracked_author", "citations", "stars", "score", "related", "extra",
+    )
+
+    # from_dict 中已消费的字段（含别名），其余字段保留在 extra 中
+    _KNOWN = frozenset(__slots__) | {"abstract", "url", "url_abs", "pdf_url", "url_pdf", "paperId"}
+
+    def __init__(self, id="", title="", summary="", authors=None, affiliations=None,
+                 published=None, link=None, pdf_link=None, code_url=None, categories=None,
+                 source="arxiv", primary_topic=None, topic_relevance=None, is_relevant=False,
+                 priority_affiliation=None, priority_series=None, is_priority=False,
+                 tracked_author=None, citations=None, stars=None, score=None, related=None,
+                 extra=None):
+        self.id = id or ""
+        self.title = title or ""
+        self.summary = summary or ""
+        self.authors = authors or []
+        self.affiliations = affiliations or []
+        self.published = published
+        self.link = link
+        self.pdf_link = pdf_link
+        self.code_url = code_url
+        self.categories = [_istr(c) for c in categories if c] if categories else []
+        self.source = _istr(source)
+        self.primary_topic = _istr(primary_topic)
+        self.topic_relevance = topic_relevance or {}
+        self.is_relevant = is_relevant
+        self.priority_affiliation = _istr(priority_affiliation)
+        self.priority_series = _istr(priority_series)
+        self.is_priority = is_priority
+        self.tracked_author = _istr(tracked_author)
+        self.citations = citations
+        self.stars = stars
+        self.score = score
+        self.related = related
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Paper":
+        if isinstance(d, cls):
+            return d
+        authors, author_affs = normalize_authors(d.get("authors"))
+        affiliations = d.get("affiliations") or author_affs
+        extra = {k: v for k, v in d.items() if k not in cls._KNOWN}
+        return cls(
+            id=_first(d, "id", "paperId", default=""),
+            title=(d.get("title") or "").strip(),
+            summary=(_first(d, "summary", "abstract", default="") or "").strip(),
+            authors=authors,
+            affiliations=list(affiliations),
+            published=d.get("published"),
+            link=_first(d, "link", "url", "url_abs"),
+            pdf_link=_first(d, "pdf_link", "pdf_url", "url_pdf"),
+            code_url=d.get("code_url"),
+            categories=d.get("categories"),
+            source=d.get("source") or "arxiv",
+            primary_topic=d.get("primary_topic"),
+            topic_relevance=d.get("topic_relevance"),
+            is_relevant=d.get("is_relevant", False),
+            priority_affiliation=d.get("priority_affiliation"),
+            priority_series=d.get("priority_series"),
+            is_priority=d.get("is_priority", False),
+            tracked_author=d.get("tracked_author"),
+            citations=d.get("citations"),
+            stars=d.get("stars"),
+            score=d.get("score"),
+            related=d.get("related"),
+            extra=extra or None,
+        )
+
+    def to_dict(self) -> dict:
+        d = {
+            "source": self.source,
+            "id": self.id,
+            "title": self.title,
+            "summary": self.summary,
+            "authors": self.authors,
+            "published": self.published,
+            "link": self.link,
+            "pdf_link": self.pdf_link,
+            "categories": self.categories,
+            "topic_relevance": self.topic_relevance,
+            "primary_topic": self.primary_topic,
+            "is_relevant": self.is_relevant,
+            "priority_affiliation": self.priority_affiliation,
+            "priority_series": self.priority_series,
+            "is_priority": self.is_priority,
+        }
+        # 可选字段只在有值时输出
+        for key in ("affiliations", "code_url", "tracked_author", "citations", "stars", "score", "related"):
+            value = getattr(self, key)
+            if value is not None and value != []:
+                d[key] = value
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"Paper(id={self.id!r}, title={self.title[:40]!r})"
+
+
+class Repo:
+    """GitHub 仓库记录"""
+
+    __slots__ = (
+        "source", "name", "description", "url", "stars", "forks", "language",
+        "topics", "created_at", "updated_at", "is_new", "matched_topic", "extra",
+    )
+
+    _KNOWN = frozenset(__slots__) | {"full_name", "html_url", "stargazers_count", "forks_count"}
+
+    def __init__(self, name="", description="", url=None, stars=0, forks=0, language=None,
+                 topics=None, created_at=None, updated_at=None, is_new=False,
+                 matched_topic=None, source="github", extra=None):
+        self.source = _istr(source)
+        self.name = name or ""
+        self.description = description or ""
+        self.url = url
+        self.stars = int(stars or 0)
+        self.forks = int(forks or 0)
+        self.language = _istr(language)
+        self.topics = [_istr(t) for t in topics if t] if topics else []
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.is_new = is_new
+        self.matched_topic = _istr(matched_topic)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Repo":
+        if isinstance(d, cls):
+            return d
+        extra = {k: v for k, v in d.items() if k not in cls._KNOWN}
+        return cls(
+            name=_first(d, "name", "full_name", default=""),
+            description=d.get("description"),
+            url=_first(d, "url", "html_url"),
+            stars=_first(d, "stars", "stargazers_count", default=0),
+            forks=_first(d, "forks", "forks_count", default=0),
+            language=d.get("language"),
+            topics=d.get("topics"),
+            created_at=d.get("created_at"),
+            updated_at=d.get("updated_at"),
+            is_new=d.get("is_new", False),
+            matched_topic=d.get("matched_topic"),
+            source=d.get("source") or "github",
+            extra=extra or None,
+        )
+
+    def to_dict(self) -> dict:
+        d = {
+            "source": self.source,
+            "name": self.name,
+            "description": self.description,
+            "url": self.url,
+            "stars": self.stars,
+            "forks": self.forks,
+            "language": self.language,
+            "topics": self.topics,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "is_new": self.is_new,
+        }
+        if self.matched_topic is not None:
+            d["matched_topic"] = self.matched_topic
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"Repo(name={self.name!r}, stars={self.stars})"
+
+
+class HFItem:
+    """Hugging Face 模型 / 数据集 / Space 记录"""
+
+    __slots__ = (
+        "source", "type", "id", "name", "author", "description", "tags",
+        "downloads", "likes", "last_modified", "url", "is_priority", "sdk", "extra",
+    )
+
+    _KNOWN = frozenset(__slots__) | {"modelId", "lastModified"}
+
+    def __init__(self, id="", type="model", name=None, author=None, description="", tags=None,
+                 downloads=0, likes=0, last_modified=None, url=None, is_priority=False,
+                 sdk=None, source="huggingface", extra=None):
+        self.source = _istr(source)
+        self.type = _istr(type)
+        self.id = id or ""
+        self.name = name or self.id
+        self.author = _istr(author)
+        self.description = description or ""
+        self.tags = [_istr(t) for t in tags if t] if tags else []
+        self.downloads = int(downloads or 0)
+        self.likes = int(likes or 0)
+        self.last_modified = last_modified
+        self.url = url
+        self.is_priority = is_priority
+        self.sdk = _istr(sdk)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "HFItem":
+        if isinstance(d, cls):
+            return d
+        extra = {k: v for k, v in d.items() if k not in cls._KNOWN}
+        return cls(
+            id=d.get("id"),
+            type=d.get("type") or "model",
+            name=_first(d, "name", "modelId", "id"),
+            author=d.get("author"),
+            description=d.get("description"),
+            tags=d.get("tags"),
+            downloads=d.get("downloads"),
+            likes=d.get("likes"),
+            last_modified=_first(d, "last_modified", "lastModified"),
+            url=d.get("url"),
+            is_priority=d.get("is_priority", False),
+            sdk=d.get("sdk"),
+            source=d.get("source") or "huggingface",
+            extra=extra or None,
+        )
+
+    def to_dict(self) -> dict:
+        d = {
+            "source": self.source,
+            "type": self.type,
+            "id": self.id,
+            "name": self.name,
+            "author": self.author,
+            "description": self.description,
+            "tags": self.tags,
+            "downloads": self.downloads,
+            "likes": self.likes,
+            "last_modified": self.last_modified,
+            "url": self.url,
+            "is_priority": self.is_priority,
+        }
+        if self.sdk is not None:
+            d["sdk"] = self.sdk
+        if self.extra:
+            d.update(self.extra)
+        return d
+
+    def __repr__(self):
+        return f"HFItem(id={self.id!r}, type={self.type!r})"
+
+
+def papers(records) -> "map":
+    """惰性转换为 Paper"""
+    return map(Paper.from_dict, records)
+
+
+def repos(records) -> "map":
+    """惰性转换为 Repo"""
+    return map(Repo.from_dict, records)
+
+
+def hf_items(records) -> "map":
+    """惰性转换为 HFItem"""
+    return map(HFItem.from_dict, records)
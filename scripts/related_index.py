@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 历史论文近邻索引（相关历史工作）
+为每篇入选论文检索以往报告中最相似的 3-5 篇论文。
+
+- 向量：标题 + 摘要的特征哈希词袋（unigram + bigram），L2 归一化后以 float32
+  追加写入 vectors.f32，查询时通过 mmap 只读映射，不需要把历史整体读入内存
+- 索引：随机超平面 LSH（多表），桶表持久化在 buckets.json，新论文到达时增量更新
+- 查询：取各表同桶（不足时做 1-bit 多探针）的候选，再用精确余弦相似度重排
+- 并发：加载和追加持有目录级文件锁；向量 / 条目文件被其它进程改动后，
+  常驻进程中缓存的实例在复用和追加前重新加载
+
+用法:
+  python related_index.py add --input /tmp/arxiv_papers.json
+  python related_index.py query --title "..." [--summary "..."] [-k 5]
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import random
+import re
+import threading
+import zlib
+from array import array
+from contextlib import contextmanager
+
+from records import Paper
+
+try:
+    import fcntl
+except ImportError:  # 非 POSIX 平台不加锁
+    fcntl = None
+
+# 默认索引目录（跨天持久化）
+RELATED_INDEX_DIR = "/workspace/data/related-index"
+
+# 向量维度 / LSH 表数 / 每表签名位数
+DIM = 256
+N_TABLES = 8
+N_BITS = 12
+SEED = 20260224
+
+# 低于该相似度的结果不展示
+MIN_SIMILARITY = 0.2
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "in", "is", "it", "its", "of", "on", "or", "that", "the", "their", "this", "to",
+    "we", "with", "our", "can", "which", "via", "using", "based", "towards", "toward",
+    "into", "these", "such", "both", "also", "than", "while", "show", "propose",
+    "proposed", "approach", "method", "methods", "paper", "results", "new",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+def _tokens(text: str) -> list:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def vectorize(title: str, summary: str = "") -> dict:
+    """特征哈希：返回稀疏向量 {维度: 权重}，已 L2 归一化"""
+    counts = {}
+    for text, weight in ((title or "", 2.0), (summary or "", 1.0)):
+        toks = _tokens(text)
+        grams = toks + [f"{a} {b}" for a, b in zip(toks, toks[1:])]
+        for g in grams:
+            h = zlib.crc32(g.encode("utf-8"))
+            idx = h % DIM
+            sign = 1.0 if (h >> 20) & 1 else -1.0
+            counts[idx] = counts.get(idx, 0.0) + sign * weight
+    vec = {}
+    for idx, c in counts.items():
+        if c:
+            # 次线性 tf
+            vec[idx] = math.copysign(1.0 + math.log(abs(c)), c)
+    norm = math.sqrt(sum(v * v for v in vec.values()))
+    if norm == 0:
+        return {}
+    return {i: v / norm for i, v in vec.items()}
+
+
+def paper_key(paper: Paper) -> str:
+    """论文唯一键：优先 arXiv id（去掉版本号），否则用规范化标题"""
+    if paper.id:
+        return re.sub(r"v\d+$", "", str(paper.id))
+    return re.sub(r"\s+", " ", paper.title.lower().strip())
+
+
+class RelatedIndex:
+    """基于随机投影 LSH 的持久化近邻索引"""
+
+    def __init__(self, index_dir: str = RELATED_INDEX_DIR):
+        self.index_dir = index_dir
+        self.vectors_path = os.path.join(index_dir, "vectors.f32")
+        self.items_path = os.path.join(index_dir, "items.jsonl")
+        self.buckets_path = os.path.join(index_dir, "buckets.json")
+        self.lock_path = os.path.join(index_dir, ".lock")
+
+        # 超平面由固定种子生成，无需落盘
+        rng = random.Random(SEED)
+        self.planes = [
+            [[rng.gauss(0.0, 1.0) for _ in range(DIM)] for _ in range(N_BITS)]
+            for _ in range(N_TABLES)
+        ]
+
+        self._mmap = None
+        self._view = None
+        self._stamp = None
+        with self._locked():
+            self._reload()
+
+    # ---------- 持久化 ----------
+
+    @contextmanager
+    def _locked(self):
+        """目录级互斥锁（关闭文件即释放），与其它进程的加载 / 追加互斥"""
+        os.makedirs(self.index_dir, exist_ok=True)
+        with open(self.lock_path, "w") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _file_stamp(self) -> tuple:
+        """向量 / 条目文件的 (大小, 修改时间)，用于发现其它进程的写入"""
+        stamp = []
+        for path in (self.vectors_path, self.items_path):
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def is_stale(self) -> bool:
+        return self._file_stamp() != self._stamp
+
+    def _reload(self):
+        """丢弃内存中的状态并从磁盘重新加载（未保存的桶表由 _repair_buckets 从向量重建）"""
+        self._unmap()
+        self.items = []
+        self.rows_by_key = {}
+        self.buckets = [{} for _ in range(N_TABLES)]
+        self._dirty = False
+        self._load()
+        self._stamp = self._file_stamp()
+
+    def refresh(self):
+        """其它进程改动过索引文件时重新加载"""
+        if self.is_stale():
+            with self._locked():
+                self._reload()
+
+    def _load(self):
+        if os.path.exists(self.items_path):
+            with open(self.items_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        try:
+                            item = json.loads(line)
+                        except ValueError:
+                            # 最后一行写到一半
+                            break
+                        self.rows_by_key[item["key"]] = len(self.items)
+                        self.items.append(item)
+        if os.path.exists(self.buckets_path):
+            with open(self.buckets_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.buckets = [{int(sig): rows for sig, rows in table.items()} for table in data["tables"]]
+
+        # 向量文件与条目文件行数不一致（上次写入中断）时，两者都截断到较小的行数
+        vector_rows = os.path.getsize(self.vectors_path) // (DIM * 4) if os.path.exists(self.vectors_path) else 0
+        rows = min(len(self.items), vector_rows)
+        if os.path.exists(self.vectors_path) and os.path.getsize(self.vectors_path) != rows * DIM * 4:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(rows * DIM * 4)
+        if len(self.items) > rows:
+            for item in self.items[rows:]:
+                del self.rows_by_key[item["key"]]
+            del self.items[rows:]
+            tmp = self.items_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                for item in self.items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            os.replace(tmp, self.items_path)
+        self._repair_buckets(rows)
+
+    def _repair_buckets(self, rows: int):
+        """桶表只在 save() 时写出：丢掉已截断的行，把上次保存之后加入的行重新分桶"""
+        for table in self.buckets:
+            for sig in list(table):
+                kept = [r for r in table[sig] if r < rows]
+                if kept:
+                    table[sig] = kept
+                else:
+                    del table[sig]
+        bucketed = {r for members in self.buckets[0].values() for r in members}
+        missing = [r for r in range(rows) if r not in bucketed]
+        if not missing:
+            return
+        with open(self.vectors_path, "rb") as f:
+            for row in missing:
+                f.seek(row * DIM * 4)
+                dense = array("f")
+                dense.frombytes(f.read(DIM * 4))
+                vec = {i: v for i, v in enumerate(dense) if v}
+                for table, sig in zip(self.buckets, self._signatures(vec)):
+                    members = table.setdefault(sig, [])
+                    if row not in members:
+                        members.append(row)
+        self._dirty = True
+
+    def _map(self):
+        """只读映射向量矩阵"""
+        self._unmap()
+        if not self.items or not os.path.exists(self.vectors_path):
+            return
+        f = open(self.vectors_path, "rb")
+        try:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()
+        self._view = memoryview(self._mmap).cast("f")
+
+    def _unmap(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def save(self):
+        """写回桶表（原子替换）"""
+        if not self._dirty:
+            return
+        os.makedirs(self.index_dir, exist_ok=True)
+        tmp = self.buckets_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"dim": DIM, "tables": self.buckets}, f, separators=(",", ":"))
+        os.replace(tmp, self.buckets_path)
+        self._dirty = False
+
+    def close(self):
+        self.save()
+        self._unmap()
+
+    def __len__(self):
+        return len(self.items)
+
+    # ---------- LSH ----------
+
+    def _signatures(self, vec: dict) -> list:
+        sigs = []
+        for table in self.planes:
+            sig = 0
+            for bit, plane in enumerate(table):
+                if sum(plane[i] * v for i, v in vec.items()) >= 0:
+                    sig |= 1 << bit
+            sigs.append(sig)
+        return sigs
+
+    def add(self, papers: list) -> int:
+        """增量加入论文，已存在的论文跳过；返回新增数量"""
+        with self._locked():
+            # 持锁后再确认行数：其它进程追加过时先重新加载，新行号才与文件对齐
+            if self.is_stale():
+                self._reload()
+            added = self._append(papers)
+            self._stamp = self._file_stamp()
+        if added:
+            self._dirty = True
+            self._unmap()
+        return added
+
+    def _append(self, papers: list) -> int:
+        added = 0
+        with open(self.vectors_path, "ab") as vf, open(self.items_path, "a", encoding="utf-8") as itf:
+            for paper in papers:
+                key = paper_key(paper)
+                if not key or key in self.rows_by_key:
+                    continue
+                vec = vectorize(paper.title, paper.summary)
+                if not vec:
+                    continue
+                row = len(self.items)
+                dense = array("f", [0.0]) * DIM
+                for i, v in vec.items():
+                    dense[i] = v
+                vf.write(dense.tobytes())
+                item = {
+                    "key": key,
+                    "title": paper.title,
+                    "link": paper.link or "",
+                    "published": (paper.published or "")[:10],
+                }
+                itf.write(json.dumps(item, ensure_ascii=False) + "\n")
+                self.items.append(item)
+                self.rows_by_key[key] = row
+                for table, sig in zip(self.buckets, self._signatures(vec)):
+                    table.setdefault(sig, []).append(row)
+                added += 1
+        return added
+
+    def query(self, paper: Paper, k: int = 5, min_similarity: float = MIN_SIMILARITY) -> list:
+        """返回最相似的 k 篇历史论文 [{title, link, published, similarity}]"""
+        if not self.items:
+            return []
+        vec = vectorize(paper.title, paper.summary)
+        if not vec:
+            return []
+        if self._view is None:
+            self._map()
+        if self._view is None:
+            return []
+
+        sigs = self._signatures(vec)
+        candidates = set()
+        for table, sig in zip(self.buckets, sigs):
+            candidates.update(table.get(sig, ()))
+        if len(candidates) < k * 4:
+            # 多探针：翻转每一位再查一次
+            for table, sig in zip(self.buckets, sigs):
+                for bit in range(N_BITS):
+                    candidates.update(table.get(sig ^ (1 << bit), ()))
+
+        self_key = paper_key(paper)
+        view = self._view
+        scored = []
+        for row in candidates:
+            if self.items[row]["key"] == self_key:
+                continue
+            base = row * DIM
+            sim = sum(v * view[base + i] for i, v in vec.items())
+            if sim >= min_similarity:
+                scored.append((sim, row))
+        scored.sort(reverse=True)
+
+        results = []
+        for sim, row in scored[:k]:
+            item = self.items[row]
+            results.append({
+                "title": item["title"],
+                "link": item["link"],
+                "published": item["published"],
+                "similarity": round(sim, 3),
+            })
+        return results
+
+
+_open_indexes = {}
+_open_lock = threading.Lock()
+
+
+def open_index(index_dir: str = RELATED_INDEX_DIR) -> RelatedIndex:
+    """进程内共享的索引实例：常驻进程中多次运行复用已加载的桶表和映射"""
+    with _open_lock:
+        index = _open_indexes.get(index_dir)
+        if index is None:
+            index = _open_indexes[index_dir] = RelatedIndex(index_dir)
+        else:
+            # CLI / 回填等其它进程可能追加过
+            index.refresh()
+        return index
+
+
+def _load_papers(path: str) -> list:
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("papers", [])
+    return [Paper.from_dict(p) for p in data]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Related prior work index for Daily Paper")
+    parser.add_argument("--index-dir", type=str, default=RELATED_INDEX_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_add = sub.add_parser("add", help="Add papers from a JSON file")
+    p_add.add_argument("--input", type=str, required=True)
+
+    p_query = sub.add_parser("query", help="Query similar papers")
+    p_query.add_argument("--title", type=str, required=True)
+    p_query.add_argument("--summary", type=str, default="")
+    p_query.add_argument("-k", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    index = RelatedIndex(args.index_dir)
+    if args.command == "add":
+        added = index.add(_load_papers(args.input))
+        index.close()
+        print(f"Added {added} papers, index size: {len(index)}")
+    else:
+        for r in index.query(Paper(title=args.title, summary=args.summary), k=args.k):
+            print(f"{r['similarity']:.3f}  {r['published']}  {r['title']}  {r['link']}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 结构化报告模型
+日报 / 周报生成脚本直接构建 Report（章节、论文 / 项目条目、趋势），再由各渲染器输出：
+
+- render_markdown：报告 Markdown（与原先字符串拼接的版式一致）
+- render_feishu_blocks：飞书文档块，不再需要把 Markdown 重新解析一遍
+- render_card：飞书卡片数据（周报卡片），不再用正则从 Markdown 里抠论文和趋势
+
+模型可序列化为 JSON（<报告>.json），下游的卡片、发布阶段直接读取。
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 模型格式版本（字段变化时递增）
+MODEL_VERSION = 1
+
+
+class Item:
+    """章节中的一个条目（论文 / 仓库 / HF 资源），渲染为小标题 + 字段列表"""
+
+    __slots__ = ("kind", "title", "heading", "fields", "meta")
+
+    def __init__(self, kind: str, title: str, heading: str = None, fields=None, meta=None):
+        self.kind = kind
+        self.title = title
+        # 小标题的 Markdown（可带链接或前缀），默认就是标题
+        self.heading = heading or title
+        # [(字段名, Markdown 值)]
+        self.fields = list(fields or [])
+        # 结构化附加信息（机构、摘要、链接等），供卡片等渲染器使用
+        self.meta = dict(meta or {})
+
+    def to_dict(self) -> dict:
+        return {"kind": self.kind, "title": self.title, "heading": self.heading,
+                "fields": [list(f) for f in self.fields], "meta": self.meta}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Item":
+        return cls(d["kind"], d["title"], d.get("heading"), [tuple(f) for f in d.get("fields", [])],
+                   d.get("meta"))
+
+
+class Section:
+    """章节：标题 + 可选正文 + 条目"""
+
+    __slots__ = ("title", "level", "text", "items")
+
+    def __init__(self, title: str, level: int = 2, text: str = None, items=None):
+        self.title = title
+        self.level = level
+        self.text = text
+        self.items = list(items or [])
+
+    def to_dict(self) -> dict:
+        return {"title": self.title, "level": self.level, "text": self.text,
+                "items": [i.to_dict() for i in self.items]}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Section":
+        return cls(d["title"], d.get("level", 2), d.get("text"),
+                   [Item.from_dict(i) for i in d.get("items", [])])
+
+
+class Trend:
+    __slots__ = ("title", "content")
+
+    def __init__(self, title: str, content: str):
+        self.title = title
+        self.content = content
+
+    def to_dict(self) -> dict:
+        return {"title": self.title, "content": self.content}
+
+
+class Report:
+    """
+    一份报告
+    summary_heading 为空时摘要渲染为「**摘要**：…」段落（日报），否则渲染为二级章节（周报）
+    """
+
+    __slots__ = ("kind", "title", "date_range", "summary", "summary_heading", "sections",
+                 "trends", "trend_heading", "links")
+
+    def __init__(self, kind: str, title: str, date_range: str = "", summary: str = "",
+                 summary_heading: str = None, sections=None, trends=None,
+                 trend_heading: str = "Crossing Trend", links=None):
+        self.kind = kind
+        self.title = title
+        self.date_range = date_range
+        self.summary = summary
+        self.summary_heading = summary_heading
+        self.sections = list(sections or [])
+        self.trends = list(trends or [])
+        self.trend_heading = trend_heading
+        self.links = list(links or [])
+
+    def items(self, kind: str = None):
+        for section in self.sections:
+            for item in section.items:
+                if kind is None or item.kind == kind:
+                    yield item
+
+    def to_dict(self) -> dict:
+        return {
+            "version": MODEL_VERSION,
+            "kind": self.kind,
+            "title": self.title,
+            "date_range": self.date_range,
+            "summary": self.summary,
+            "summary_heading": self.summary_heading,
+            "sections": [s.to_dict() for s in self.sections],
+            "trends": [t.to_dict() for t in self.trends],
+            "trend_heading": self.trend_heading,
+            "links": self.links,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Report":
+        return cls(
+            d["kind"], d["title"], d.get("date_range", ""), d.get("summary", ""),
+            d.get("summary_heading"), [Section.from_dict(s) for s in d.get("sections", [])],
+            [Trend(t["title"], t["content"]) for t in d.get("trends", [])],
+            d.get("trend_heading", "Crossing Trend"), d.get("links"),
+        )
+
+
+def load_report(path: str) -> Report:
+    with open(path, "r", encoding="utf-8") as f:
+        return Report.from_dict(json.load(f))
+
+
+def model_path(markdown_path: str) -> str:
+    """报告 Markdown 对应的模型文件路径（同目录同名 .json）"""
+    return os.path.splitext(markdown_path)[0] + ".json"
+
+
+def is_model(path: str) -> bool:
+    return path.endswith(".json")
+
+
+# ---------- 渲染器 ----------
+
+def render_markdown(report: Report) -> str:
+    lines = [f"# {report.title}", ""]
+    if report.summary_heading:
+        lines += [f"## {report.summary_heading}", report.summary, ""]
+    elif report.summary:
+        lines += [f"**摘要**：{report.summary}", ""]
+
+    for section in report.sections:
+        lines += ["#" * section.level + f" {section.title}", ""]
+        if section.text:
+            lines += [section.text, ""]
+        for item in section.items:
+            lines.append("#" * (section.level + 1) + f" {item.heading}")
+            lines += [f"- **{label}**: {value}" for label, value in item.fields]
+            lines.append("")
+
+    if report.trends:
+        lines += [f"## {report.trend_heading}", ""]
+        for i, trend in enumerate(report.trends, 1):
+            lines += [f"### 趋势 {i}: {trend.title}", trend.content, ""]
+    return "\n".join(lines)
+
+
+def render_feishu_blocks(report: Report, nested: bool = False) -> list:
+    """
+    直接从模型生成飞书块（与解析 render_markdown 输出得到的块一致）：标题直接建块，
+    正文和条目字段按行转换（多行内容每行一个块），nested=True 时列表嵌套为块树
+    """
+    from feishu import make_heading_block, make_text_block, parse_markdown_to_blocks, parse_markdown_to_tree
+
+    parse = parse_markdown_to_tree if nested else parse_markdown_to_blocks
+
+    def heading(level, text):
+        # 飞书标题只支持到 heading4，更深的层级按文本块处理
+        return make_heading_block(level, text) if level <= 4 else make_text_block("#" * level + " " + text)
+
+    blocks = [heading(1, report.title)]
+    if report.summary_heading:
+        blocks.append(heading(2, report.summary_heading))
+        if report.summary:
+            blocks += parse(report.summary)
+    elif report.summary:
+        blocks += parse(f"**摘要**：{report.summary}")
+
+    for section in report.sections:
+        blocks.append(heading(section.level, section.title))
+        if section.text:
+            blocks += parse(section.text)
+        for item in section.items:
+            blocks.append(heading(section.level + 1, item.heading))
+            blocks += parse("\n".join(f"- **{label}**: {value}" for label, value in item.fields))
+
+    if report.trends:
+        blocks.append(heading(2, report.trend_heading))
+        for i, trend in enumerate(report.trends, 1):
+            blocks.append(heading(3, f"趋势 {i}: {trend.title}"))
+            if trend.content:
+                blocks += parse(trend.content)
+    return blocks
+
+
+def render_card(report: Report, doc_url: str = None) -> dict:
+    """周报卡片数据：摘要、论文（名称 / 机构 / 摘要）、趋势、完整报告链接"""
+    data = {
+        "date_range": report.date_range,
+        "summary": report.summary,
+        "papers": [
+            {"name": item.title, "org": item.meta.get("org", ""), "desc": item.meta.get("desc", "")}
+            for item in report.items("paper")
+        ],
+        "trends": [t.to_dict() for t in report.trends],
+        "links": list(report.links),
+    }
+    if doc_url:
+        data["links"].append({"name": "完整报告", "url": doc_url})
+    return data
+
+
+def _write_text(path: str, text: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _write_json(path: str, obj):
+    _write_text(path, json.dumps(obj, ensure_ascii=False, indent=2))
+
+
+def render_outputs(report: Report, markdown: str = None, model: str = None, blocks: str = None,
+                   card: str = None, doc_url: str = None) -> list:
+    """并发渲染并写出各产物（参数为输出路径，None 表示不需要），返回写出的路径"""
+    jobs = []
+    if markdown:
+        jobs.append((markdown, lambda: _write_text(markdown, render_markdown(report))))
+    if model:
+        jobs.append((model, lambda: _write_json(model, report.to_dict())))
+    if blocks:
+        jobs.append((blocks, lambda: _write_json(blocks, render_feishu_blocks(report))))
+    if card:
+        jobs.append((card, lambda: _write_json(card, render_card(report, doc_url))))
+    with ThreadPoolExecutor(max_workers=max(1, len(jobs))) as pool:
+        futures = [pool.submit(fn) for _, fn in jobs]
+        for fut in futures:
+            fut.result()
+    return [path for path, _ in jobs]
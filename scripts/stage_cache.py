@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 内容寻址的阶段缓存（fetch → rank → render → publish）
+每个阶段的产物以「输入文件内容 + 配置 + 命令 + 版本」的哈希为键缓存；
+输入未变的阶段直接复用缓存产物并跳过执行，只有变化下游的阶段会重新计算。
+发布这类只有副作用的阶段没有产物，缓存命中即表示「相同内容已发布过」。
+
+用法:
+  python stage_cache.py run --stage render \\
+      --input /tmp/arxiv_papers.json --input scripts/generate_report.py \\
+      --config date=2026-02-24 --output /workspace/daily-papers/2026-02-24-cn.md \\
+      -- python scripts/generate_report.py --output /workspace/daily-papers/2026-02-24-cn.md
+  python stage_cache.py key --stage render --input ... --config ...
+  python stage_cache.py gc --keep-days 30
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+# 默认缓存目录
+STAGE_CACHE_DIR = "/workspace/data/stage-cache"
+
+# 缓存格式版本，键的计算方式变化时递增
+CACHE_VERSION = "1"
+
+
+def file_digest(path: str) -> str:
+    """文件内容的 sha256（文件不存在时返回固定标记，使键仍然确定）"""
+    if not os.path.exists(path):
+        return "missing"
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def stage_key(stage: str, inputs=(), config: dict = None, command=None, version: str = "") -> str:
+    """
+    计算阶段键：输入按给定顺序参与哈希，只看内容不看路径（内容寻址）
+    config 为任意可 JSON 序列化的配置（日期、权重、模板版本、关注列表等）
+    """
+    h = hashlib.sha256()
+    h.update(f"{CACHE_VERSION}\0{stage}\0{version}\0".encode("utf-8"))
+    for path in inputs:
+        h.update(file_digest(path).encode("ascii"))
+        h.update(b"\0")
+    h.update(json.dumps(config or {}, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8"))
+    if command:
+        h.update(b"\0" + "\x1f".join(command).encode("utf-8"))
+    return h.hexdigest()[:32]
+
+
+class StageCache:
+    """阶段产物缓存：<root>/<stage>/<key>/manifest.json + 产物副本"""
+
+    def __init__(self, root: str = STAGE_CACHE_DIR):
+        self.root = root
+
+    def _dir(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, stage, key)
+
+    def lookup(self, stage: str, key: str):
+        """命中时返回 manifest，否则 None"""
+        manifest_path = os.path.join(self._dir(stage, key), "manifest.json")
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        # 产物文件缺失视为未命中
+        for out in manifest.get("outputs", []):
+            if not os.path.exists(os.path.join(self._dir(stage, key), out["file"])):
+                return None
+        return manifest
+
+    def restore(self, stage: str, key: str, outputs=()) -> bool:
+        """把缓存产物复制回输出路径（outputs 为空时按 manifest 中记录的路径）"""
+        manifest = self.lookup(stage, key)
+        if manifest is None:
+            return False
+        cached = manifest.get("outputs", [])
+        targets = list(outputs) or [out["path"] for out in cached]
+        for out, target in zip(cached, targets):
+            d = os.path.dirname(target)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            shutil.copyfile(os.path.join(self._dir(stage, key), out["file"]), target)
+        return True
+
+    def store(self, stage: str, key: str, outputs=(), meta: dict = None):
+        """保存产物（先写临时目录再原子改名，避免半成品被当作命中）"""
+        final_dir = self._dir(stage, key)
+        tmp_dir = final_dir + f".tmp{os.getpid()}"
+        os.makedirs(tmp_dir, exist_ok=True)
+        entries = []
+        for i, path in enumerate(outputs):
+            name = f"{i}_{os.path.basename(path)}"
+            shutil.copyfile(path, os.path.join(tmp_dir, name))
+            entries.append({"path": path, "file": name})
+        manifest = {
+            "stage": stage,
+            "key": key,
+            "created": datetime.now().isoformat(),
+            "outputs": entries,
+        }
+        if meta:
+            manifest["meta"] = meta
+        with open(os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        if os.path.exists(final_dir):
+            shutil.rmtree(final_dir)
+        os.replace(tmp_dir, final_dir)
+
+    def run(self, stage: str, fn, inputs=(), config: dict = None, outputs=(), command=None,
+            version: str = "", force: bool = False) -> bool:
+        """
+        执行阶段：命中缓存时恢复产物并跳过 fn，否则执行 fn 并缓存产物
+        返回 True 表示实际执行了，False 表示复用了缓存
+        """
+        key = stage_key(stage, inputs, config, command, version)
+        if not force and self.restore(stage, key, outputs):
+            print(f"[cache] {stage}: hit {key[:12]}, skipped")
+            return False
+        print(f"[cache] {stage}: miss {key[:12]}, running")
+        fn()
+        missing = [p for p in outputs if not os.path.exists(p)]
+        if missing:
+            raise RuntimeError(f"Stage {stage} did not produce: {missing}")
+        self.store(stage, key, outputs, meta={"inputs": list(inputs), "config": config})
+        return True
+
+    def gc(self, keep_days: int) -> int:
+        """删除超过 keep_days 天的缓存条目，返回删除数量"""
+        if not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - keep_days * 86400
+        removed = 0
+        for stage in os.listdir(self.root):
+            stage_dir = os.path.join(self.root, stage)
+            if not os.path.isdir(stage_dir):
+                continue
+            for key in os.listdir(stage_dir):
+                entry = os.path.join(stage_dir, key)
+                if os.path.getmtime(entry) < cutoff:
+                    shutil.rmtree(entry, ignore_errors=True)
+                    removed += 1
+        return removed
+
+
+def _parse_config(items: list) -> dict:
+    config = {}
+    for item in items or []:
+        k, _, v = item.partition("=")
+        config[k] = v
+    return config
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Content-addressed stage cache for Daily Paper")
+    parser.add_argument("--cache-dir", type=str, default=STAGE_CACHE_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("run", "key"):
+        p = sub.add_parser(name)
+        p.add_argument("--stage", type=str, required=True)
+        p.add_argument("--input", action="append", default=[], help="Input file (repeatable)")
+        p.add_argument("--config", action="append", default=[], help="key=value config (repeatable)")
+        p.add_argument("--output", action="append", default=[], help="Output file (repeatable)")
+        p.add_argument("--version", type=str, default="")
+        if name == "run":
+            p.add_argument("--force", action="store_true", help="Ignore cache hits")
+        p.add_argument("cmd", nargs=argparse.REMAINDER, help="-- command to run on a miss")
+
+    p_gc = sub.add_parser("gc")
+    p_gc.add_argument("--keep-days", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    cache = StageCache(args.cache_dir)
+    if args.command == "gc":
+        print(f"Removed {cache.gc(args.keep_days)} cache entries")
+        return 0
+
+    cmd = args.cmd[1:] if args.cmd[:1] == ["--"] else args.cmd
+    config = _parse_config(args.config)
+    if args.command == "key":
+        print(stage_key(args.stage, args.input, config, cmd, args.version))
+        return 0
+
+    if not cmd:
+        parser.error("run needs a command after --")
+
+    def execute():
+        result = subprocess.run(cmd)
+        if result.returncode != 0:
+            raise SystemExit(result.returncode)
+
+    cache.run(args.stage, execute, args.input, config, args.output, command=cmd,
+              version=args.version, force=args.force)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
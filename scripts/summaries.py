@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - 每日摘要与周期汇总
+日报运行时把当天的结果物化为一份紧凑的每日摘要（<SUMMARY_DIR>/<日期>.json）：
+候选池中排名靠前的论文及其打分分量、主题计数、入选的 GitHub 项目和 HF 资源。
+周报 / 月报只需按 --range 合并区间内各天的摘要，代价与天数成正比，
+不必重新抓取、重新打分整个区间的原始数据。
+
+用法:
+  python summaries.py show --date 2026-02-24
+  python summaries.py rollup --range 2026-02-01~2026-02-28
+"""
+
+import argparse
+import os
+import re
+from collections import Counter
+from datetime import date, timedelta
+
+from jsonio import dumps, load_document
+from records import HFItem, Paper, Repo
+
+SUMMARY_DIR = "/workspace/data/summaries"
+
+# 摘要格式版本（字段变化时递增）
+SUMMARY_VERSION = 1
+
+# 每日保留的候选论文数（日报只展示其中前 12 篇，其余供周报 / 月报合并时竞争）
+SUMMARY_POOL = 30
+
+
+def summary_path(day: str, summary_dir: str = SUMMARY_DIR) -> str:
+    return os.path.join(summary_dir, f"{day}.json")
+
+
+def iter_days(start: str, end: str):
+    d, last = date.fromisoformat(start), date.fromisoformat(end)
+    while d <= last:
+        yield d.isoformat()
+        d += timedelta(days=1)
+
+
+def missing_days(start: str, end: str, summary_dir: str = SUMMARY_DIR) -> list:
+    """区间内还没有每日摘要的日期"""
+    return [d for d in iter_days(start, end) if not os.path.exists(summary_path(d, summary_dir))]
+
+
+def _title_key(title: str) -> str:
+    return re.sub(r"\s+", " ", (title or "").lower().strip())
+
+
+def save_daily_summary(day: str, pool: list, scores: list, selected: int, topic_counts: dict,
+                       candidates: int, repos: list, hf_items: list,
+                       summary_dir: str = SUMMARY_DIR) -> str:
+    """
+    写出当天摘要
+    pool 为按分数排序的候选论文，scores 为对应的打分分量，前 selected 篇进入了日报
+    """
+    papers = []
+    for i, (p, vector) in enumerate(zip(pool, scores)):
+        d = p.to_dict()
+        # 相关历史工作只对当天的日报有意义
+        d.pop("related", None)
+        papers.append({"paper": d, "scores": vector, "selected": i < selected})
+    summary = {
+        "version": SUMMARY_VERSION,
+        "date": day,
+        "candidates": candidates,
+        "topic_counts": dict(topic_counts),
+        "papers": papers,
+        "repos": [r.to_dict() for r in repos],
+        "hf": [h.to_dict() for h in hf_items],
+    }
+    path = summary_path(day, summary_dir)
+    os.makedirs(summary_dir, exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(dumps(summary))
+    os.replace(tmp, path)
+    return path
+
+
+def load_summary(day: str, summary_dir: str = SUMMARY_DIR):
+    path = summary_path(day, summary_dir)
+    if not os.path.exists(path):
+        return None
+    return load_document(path)
+
+
+class Rollup:
+    """区间内各天摘要的合并结果"""
+
+    __slots__ = ("start", "end", "days", "missing", "candidates", "topic_counts",
+                 "papers", "scores", "repos", "hf_items")
+
+    def __init__(self, start: str, end: str):
+        self.start = start
+        self.end = end
+        self.days = []
+        self.missing = []
+        self.candidates = 0
+        self.topic_counts = Counter()
+        self.papers = []
+        # 论文标题键 → 日报打分分量
+        self.scores = {}
+        self.repos = []
+        self.hf_items = []
+
+    def score(self, paper):
+        """论文在日报中的总分（周报 / 月报直接按它排序，不重新打分）；没有记录时返回 None"""
+        vector = self.scores.get(_title_key(paper.title))
+        return sum(vector.values()) if vector is not None else None
+
+    def to_dict(self) -> dict:
+        return {
+            "start": self.start, "end": self.end, "days": self.days, "missing": self.missing,
+            "candidates": self.candidates, "topic_counts": dict(self.topic_counts),
+            "papers": len(self.papers), "repos": len(self.repos), "hf": len(self.hf_items),
+        }
+
+
+def rollup(start: str, end: str, summary_dir: str = SUMMARY_DIR) -> Rollup:
+    """
+    合并 [start, end] 内的每日摘要
+    论文按标题去重（保留最早出现的一次），项目 / HF 资源按名称去重（保留最新一天的数据）
+    """
+    result = Rollup(start, end)
+    seen_papers = set()
+    repos, hf_items = {}, {}
+    for day in iter_days(start, end):
+        summary = load_summary(day, summary_dir)
+        if summary is None:
+            result.missing.append(day)
+            continue
+        result.days.append(day)
+        result.candidates += summary.get("candidates", 0)
+        result.topic_counts.update(summary.get("topic_counts", {}))
+        for entry in summary.get("papers", []):
+            paper = Paper.from_dict(entry["paper"])
+            key = _title_key(paper.title)
+            if not key or key in seen_papers:
+                continue
+            seen_papers.add(key)
+            result.papers.append(paper)
+            result.scores[key] = entry.get("scores", {})
+        for d in summary.get("repos", []):
+            repo = Repo.from_dict(d)
+            repos[repo.name] = repo
+        for d in summary.get("hf", []):
+            item = HFItem.from_dict(d)
+            hf_items[item.id] = item
+    result.repos = list(repos.values())
+    result.hf_items = list(hf_items.values())
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Daily summaries and period rollups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_show = sub.add_parser("show", help="Print one day's summary")
+    p_show.add_argument("--date", type=str, required=True)
+    p_roll = sub.add_parser("rollup", help="Merge the summaries in a date range")
+    p_roll.add_argument("--range", type=str, required=True, help="'YYYY-MM-DD~YYYY-MM-DD'")
+    for p in (p_show, p_roll):
+        p.add_argument("--summary-dir", type=str, default=SUMMARY_DIR)
+    args = parser.parse_args(argv)
+
+    if args.command == "show":
+        summary = load_summary(args.date, args.summary_dir)
+        if summary is None:
+            print(f"No summary for {args.date}")
+            return 1
+        print(f"{args.date}: {summary['candidates']} candidates, topics {summary['topic_counts']}")
+        for entry in summary["papers"]:
+            mark = "*" if entry["selected"] else " "
+            print(f" {mark} {sum(entry['scores'].values()):3d} {entry['paper']['title'][:90]}")
+        return 0
+
+    start, _, end = args.range.partition("~")
+    result = rollup(start.strip(), end.strip(), args.summary_dir)
+    print(dumps(result.to_dict()))
+    if result.missing:
+        print(f"Missing summaries: {', '.join(result.missing)}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
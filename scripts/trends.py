@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Daily Paper - Crossing Trend 检测
+从论文标题和摘要中统计关键短语（KEYPHRASES）与 2-3 元词组的文档频次，按天、按主题持久化，
+再对比相邻两个周期计算环比提升（lift），找出升温的术语和新出现的关键短语共现
+（如 world model × VLA），并给出支撑论文的 id。
+
+- 增量：每天只统计当天新增的论文（<TRENDS_DIR>/days/<日期>.json），已计入其它日期的论文
+  （抓取窗口重叠）通过 seen/<日期>.json 跳过；只查前后 SEEN_DAYS 天的认领记录，
+  代价与历史长度无关；重跑同一天只替换这一天的计数，不重算历史
+- 并发：add_day 持有目录级文件锁，多个统计任务同时运行时依次执行
+- 查询：周期统计 = 区间内各天计数之和，代价与天数成正比
+
+用法:
+  python trends.py add --date 2026-02-24 --papers /tmp/arxiv_papers.json /tmp/s2_papers.json
+  python trends.py show --range 2026-02-17~2026-02-23
+"""
+
+import argparse
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import combinations
+
+from jsonio import dumps, load_document
+from ranking import iter_records
+from records import papers as as_papers
+from related_index import STOPWORDS
+
+try:
+    import fcntl
+except ImportError:  # 非 POSIX 平台不加锁
+    fcntl = None
+
+TRENDS_DIR = "/workspace/data/trends"
+
+# 论文去重只看前后这么多天内其它日期认领的论文（覆盖各数据源抓取窗口的重叠）
+SEEN_DAYS = 14
+
+# 关键短语：规范名 → 匹配形式（小写，按词边界匹配）
+KEYPHRASES = {
+    "VLA": ["vla", "vlas", "vision-language-action", "vision language action"],
+    "world model": ["world model", "world models", "world modeling"],
+    "diffusion policy": ["diffusion policy", "diffusion policies"],
+    "flow matching": ["flow matching", "flow-matching"],
+    "sim-to-real": ["sim-to-real", "sim2real", "sim to real"],
+    "reinforcement learning": ["reinforcement learning", "rl"],
+    "imitation learning": ["imitation learning", "behavior cloning", "behaviour cloning"],
+    "humanoid": ["humanoid", "humanoids"],
+    "dexterous manipulation": ["dexterous", "dexterity"],
+    "tactile": ["tactile", "touch sensing"],
+    "locomotion": ["locomotion", "legged"],
+    "navigation": ["navigation"],
+    "LLM": ["llm", "llms", "large language model", "large language models"],
+    "VLM": ["vlm", "vlms", "vision-language model", "vision-language models"],
+    "video generation": ["video generation", "video diffusion", "video prediction"],
+    "3D representation": ["gaussian splatting", "nerf", "point cloud", "point clouds"],
+    "teleoperation": ["teleoperation", "teleoperated"],
+    "scaling": ["scaling law", "scaling laws", "scaling up"],
+    "benchmark": ["benchmark", "benchmarks"],
+    "autonomous driving": ["autonomous driving", "self-driving"],
+}
+
+_PHRASE_RES = [
+    (name, re.compile(r"(?<![a-z0-9])(?:" + "|".join(re.escape(f) for f in forms) + r")(?![a-z0-9])"))
+    for name, forms in KEYPHRASES.items()
+]
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+# n 元词组长度；每天只保留文档频次不低于 MIN_DAY_DF 的词组（控制每天计数文件的大小）
+NGRAM_SIZES = (2, 3)
+MIN_DAY_DF = 2
+
+# 每个术语每天记录的支撑论文 id 数
+MAX_EVIDENCE = 5
+
+# 成为趋势所需的本期最少论文数 / 最小环比提升
+MIN_SUPPORT = 3
+MIN_LIFT = 1.5
+
+
+# ---------- 单篇论文的特征 ----------
+
+def paper_phrases(text: str) -> set:
+    lowered = text.lower()
+    return {name for name, pattern in _PHRASE_RES if pattern.search(lowered)}
+
+
+def paper_ngrams(text: str) -> set:
+    """停用词处断开后的 2-3 元词组（同一篇论文只计一次）"""
+    grams = set()
+    run = []
+    for tok in _TOKEN_RE.findall(text.lower()) + [None]:
+        if tok is None or tok in STOPWORDS or tok.isdigit() or len(tok) < 2:
+            for n in NGRAM_SIZES:
+                grams.update(" ".join(run[i:i + n]) for i in range(len(run) - n + 1))
+            run = []
+        else:
+            run.append(tok)
+    return grams
+
+
+# ---------- 计数 ----------
+
+class Counts:
+    """一天或一个周期的计数：论文数、关键短语 / 词组 / 共现的文档频次及支撑论文"""
+
+    __slots__ = ("papers", "topic_papers", "phrases", "ngrams", "pairs", "topics", "evidence")
+
+    def __init__(self):
+        self.papers = 0
+        self.topic_papers = Counter()
+        self.phrases = Counter()
+        self.ngrams = Counter()
+        # "a|b"（按名称排序）→ 论文数
+        self.pairs = Counter()
+        # 主题 → 关键短语文档频次
+        self.topics = defaultdict(Counter)
+        # 术语 / 共现 → 支撑论文 id
+        self.evidence = defaultdict(list)
+
+    def add_paper(self, paper):
+        text = f"{paper.title}\n{paper.summary}"
+        topic = paper.primary_topic or "Other"
+        phrases = paper_phrases(text)
+        self.papers += 1
+        self.topic_papers[topic] += 1
+        for name in phrases:
+            self.phrases[name] += 1
+            self.topics[topic][name] += 1
+            self._cite(name, paper.id)
+        for a, b in combinations(sorted(phrases), 2):
+            key = f"{a}|{b}"
+            self.pairs[key] += 1
+            self._cite(key, paper.id)
+        for gram in paper_ngrams(text):
+            self.ngrams[gram] += 1
+            self._cite(gram, paper.id)
+
+    def _cite(self, key: str, paper_id: str):
+        ids = self.evidence[key]
+        if paper_id and len(ids) < MAX_EVIDENCE:
+            ids.append(paper_id)
+
+    def prune(self):
+        """丢弃当天只出现一次的词组"""
+        for gram in [g for g, df in self.ngrams.items() if df < MIN_DAY_DF]:
+            del self.ngrams[gram]
+            if gram not in self.phrases and gram not in self.pairs:
+                self.evidence.pop(gram, None)
+
+    def merge(self, other: "Counts"):
+        self.papers += other.papers
+        self.topic_papers.update(other.topic_papers)
+        self.phrases.update(other.phrases)
+        self.ngrams.update(other.ngrams)
+        self.pairs.update(other.pairs)
+        for topic, counts in other.topics.items():
+            self.topics[topic].update(counts)
+        for key, ids in other.evidence.items():
+            self.evidence[key].extend(ids)
+
+    def to_dict(self) -> dict:
+        return {
+            "papers": self.papers,
+            "topic_papers": dict(self.topic_papers),
+            "phrases": dict(self.phrases),
+            "ngrams": dict(self.ngrams),
+            "pairs": dict(self.pairs),
+            "topics": {t: dict(c) for t, c in self.topics.items()},
+            "evidence": dict(self.evidence),
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "Counts":
+        counts = cls()
+        counts.papers = d.get("papers", 0)
+        counts.topic_papers.update(d.get("topic_papers", {}))
+        counts.phrases.update(d.get("phrases", {}))
+        counts.ngrams.update(d.get("ngrams", {}))
+        counts.pairs.update(d.get("pairs", {}))
+        for topic, c in d.get("topics", {}).items():
+            counts.topics[topic].update(c)
+        for key, ids in d.get("evidence", {}).items():
+            counts.evidence[key].extend(ids)
+        return counts
+
+
+def _write(path: str, obj):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(dumps(obj))
+    os.replace(tmp, path)
+
+
+class TrendStore:
+    """按天持久化的计数"""
+
+    def __init__(self, trends_dir: str = TRENDS_DIR):
+        self.trends_dir = trends_dir
+
+    def day_path(self, day: str) -> str:
+        return os.path.join(self.trends_dir, "days", f"{day}.json")
+
+    def seen_path(self, day: str) -> str:
+        """这一天认领的论文键列表"""
+        return os.path.join(self.trends_dir, "seen", f"{day}.json")
+
+    def load_day(self, day: str):
+        path = self.day_path(day)
+        if not os.path.exists(path):
+            return None
+        return Counts.from_dict(load_document(path))
+
+    @contextmanager
+    def _locked(self):
+        """目录级互斥锁（关闭文件即释放）"""
+        os.makedirs(self.trends_dir, exist_ok=True)
+        with open(os.path.join(self.trends_dir, ".lock"), "w") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _migrate_seen(self):
+        """旧版的单个 seen.json（论文键 → 日期）拆成按天的认领文件"""
+        legacy = os.path.join(self.trends_dir, "seen.json")
+        if not os.path.exists(legacy):
+            return
+        by_day = defaultdict(list)
+        for key, owner in load_document(legacy).items():
+            by_day[owner].append(key)
+        for owner, keys in by_day.items():
+            _write(self.seen_path(owner), keys)
+        os.remove(legacy)
+
+    def add_day(self, day: str, papers) -> Counts:
+        """统计当天的新论文（前后 SEEN_DAYS 天内已计入其它日期的跳过），替换这一天原有的计数"""
+        with self._locked():
+            self._migrate_seen()
+            # 重跑同一天时不读这一天原来的认领记录，相当于先释放再重新认领
+            d = date.fromisoformat(day)
+            seen = set()
+            for offset in range(-SEEN_DAYS, SEEN_DAYS + 1):
+                path = self.seen_path((d + timedelta(days=offset)).isoformat())
+                if offset and os.path.exists(path):
+                    seen.update(load_document(path))
+            counts = Counts()
+            claimed = []
+            for paper in papers:
+                key = paper.id or paper.title.lower()
+                if key in seen:
+                    continue
+                seen.add(key)
+                claimed.append(key)
+                counts.add_paper(paper)
+            counts.prune()
+            _write(self.day_path(day), dict(counts.to_dict(), date=day))
+            _write(self.seen_path(day), claimed)
+        return counts
+
+    def window(self, start: str, end: str) -> Counts:
+        total = Counts()
+        d, last = date.fromisoformat(start), date.fromisoformat(end)
+        while d <= last:
+            counts = self.load_day(d.isoformat())
+            if counts is not None:
+                total.merge(counts)
+            d += timedelta(days=1)
+        return total
+
+
+# ---------- 趋势检测 ----------
+
+def previous_range(start: str, end: str) -> tuple:
+    """紧邻 [start, end] 之前、等长的区间"""
+    d0, d1 = date.fromisoformat(start), date.fromisoformat(end)
+    length = d1 - d0 + timedelta(days=1)
+    return (d0 - length).isoformat(), (d1 - length).isoformat()
+
+
+def lift(current: int, current_total: int, previous: int, previous_total: int) -> float:
+    """占比的环比提升（加一平滑，上期没有出现时也是有限值）"""
+    return ((current + 1) / (current_total + 1)) / ((previous + 1) / (previous_total + 1))
+
+
+def detect_trends(start: str, end: str, store: TrendStore = None, k: int = 3) -> list:
+    """
+    对比 [start, end] 与上一个等长周期，返回最多 k 个趋势（共现优先，其余由升温术语补足）：
+    {"kind": "pair" | "term", "terms": [...], "count", "previous", "lift", "papers": [ids], "topics"}
+    """
+    store = store or TrendStore()
+    cur = store.window(start, end)
+    prev = store.window(*previous_range(start, end))
+    if not cur.papers:
+        return []
+
+    def candidates(kind, cur_counts, prev_counts):
+        found = []
+        for key, count in cur_counts.items():
+            if count < MIN_SUPPORT:
+                continue
+            before = prev_counts.get(key, 0)
+            ratio = lift(count, cur.papers, before, prev.papers)
+            if ratio < MIN_LIFT:
+                continue
+            found.append({
+                "kind": kind, "terms": key.split("|") if kind == "pair" else [key],
+                "count": count, "previous": before, "lift": round(ratio, 2),
+                "papers": cur.evidence.get(key, [])[:MAX_EVIDENCE],
+            })
+        # 提升幅度优先，其次是支撑论文数
+        found.sort(key=lambda t: (t["lift"] * math.log1p(t["count"]), t["count"]), reverse=True)
+        return found
+
+    pairs = candidates("pair", cur.pairs, prev.pairs)
+    terms = candidates("term", cur.phrases, prev.phrases)
+    grams = [t for t in candidates("term", cur.ngrams, prev.ngrams) if t["terms"][0] not in cur.phrases]
+    # 词组被同样频次的更长词组包含时只保留长的（long horizon manipulation 而非 horizon manipulation）
+    terms += [
+        t for t in grams
+        if not any(o is not t and o["count"] >= t["count"] and f" {t['terms'][0]} " in f" {o['terms'][0]} "
+                   for o in grams)
+    ]
+    terms.sort(key=lambda t: (t["lift"] * math.log1p(t["count"]), t["count"]), reverse=True)
+
+    picked = pairs[:max(1, k - 1)]
+    used = {term for t in picked for term in t["terms"]}
+    for t in terms:
+        if len(picked) >= k:
+            break
+        # 已由入选共现覆盖的关键短语（含包含它们的词组）不再单独成为趋势
+        if t["terms"][0] in used or paper_phrases(t["terms"][0]) & used:
+            continue
+        picked.append(t)
+        used.add(t["terms"][0])
+    for t in picked:
+        if t["kind"] == "term":
+            t["topics"] = {topic: c[t["terms"][0]] for topic, c in cur.topics.items() if c.get(t["terms"][0])}
+    return picked[:k]
+
+
+def _paper_link(paper_id: str) -> str:
+    if re.match(r"^\d{4}\.\d{4,5}(v\d+)?$", paper_id):
+        return f"[{paper_id}](https://arxiv.org/abs/{paper_id})"
+    return paper_id
+
+
+def describe(trend: dict) -> tuple:
+    """趋势 → (标题, 正文 Markdown)"""
+    change = "上期未出现" if trend["previous"] == 0 else f"上期 {trend['previous']} 篇，占比提升 {trend['lift']:.1f} 倍"
+    evidence = "、".join(_paper_link(i) for i in trend["papers"])
+    if trend["kind"] == "pair":
+        a, b = trend["terms"]
+        title = f"{a} × {b}"
+        content = f"本期有 {trend['count']} 篇论文同时涉及 {a} 与 {b}（{change}）。"
+    else:
+        term = trend["terms"][0]
+        title = f"{term} 升温"
+        content = f"本期有 {trend['count']} 篇论文提到 {term}（{change}）。"
+        if trend.get("topics"):
+            top = sorted(trend["topics"].items(), key=lambda kv: kv[1], reverse=True)[:2]
+            content += "主要来自 " + "、".join(f"{topic} 方向（{n} 篇）" for topic, n in top) + "。"
+    if evidence:
+        content += f"代表论文：{evidence}。"
+    return title, content
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incremental term statistics and Crossing Trend detection")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_add = sub.add_parser("add", help="Count one day's papers")
+    p_add.add_argument("--date", type=str, required=True)
+    p_add.add_argument("--papers", nargs="+", required=True, help="Paper sources (.json or .jsonl)")
+    p_add.add_argument("--published-only", action="store_true",
+                       help="Only count papers published on --date (for multi-day backfill files)")
+    p_show = sub.add_parser("show", help="Detect trends in a date range")
+    p_show.add_argument("--range", type=str, required=True, help="'YYYY-MM-DD~YYYY-MM-DD'")
+    p_show.add_argument("-k", type=int, default=3)
+    for p in (p_add, p_show):
+        p.add_argument("--trends-dir", type=str, default=TRENDS_DIR)
+    args = parser.parse_args(argv)
+
+    store = TrendStore(args.trends_dir)
+    if args.command == "add":
+        papers = as_papers(iter_records(args.papers))
+        if args.published_only:
+            papers = (p for p in papers if (p.published or "")[:10] == args.date)
+        counts = store.add_day(args.date, papers)
+        print(f"{args.date}: counted {counts.papers} new papers, {len(counts.phrases)} keyphrases, "
+              f"{len(counts.ngrams)} n-grams, {len(counts.pairs)} co-occurrences")
+        return 0
+
+    start, _, end = args.range.partition("~")
+    trends = detect_trends(start.strip(), end.strip(), store, k=args.k)
+    if not trends:
+        print("No trends detected")
+    for trend in trends:
+        title, content = describe(trend)
+        print(f"## {title}\n{content}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())